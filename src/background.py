@@ -32,6 +32,9 @@ class Background:
 
         # Services
         logger.info("Starting Services...")
+        from src.services.point_value_store import PointValueStore
+        FlaskThread(target=PointValueStore().flush_interval, daemon=True).start()
+        FlaskThread(target=PointValueStore().cov_interval, daemon=True).start()
         if setting.services.mqtt:
             from src.services.mqtt_client import MqttClient
             for config in setting.mqtt_settings:
@@ -58,6 +61,10 @@ class Background:
             FlaskThread(target=PostgreSQL().setup, daemon=True,
                         kwargs={'config': setting.postgres}).start()
 
+        if setting.services.calculated_points:
+            from src.services.calculated_points import CalculatedPoints
+            FlaskThread(target=CalculatedPoints().run, daemon=True).start()
+
         # Drivers
         thread.sleep(5)
         logger.info("Starting Drivers...")
@@ -1,7 +1,15 @@
+import json
+import re
+from typing import Dict, Union
+
+from sqlalchemy.orm import validates
+
 from src import db
 from src.drivers.enums.drivers import Drivers
 from src.drivers.generic.enums.point.points import GenericPointType
+from src.models.point.model_point import PointModel
 from src.models.point.model_point_mixin import PointMixinModel
+from src.utils.math_functions import CalculationExpression, compile_calculation_expression
 
 
 class GenericPointModel(PointMixinModel):
@@ -9,11 +17,57 @@ class GenericPointModel(PointMixinModel):
 
     type = db.Column(db.Enum(GenericPointType), nullable=False, default=GenericPointType.FLOAT)
     unit = db.Column(db.String, nullable=True)
+    calculation = db.Column(db.String, nullable=True)
+    calculation_inputs = db.Column(db.String, nullable=True)
 
     @classmethod
     def get_polymorphic_identity(cls) -> Drivers:
         return Drivers.GENERIC
 
+    @validates('calculation_inputs')
+    def validate_calculation_inputs(self, _, value):
+        """
+        JSON object of the point uuids by the variable names of the calculation, e.g. {"a": "<uuid>"}
+        """
+        if value is not None:
+            try:
+                inputs: dict = json.loads(value)
+            except ValueError:
+                raise ValueError('calculation_inputs needs to be a valid JSON')
+            if not isinstance(inputs, dict) or not all(isinstance(point_uuid, str) for point_uuid in inputs.values()):
+                raise ValueError('calculation_inputs needs to be a JSON object of point uuids by variable name')
+            for variable in inputs:
+                if not re.match("^[A-Za-z_][A-Za-z0-9_]*$", variable):
+                    raise ValueError(f"calculation_inputs variable {variable} should be alphanumeric and can contain "
+                                     f"'_', but can't start with a digit")
+        return value
+
+    def is_calculated(self) -> bool:
+        return bool(self.calculation and self.calculation.strip())
+
+    def get_calculation_inputs(self) -> Dict[str, str]:
+        return json.loads(self.calculation_inputs) if self.calculation_inputs else {}
+
+    def get_calculation(self) -> Union[CalculationExpression, None]:
+        if not self.is_calculated():
+            return None
+        return compile_calculation_expression(self.calculation, frozenset(self.get_calculation_inputs()))
+
+    def check_self(self) -> (bool, any):
+        super().check_self()
+        if self.is_calculated():
+            try:
+                self.get_calculation()
+            except Exception:
+                raise ValueError("Invalid calculation, must be a valid arithmetic expression of the calculation_inputs "
+                                 "variables")
+            input_uuids: set = set(self.get_calculation_inputs().values())
+            if self.uuid in input_uuids:
+                raise ValueError("calculation_inputs cannot contain the point itself")
+            if PointModel.query.filter(PointModel.uuid.in_(input_uuids)).count() != len(input_uuids):
+                raise ValueError("calculation_inputs points not found")
+        return True
+
     def apply_point_type(self, value: float):
         if value is not None:
             if self.type == GenericPointType.STRING:
@@ -40,11 +40,7 @@ class GenericPointSingular(GenericPointBase):
     def update_point(cls, data: dict, point: GenericPointModel) -> GenericPointModel:
         priority_array_write: dict = data.pop('priority_array_write') if data.get('priority_array_write') else {}
         if priority_array_write:
-            PriorityArrayModel.filter_by_point_uuid(point.uuid).update(priority_array_write)
-            updated_priority_array_write: PriorityArrayModel = cls.get_priority_array_write(uuid=point.uuid)
-            highest_priority_value: float = PriorityArrayModel.get_highest_priority_value_from_priority_array(
-                updated_priority_array_write)
-            point.update_point_store_value(highest_priority_value=highest_priority_value)
+            point.update_point_store(value=None, priority=None, priority_array_write=priority_array_write)
         if data:
             point.update(**data)
             PointsRegistry().update_point(point)
@@ -26,6 +26,8 @@ class GenericPointValueWriterBase(RubixResource):
             raise NotFoundException('Point does not exist')
         if not point.writable:
             raise BadDataException('Point is not writable')
+        if point.is_calculated():
+            raise BadDataException('Point value is calculated')
         point.update_point_store(value=data.get('value'),
                                  priority=data.get('priority'),
                                  priority_array_write=data.get('priority_array_write'))
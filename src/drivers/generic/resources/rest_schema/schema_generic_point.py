@@ -11,6 +11,12 @@ generic_point_all_attributes['type'] = {
 generic_point_all_attributes['unit'] = {
     'type': str,
 }
+generic_point_all_attributes['calculation'] = {
+    'type': str,
+}
+generic_point_all_attributes['calculation_inputs'] = {
+    'type': str,
+}
 
 generic_point_return_attributes = deepcopy(point_return_attributes)
 generic_point_all_fields = {}
@@ -0,0 +1,7 @@
+import enum
+
+
+class ModbusCircuitState(enum.Enum):
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
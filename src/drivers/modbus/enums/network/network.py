@@ -6,6 +6,13 @@ class ModbusType(enum.Enum):
     TCP = 1
 
 
+# Requests of a bus are served in this order, lower first
+class ModbusRequestPriority(enum.IntEnum):
+    WRITE = 0
+    MANUAL = 1
+    CYCLIC = 2
+
+
 # The type of checksum to use to verify data integrity. This can be on of the followings.
 class ModbusRtuParity(enum.Enum):
     O = 0
@@ -21,6 +21,7 @@ class ModbusDataType(enum.Enum):
     FLOAT = 5
     DOUBLE = 6
     DIGITAL = 7
+    BITS = 8
 
 
 class ModbusDataEndian(enum.Enum):
@@ -18,6 +18,14 @@ class ModbusDeviceModel(DeviceMixinModel):
     zero_based = db.Column(db.Boolean(), nullable=False, default=False)
     ping_point = db.Column(db.String(10))
     supports_multiple_rw = db.Column(db.Boolean(), nullable=False, default=False)
+    max_gap = db.Column(db.Integer(), nullable=False, default=0)
+    max_registers_per_request = db.Column(db.Integer())
+    # capabilities learned by the device probe, None when unknown
+    probed_max_coils = db.Column(db.Integer())
+    probed_max_discrete_inputs = db.Column(db.Integer())
+    probed_max_holding_registers = db.Column(db.Integer())
+    probed_max_input_registers = db.Column(db.Integer())
+    probed_gap_reads = db.Column(db.Boolean())
     modbus_network_uuid_constraint = db.Column(db.String, nullable=False)
 
     __table_args__ = (
@@ -35,6 +43,38 @@ class ModbusDeviceModel(DeviceMixinModel):
         ModbusPointModel.create_temporary_from_string(value)
         return value
 
+    @validates('max_gap')
+    def validate_max_gap(self, _, value):
+        if value is None:
+            return 0
+        if value < 0 or value > 65535:
+            raise ValueError('Invalid max gap')
+        return value
+
+    @validates('max_registers_per_request')
+    def validate_max_registers_per_request(self, _, value):
+        if value is None:
+            return value
+        if value < 1 or value > 2000:
+            raise ValueError('Invalid max registers per request')
+        return value
+
+    @validates('probed_max_coils', 'probed_max_discrete_inputs')
+    def validate_probed_max_bits(self, _, value):
+        if value is None:
+            return value
+        if value < 1 or value > 2000:
+            raise ValueError('Invalid probed max coils (discrete inputs) per request')
+        return value
+
+    @validates('probed_max_holding_registers', 'probed_max_input_registers')
+    def validate_probed_max_registers(self, _, value):
+        if value is None:
+            return value
+        if value < 1 or value > 125:
+            raise ValueError('Invalid probed max registers per request')
+        return value
+
     def check_self(self) -> (bool, any):
         super().check_self()
         if self.network_uuid is None:  # for temporary models
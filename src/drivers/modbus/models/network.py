@@ -21,6 +21,11 @@ class ModbusNetworkModel(NetworkMixinModel):
     timeout = db.Column(db.Integer(), nullable=False, default=3)
     polling_interval_runtime = db.Column(db.Integer(), default=2)
     point_interval_ms_between_points = db.Column(db.Integer(), default=30)
+    tcp_pool_size = db.Column(db.Integer(), nullable=False, default=1)
+    tcp_max_in_flight = db.Column(db.Integer())
+    tcp_pipeline_depth = db.Column(db.Integer(), nullable=False, default=1)
+    write_refresh_period = db.Column(db.Integer(), nullable=False, default=60)
+    read_refresh_period = db.Column(db.Integer(), nullable=False, default=60)
 
     __table_args__ = (
         UniqueConstraint('tcp_ip', 'tcp_port'),
@@ -44,3 +49,41 @@ class ModbusNetworkModel(NetworkMixinModel):
             if not self.tcp_port:
                 raise ValueError("tcp_port should be be there on type TCP")
         return value
+
+    @validates('tcp_pool_size')
+    def validate_tcp_pool_size(self, _, value):
+        if value is None:
+            return 1
+        if value < 1 or value > 32:
+            raise ValueError("tcp_pool_size should be in between 1 and 32, it defaults to 1")
+        return value
+
+    @validates('tcp_max_in_flight')
+    def validate_tcp_max_in_flight(self, _, value):
+        if value is not None and value < 1:
+            raise ValueError("tcp_max_in_flight should be at least 1, it defaults to tcp_pool_size")
+        return value
+
+    @validates('tcp_pipeline_depth')
+    def validate_tcp_pipeline_depth(self, _, value):
+        if value is None:
+            return 1
+        if value < 1 or value > 16:
+            raise ValueError("tcp_pipeline_depth should be in between 1 and 16, it defaults to 1 (no pipelining)")
+        return value
+
+    @validates('write_refresh_period')
+    def validate_write_refresh_period(self, _, value):
+        if value is None:
+            return 60
+        if value < 0:
+            raise ValueError("write_refresh_period should be at least 0 (write on every poll), it defaults to 60")
+        return value
+
+    @validates('read_refresh_period')
+    def validate_read_refresh_period(self, _, value):
+        if value is None:
+            return 60
+        if value < 0:
+            raise ValueError("read_refresh_period should be at least 0 (process every response), it defaults to 60")
+        return value
@@ -18,10 +18,15 @@ class ModbusPointModel(PointMixinModel):
     data_endian = db.Column(db.Enum(ModbusDataEndian), nullable=False, default=ModbusDataEndian.BEB_LEW)
     modbus_device_uuid_constraint = db.Column(db.String, nullable=False)
     write_value_once = db.Column(db.Boolean(), nullable=False, default=False)
+    poll_interval_ms = db.Column(db.Integer())
+    bit_offset = db.Column(db.Integer(), nullable=False, default=0)
+    bit_length = db.Column(db.Integer(), nullable=False, default=1)
     mp_gbp_mapping = db.relationship('MPGBPMapping', backref='point', lazy=True, uselist=False, cascade="all,delete")
 
     __table_args__ = (
-        UniqueConstraint('register', 'function_code', 'modbus_device_uuid_constraint'),
+        # points may share registers, e.g. a register as INT16 and as bit fields, they are read once for all of them
+        UniqueConstraint('register', 'function_code', 'data_type', 'bit_offset', 'bit_length',
+                         'modbus_device_uuid_constraint'),
     )
 
     @classmethod
@@ -78,6 +83,24 @@ class ModbusPointModel(PointMixinModel):
             raise ValueError('Invalid register length')
         return value
 
+    @validates('poll_interval_ms')
+    def validate_poll_interval_ms(self, _, value):
+        if value is not None and value < 1:
+            raise ValueError('poll_interval_ms should be at least 1, it defaults to the network polling interval')
+        return value
+
+    @validates('bit_offset')
+    def validate_bit_offset(self, _, value):
+        if value is not None and (value < 0 or value > 15):
+            raise ValueError('Invalid bit offset, it should be in between 0 and 15')
+        return value
+
+    @validates('bit_length')
+    def validate_bit_length(self, _, value):
+        if value is not None and (value < 1 or value > 16):
+            raise ValueError('Invalid bit length, it should be in between 1 and 16')
+        return value
+
     @validates('data_type')
     def validate_data_type(self, _, value):
         if isinstance(value, ModbusDataType):
@@ -128,6 +151,15 @@ class ModbusPointModel(PointMixinModel):
         if data_type == ModbusDataType.FLOAT or data_type == ModbusDataType.INT32 or \
                 data_type == ModbusDataType.UINT32:
             self.register_length = 2
+        elif data_type == ModbusDataType.DOUBLE:
+            self.register_length = 4
+        elif data_type == ModbusDataType.BITS:
+            if point_fc != ModbusFunctionCode.READ_HOLDING_REGISTERS and \
+                    point_fc != ModbusFunctionCode.READ_INPUT_REGISTERS:
+                raise ValueError(f'BITS data type is not supported for {point_fc}, only for register reads')
+            if (self.bit_offset or 0) + (self.bit_length or 1) > 16:
+                raise ValueError('Bit field should fit in a register, bit_offset + bit_length is at most 16')
+            self.register_length = 1
 
         return True
 
@@ -0,0 +1,26 @@
+from typing import List
+
+from rubix_http.exceptions.exception import NotFoundException
+from rubix_http.resource import RubixResource
+
+from src.drivers.modbus.models.device import ModbusDeviceModel
+from src.drivers.modbus.models.network import ModbusNetworkModel
+from src.drivers.modbus.models.point import ModbusPointModel
+from src.drivers.modbus.services.polling.plan_report import ModbusPollPlanReport
+from src.drivers.modbus.services.polling.poll_plan import ModbusDevicePollPlan
+
+
+class ModbusDevicePlanResource(RubixResource):
+    """
+    Dry run of the requests the polling sends for the enabled points of the device, with the estimated cycle time.
+    Nothing is sent to the device.
+    """
+
+    @classmethod
+    def get(cls, uuid: str):
+        device: ModbusDeviceModel = ModbusDeviceModel.find_by_uuid(uuid)
+        if not device:
+            raise NotFoundException('Modbus Device not found')
+        network: ModbusNetworkModel = ModbusNetworkModel.find_by_uuid(device.network_uuid)
+        points: List[ModbusPointModel] = ModbusPointModel.query.filter_by(device_uuid=device.uuid, enable=True).all()
+        return ModbusPollPlanReport(network, device, ModbusDevicePollPlan(device, points)).to_dict()
@@ -2,6 +2,7 @@ from flask_restful.reqparse import request
 
 from src.drivers.modbus.models.device import ModbusDeviceModel
 from src.drivers.modbus.resources.device.device_base import ModbusDeviceBase, modbus_device_marshaller
+from src.drivers.modbus.resources.device.device_probe import probe_device, is_probe_requested
 
 
 class ModbusDevicePlural(ModbusDeviceBase):
@@ -11,5 +12,11 @@ class ModbusDevicePlural(ModbusDeviceBase):
 
     @classmethod
     def post(cls):
+        """
+        ?probe=true probes the read capabilities of the device once it is created
+        """
         data = ModbusDevicePlural.parser.parse_args()
-        return modbus_device_marshaller(cls.add_device(data), request.args)
+        device: ModbusDeviceModel = cls.add_device(data)
+        if is_probe_requested(request.args):
+            device = probe_device(device.uuid)
+        return modbus_device_marshaller(device, request.args)
@@ -0,0 +1,44 @@
+from distutils.util import strtobool
+
+from flask_restful.reqparse import request
+from rubix_http.exceptions.exception import BadDataException, NotFoundException
+from rubix_http.resource import RubixResource
+
+from src.drivers.enums.drivers import Drivers
+from src.drivers.modbus.models.device import ModbusDeviceModel
+from src.drivers.modbus.resources.device.device_base import modbus_device_marshaller
+from src.drivers.modbus.services.polling.modbus_polling import ModbusPolling
+from src.event_dispatcher import EventDispatcher
+from src.services.event_service_base import EventCallableBlocking
+
+
+def probe_device(device_uuid: str) -> ModbusDeviceModel:
+    """
+    Probes the read capabilities of the device on its polling service, and waits for them
+    """
+    event = EventCallableBlocking(ModbusPolling.probe_device, (device_uuid,))
+    EventDispatcher().dispatch_to_source_only(event, Drivers.MODBUS.name)
+    event.condition.wait()
+    if event.error:
+        raise Exception(str(event.data))
+    return event.data
+
+
+def is_probe_requested(args: dict) -> bool:
+    try:
+        return bool(strtobool(args.get('probe', 'false')))
+    except ValueError:
+        raise BadDataException('Invalid query string')
+
+
+class ModbusDeviceProbeResource(RubixResource):
+    """
+    Probes the max request length per read function code and the gap reads of the device, the learned capabilities
+    are stored on it for the poll planner
+    """
+
+    @classmethod
+    def post(cls, uuid: str):
+        if not ModbusDeviceModel.find_by_uuid(uuid):
+            raise NotFoundException('Modbus Device not found')
+        return modbus_device_marshaller(probe_device(uuid), request.args)
@@ -9,10 +9,11 @@ from src.drivers.modbus.models.mapping import MPGBPMapping
 from src.drivers.modbus.resources.rest_schema.schema_modbus_mapping import mapping_mp_gbp_attributes, \
     mapping_mp_gbp_all_fields
 from src.models.point.model_point_store import PointStoreModel
+from src.services.point_value_store import PointValueStore
 
 
 def sync_point_value(mapping: MPGBPMapping):
-    point_store: PointStoreModel = PointStoreModel.find_by_point_uuid(mapping.modbus_point_uuid)
+    point_store: PointStoreModel = PointValueStore().get(mapping.modbus_point_uuid)
     point_store.sync_point_value_with_mapping_mp_to_gbp(mapping.generic_point_uuid, mapping.bacnet_point_uuid)
     return mapping
 
@@ -5,7 +5,6 @@ from src.drivers.modbus.models.point import ModbusPointModel
 from src.drivers.modbus.resources.point.point_base import ModbusPointBase
 from src.drivers.modbus.resources.rest_schema.schema_modbus_point import modbus_point_all_fields, \
     modbus_point_all_attributes
-from src.models.point.priority_array import PriorityArrayModel
 
 
 class ModbusPointSingular(ModbusPointBase):
@@ -41,7 +40,7 @@ class ModbusPointSingular(ModbusPointBase):
     def update_point(cls, data: dict, point: ModbusPointModel) -> ModbusPointModel:
         priority_array_write: dict = data.pop('priority_array_write') if data.get('priority_array_write') else {}
         if priority_array_write:
-            PriorityArrayModel.filter_by_point_uuid(point.uuid).update(priority_array_write)
+            point.write_priority_array(value=None, priority=None, priority_array_write=priority_array_write)
         return point.update(**data)
 
     @classmethod
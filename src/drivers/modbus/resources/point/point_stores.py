@@ -3,6 +3,7 @@ from typing import List
 from src.drivers.modbus.models.point import ModbusPointModel
 from src.drivers.modbus.resources.point.point_base import ModbusPointBase
 from src.models.point.model_point_store import PointStoreModel
+from src.services.point_value_store import PointValueStore
 
 
 # TODO: move all to base point_store resource
@@ -15,18 +16,18 @@ class ModbusPointPluralPointStore(ModbusPointBase):
         for point in points:
             if point.device_uuid not in serialized_output:
                 serialized_output[point.device_uuid] = []
-            serialized_output[point.device_uuid].append(get_point_store(point, point.point_store))
+            serialized_output[point.device_uuid].append(get_point_store(point, PointValueStore().get(point.uuid)))
         return serialized_output
 
 
 class ModbusPointStore(ModbusPointBase):
     @classmethod
     def get(cls, uuid):
-        point_store: PointStoreModel = PointStoreModel.find_by_point_uuid(uuid)
+        point: ModbusPointModel = ModbusPointModel.find_by_uuid(uuid)
+        point_store: PointStoreModel = PointValueStore().get(uuid) if point else None
         if point_store is None:
             return {}
         else:
-            point: ModbusPointModel = ModbusPointModel.find_by_uuid(uuid)
             return get_point_store(point, point_store)
 
 
@@ -36,7 +37,7 @@ class ModbusDevicePointPluralPointStore(ModbusPointBase):
         points: List[ModbusPointModel] = ModbusPointModel.filter_by_device_uuid(device_uuid)
         serialized_output = []
         for point in points:
-            serialized_output.append(get_point_store(point, point.point_store))
+            serialized_output.append(get_point_store(point, PointValueStore().get(point.uuid)))
         return serialized_output
 
 
@@ -1,10 +1,18 @@
 from abc import abstractmethod
 
+from flask import current_app
 from flask_restful import reqparse
 from rubix_http.exceptions.exception import NotFoundException, BadDataException
 from rubix_http.resource import RubixResource
 
+from src import AppSetting
+from src.drivers.enums.drivers import Drivers
+from src.drivers.modbus.enums.network.network import ModbusType
+from src.drivers.modbus.models.device import ModbusDeviceModel
 from src.drivers.modbus.models.point import ModbusPointModel
+from src.drivers.modbus.services.polling.modbus_polling import ModbusPolling
+from src.event_dispatcher import EventDispatcher
+from src.services.event_service_base import EventCallableBlocking
 
 
 class ModbusPointValueWriterBase(RubixResource):
@@ -29,6 +37,13 @@ class ModbusPointValueWriterBase(RubixResource):
         point.update_priority_value(value=data.get('value'),
                                     priority=data.get('priority'),
                                     priority_array_write=data.get('priority_array_write'))
+        if point.is_writable(point.function_code) and _is_driver_enabled(point):
+            # written on the bus straight away, by the driver of the point's network type
+            event = EventCallableBlocking(ModbusPolling.write_point, (point.uuid,))
+            EventDispatcher().dispatch_to_source_only(event, Drivers.MODBUS.name)
+            event.condition.wait()
+            if event.error:
+                raise Exception(str(event.data))
         return {}
 
 
@@ -43,3 +58,14 @@ class ModbusPointNameValueWriter(ModbusPointValueWriterBase):
     def get_point(cls, **kwargs) -> ModbusPointModel:
         return ModbusPointModel.find_by_name(kwargs.get('network_name'), kwargs.get('device_name'),
                                              kwargs.get('point_name'))
+
+
+def _is_driver_enabled(point: ModbusPointModel) -> bool:
+    """
+    Whether the polling driver of the point's network type runs, which is the one answering its write
+    """
+    device: ModbusDeviceModel = ModbusDeviceModel.find_by_uuid(point.device_uuid)
+    setting: AppSetting = current_app.config[AppSetting.KEY]
+    if device.type is ModbusType.TCP:
+        return setting.drivers.modbus_tcp
+    return setting.drivers.modbus_rtu
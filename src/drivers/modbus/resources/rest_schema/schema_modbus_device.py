@@ -15,6 +15,27 @@ modbus_device_all_attributes['ping_point'] = {
 modbus_device_all_attributes['supports_multiple_rw'] = {
     'type': bool,
 }
+modbus_device_all_attributes['max_gap'] = {
+    'type': int,
+}
+modbus_device_all_attributes['max_registers_per_request'] = {
+    'type': int,
+}
+modbus_device_all_attributes['probed_max_coils'] = {
+    'type': int,
+}
+modbus_device_all_attributes['probed_max_discrete_inputs'] = {
+    'type': int,
+}
+modbus_device_all_attributes['probed_max_holding_registers'] = {
+    'type': int,
+}
+modbus_device_all_attributes['probed_max_input_registers'] = {
+    'type': int,
+}
+modbus_device_all_attributes['probed_gap_reads'] = {
+    'type': bool,
+}
 
 modbus_device_return_attributes = deepcopy(device_return_attributes)
 modbus_device_return_attributes['type'] = {
@@ -41,6 +41,21 @@ modbus_network_all_attributes['polling_interval_runtime'] = {
 modbus_network_all_attributes['point_interval_ms_between_points'] = {
     'type': int,
 }
+modbus_network_all_attributes['tcp_pool_size'] = {
+    'type': int,
+}
+modbus_network_all_attributes['tcp_max_in_flight'] = {
+    'type': int,
+}
+modbus_network_all_attributes['tcp_pipeline_depth'] = {
+    'type': int,
+}
+modbus_network_all_attributes['write_refresh_period'] = {
+    'type': int,
+}
+modbus_network_all_attributes['read_refresh_period'] = {
+    'type': int,
+}
 
 modbus_network_return_attributes = deepcopy(network_return_attributes)
 
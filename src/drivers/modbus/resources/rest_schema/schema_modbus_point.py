@@ -31,6 +31,15 @@ modbus_point_all_attributes['data_endian'] = {
 modbus_point_all_attributes['write_value_once'] = {
     'type': bool,
 }
+modbus_point_all_attributes['poll_interval_ms'] = {
+    'type': int,
+}
+modbus_point_all_attributes['bit_offset'] = {
+    'type': int,
+}
+modbus_point_all_attributes['bit_length'] = {
+    'type': int,
+}
 
 
 modbus_poll_non_existing_attributes = {
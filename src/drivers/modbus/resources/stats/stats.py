@@ -0,0 +1,19 @@
+from flask_restful.reqparse import request
+from rubix_http.resource import RubixResource
+
+from src.drivers.modbus.services.polling.poll_stats import ModbusPollStats
+
+
+class ModbusPollStatsResource(RubixResource):
+    """
+    Poll statistics by network uuid, ?network_uuid=<uuid> narrows them down to a single network
+    """
+
+    @classmethod
+    def get(cls):
+        return ModbusPollStats().get_stats(request.args.get('network_uuid'))
+
+    @classmethod
+    def delete(cls):
+        ModbusPollStats().reset(request.args.get('network_uuid'))
+        return '', 204
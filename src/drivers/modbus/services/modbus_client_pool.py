@@ -0,0 +1,80 @@
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from threading import Lock, Event
+from typing import List, Dict, Tuple
+
+from pymodbus.client.sync import BaseModbusClient
+
+from src.drivers.modbus.enums.network.network import ModbusRequestPriority
+
+logger = logging.getLogger(__name__)
+
+
+class ModbusClientPool:
+    """
+    Fixed size pool of clients (sockets or serial port) of a bus, which is the request queue of the bus.
+    A client is used by one request at a time, and at most max_in_flight requests are executed at once over the
+    whole pool, so a gateway is not flooded with more requests than it can serve.
+    Waiting requests are served by priority, writes first then manual polls then cyclic polls, and in order of
+    arrival within a priority.
+    """
+
+    def __init__(self, clients: List[BaseModbusClient], max_in_flight: int = None, frame_spacing: float = 0):
+        """
+        :param frame_spacing: silent time in seconds a client keeps in between two requests (RTU inter-frame delay)
+        """
+        self.clients: List[BaseModbusClient] = clients
+        self.size: int = len(clients)
+        self.max_in_flight: int = min(max_in_flight or self.size, self.size)
+        self.frame_spacing: float = frame_spacing
+        self.__lock: Lock = Lock()
+        self.__idle_clients: List[BaseModbusClient] = list(clients)
+        self.__in_flight: int = 0
+        self.__waiters: List[Tuple[ModbusRequestPriority, int, list]] = []
+        self.__sequence = itertools.count()
+        self.__frame_ends: Dict[int, float] = {}
+
+    @contextmanager
+    def acquire(self, priority: ModbusRequestPriority = ModbusRequestPriority.CYCLIC) -> BaseModbusClient:
+        client: BaseModbusClient = self.__take(priority)
+        try:
+            self.__wait_frame_spacing(client)
+            yield client
+        finally:
+            self.__frame_ends[id(client)] = time.time()
+            self.__give(client)
+
+    def close(self):
+        for client in self.clients:
+            client.close()
+
+    def __take(self, priority: ModbusRequestPriority) -> BaseModbusClient:
+        with self.__lock:
+            if self.__in_flight < self.max_in_flight and not self.__waiters:
+                self.__in_flight += 1
+                return self.__idle_clients.pop()
+            # [event, client handed over by __give]
+            waiter: list = [Event(), None]
+            heapq.heappush(self.__waiters, (priority, next(self.__sequence), waiter))
+        waiter[0].wait()
+        return waiter[1]
+
+    def __give(self, client: BaseModbusClient):
+        with self.__lock:
+            if self.__waiters:
+                _, _, waiter = heapq.heappop(self.__waiters)
+                waiter[1] = client
+                waiter[0].set()
+            else:
+                self.__in_flight -= 1
+                self.__idle_clients.append(client)
+
+    def __wait_frame_spacing(self, client: BaseModbusClient):
+        if self.frame_spacing <= 0:
+            return
+        silence: float = self.__frame_ends.get(id(client), 0) + self.frame_spacing - time.time()
+        if silence > 0:
+            time.sleep(silence)
@@ -6,6 +6,7 @@ from typing import Dict
 from pymodbus.client.sync import BaseModbusClient
 
 from src.drivers.modbus.enums.network.network import ModbusType
+from src.drivers.modbus.services.modbus_client_pool import ModbusClientPool
 from src.drivers.modbus.models.network import ModbusNetworkModel
 from src.utils import Singleton
 
@@ -28,9 +29,10 @@ class ModbusRegistryKey:
 
 
 class ModbusRegistryConnection:
-    def __init__(self, connection_key: str, client: BaseModbusClient):
+    def __init__(self, connection_key: str, client: BaseModbusClient, pool: ModbusClientPool = None):
         self.connection_key: str = connection_key
         self.client: BaseModbusClient = client
+        self.pool: ModbusClientPool = pool or ModbusClientPool([client])
         self.is_running: bool = False
 
 
@@ -83,7 +85,7 @@ class ModbusRegistry(metaclass=Singleton):
         logger.debug(f'Removing rtu_connection {key}')
         connection: ModbusRegistryConnection = self.connections.get(key)
         if connection:
-            connection.client.close()
+            connection.pool.close()
             del self.connections[key]
 
     @abstractmethod
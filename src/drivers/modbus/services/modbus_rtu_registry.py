@@ -1,10 +1,11 @@
 import logging
 
-from pymodbus.client.sync import ModbusSerialClient as SerialClient
-
+from src.drivers.modbus.enums.network.network import ModbusRtuParity
 from src.drivers.modbus.models.network import ModbusNetworkModel, ModbusType
+from src.drivers.modbus.services.modbus_client_pool import ModbusClientPool
 from src.drivers.modbus.services.modbus_registry import ModbusRegistry, ModbusRegistryConnection, \
     ModbusRegistryKey
+from src.drivers.modbus.services.modbus_serial_client import ModbusThreadSerialClient
 
 logger = logging.getLogger(__name__)
 
@@ -40,10 +41,13 @@ class ModbusRtuRegistry(ModbusRegistry):
         self.remove_connection_if_exist(registry_key.key)
         logger.debug(f'Adding rtu_connection {registry_key.key}')
 
+        client = ModbusThreadSerialClient(method=method, port=port, baudrate=rtu_speed, stopbits=rtu_stop_bits,
+                                          parity=rtu_parity, bytesize=rtu_byte_size, timeout=timeout, retries=0,
+                                          retry_on_empty=False)
         self.connections[registry_key.key] = ModbusRegistryConnection(
             registry_key.connection_key,
-            SerialClient(method=method, port=port, baudrate=rtu_speed, stopbits=rtu_stop_bits,
-                         parity=rtu_parity, bytesize=rtu_byte_size, timeout=timeout, retries=0, retry_on_empty=False)
+            client,
+            ModbusClientPool([client], frame_spacing=get_rtu_frame_spacing(network))
         )
         self.connections[registry_key.key].client.connect()
         return self.connections[registry_key.key]
@@ -53,3 +57,22 @@ class ModbusRtuRegistry(ModbusRegistry):
 
     def get_type(self) -> ModbusType:
         return ModbusType.RTU
+
+
+def get_rtu_frame_spacing(network: ModbusNetworkModel) -> float:
+    """
+    Inter-frame delay of the serial line in seconds, 3.5 character times.
+    It is fixed to 1.75ms above 19200 baud, as per the Modbus over serial line specification.
+    """
+    if (network.rtu_speed or 9600) > 19200:
+        return 0.00175
+    return 3.5 * get_rtu_character_time(network)
+
+
+def get_rtu_character_time(network: ModbusNetworkModel) -> float:
+    """
+    Seconds a character (byte) takes on the serial line, start, data, parity and stop bits
+    """
+    parity_bits: int = 0 if network.rtu_parity in (None, ModbusRtuParity.N) else 1
+    character_bits: int = 1 + (network.rtu_byte_size or 8) + parity_bits + (network.rtu_stop_bits or 1)
+    return character_bits / (network.rtu_speed or 9600)
@@ -0,0 +1,29 @@
+from gevent import get_hub
+from gevent.threadpool import ThreadPool
+from pymodbus.client.sync import ModbusSerialClient
+
+
+class ModbusThreadSerialClient(ModbusSerialClient):
+    """
+    Serial client which opens the port and executes the requests on a native thread of its own.
+    The port calls (open, ioctl and termios of USB adapters, reads and writes) never hold the gevent hub, the polling
+    greenlet waits for the thread instead, and the REST requests and the other networks are served meanwhile.
+    The port is driven by that one thread, the requests of the bus stay serialised.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__thread_pool: ThreadPool = ThreadPool(1)
+
+    def connect(self):
+        # pymodbus reconnects from within execute, the calls made on the thread itself run right away
+        return self.__thread_pool.apply(super().connect)
+
+    def execute(self, request=None):
+        return self.__thread_pool.apply(super().execute, (request,))
+
+    def close(self):
+        super().close()
+        if get_hub() is self.__thread_pool.hub:
+            # the idle thread is stopped, the next request starts it again
+            self.__thread_pool.size = 0
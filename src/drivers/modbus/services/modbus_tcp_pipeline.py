@@ -0,0 +1,81 @@
+import logging
+import select
+import time
+from typing import Dict, List, Union
+
+from pymodbus.client.sync import ModbusTcpClient
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+from pymodbus.pdu import ModbusRequest, ModbusResponse
+
+logger = logging.getLogger(__name__)
+
+
+class ModbusTcpPipeline:
+    """
+    Sends up to depth requests back to back on the socket of a synchronous tcp client, and then matches the
+    responses to them by the MBAP transaction id, so the round trip time is paid once per batch instead of once per
+    request.
+    A request without a response within the client timeout gets a ModbusIOException as its response, same as the
+    client.execute does.
+    The round trip times of the responses are kept in rtts, from the send of their batch to their own response.
+    """
+
+    def __init__(self, client: ModbusTcpClient, depth: int):
+        self.__client: ModbusTcpClient = client
+        self.__depth: int = max(depth, 1)
+        self.rtts: List[Union[float, None]] = []
+
+    def execute(self, requests: List[ModbusRequest]) -> List[Union[ModbusResponse, ModbusIOException]]:
+        if not self.__client.connect():
+            raise ConnectionException(f'Failed to connect[{str(self.__client)}]')
+        responses: Dict[int, ModbusResponse] = {}
+        rtts: Dict[int, float] = {}
+        for i in range(0, len(requests), self.__depth):
+            pending: Dict[int, ModbusRequest] = {}
+            for request in requests[i:i + self.__depth]:
+                request.transaction_id = self.__client.transaction.getNextTID()
+                pending[request.transaction_id] = request
+            self.__client.framer.resetFrame()
+            try:
+                # pymodbus leaves the socket non-blocking after a read
+                self.__client.socket.settimeout(self.__client.timeout)
+                self.__client.socket.sendall(b''.join(self.__client.framer.buildPacket(request)
+                                                      for request in pending.values()))
+            except OSError as e:
+                self.__client.close()
+                raise ConnectionException(f'Failed to send to {str(self.__client)}: {str(e)}')
+            self.__receive(pending, responses, rtts, time.monotonic())
+        self.rtts = [rtts.get(request.transaction_id) for request in requests]
+        return [responses.get(request.transaction_id) or
+                ModbusIOException(f'No response received for transaction {request.transaction_id} within '
+                                  f'{self.__client.timeout} seconds') for request in requests]
+
+    def __receive(self, pending: Dict[int, ModbusRequest], responses: Dict[int, ModbusResponse],
+                  rtts: Dict[int, float], sent: float):
+        def callback(response: ModbusResponse):
+            if pending.pop(response.transaction_id, None) is not None:
+                responses[response.transaction_id] = response
+                rtts[response.transaction_id] = time.monotonic() - sent
+            else:
+                logger.debug(f'Dropping response of unknown transaction {response.transaction_id}')
+
+        end: float = time.time() + self.__client.timeout
+        while pending:
+            remaining: float = end - time.time()
+            if remaining <= 0 or not select.select([self.__client.socket], [], [], remaining)[0]:
+                logger.warning(f'Pipeline timeout, {len(pending)} requests pending on {str(self.__client)}')
+                self.__client.framer.resetFrame()
+                return
+            try:
+                data: bytes = self.__client.socket.recv(4096)
+            except OSError as e:
+                self.__client.close()
+                raise ConnectionException(f'Failed to receive from {str(self.__client)}: {str(e)}')
+            if not data:
+                self.__client.close()
+                raise ConnectionException(f'Connection unexpectedly closed by {str(self.__client)}')
+            try:
+                self.__client.framer.processIncomingPacket(data, callback, unit=0, single=True)
+            except ModbusIOException as e:
+                logger.error(f'Pipeline dropping invalid frame: {str(e)}')
+                self.__client.framer.resetFrame()
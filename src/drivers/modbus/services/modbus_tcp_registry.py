@@ -3,6 +3,7 @@ import logging
 from pymodbus.client.sync import ModbusTcpClient
 
 from src.drivers.modbus.models.network import ModbusNetworkModel, ModbusType
+from src.drivers.modbus.services.modbus_client_pool import ModbusClientPool
 from src.drivers.modbus.services.modbus_registry import ModbusRegistryKey, ModbusRegistry, \
     ModbusRegistryConnection
 
@@ -11,7 +12,8 @@ logger = logging.getLogger(__name__)
 
 class ModbusTcpRegistryKey(ModbusRegistryKey):
     def create_connection_key(self) -> str:
-        return f'{self.network.tcp_ip}:{self.network.tcp_port}:{self.network.timeout}'
+        return f'{self.network.tcp_ip}:{self.network.tcp_port}:{self.network.timeout}:' \
+               f'{self.network.tcp_pool_size}:{self.network.tcp_max_in_flight}'
 
 
 class ModbusTcpRegistry(ModbusRegistry):
@@ -20,13 +22,14 @@ class ModbusTcpRegistry(ModbusRegistry):
         host: str = network.tcp_ip
         port: int = network.tcp_port
         timeout: int = network.timeout
+        pool_size: int = network.tcp_pool_size or 1
         registry_key: ModbusTcpRegistryKey = ModbusTcpRegistryKey(network)
         self.remove_connection_if_exist(registry_key.key)
         logger.debug(f'Adding tcp_connection {registry_key.key}')
-        self.connections[registry_key.key] = ModbusRegistryConnection(
-            registry_key.connection_key,
-            ModbusTcpClient(host=host, port=port, timeout=timeout)
-        )
+        pool = ModbusClientPool([ModbusTcpClient(host=host, port=port, timeout=timeout) for _ in range(pool_size)],
+                                network.tcp_max_in_flight)
+        self.connections[registry_key.key] = ModbusRegistryConnection(registry_key.connection_key, pool.clients[0],
+                                                                      pool)
         return self.connections[registry_key.key]
 
     def get_registry_key(self, network: ModbusNetworkModel) -> ModbusRegistryKey:
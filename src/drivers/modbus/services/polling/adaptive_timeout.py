@@ -0,0 +1,83 @@
+import math
+from collections import deque
+from threading import Lock
+from typing import Deque, Dict, List, Union
+
+from pymodbus.client.sync import BaseModbusClient, ModbusSerialClient
+
+from src.utils import Singleton
+
+
+class ModbusDeviceTimeout:
+    """
+    Request timeout of a device, RESPONSE_FACTOR times the p99 of its last SAMPLE_SIZE response times, in between
+    MIN_TIMEOUT and the timeout of its network.
+    The network timeout is used until the device has answered SAMPLE_MIN requests.
+    """
+    SAMPLE_SIZE = 100
+    SAMPLE_MIN = 10
+    RESPONSE_FACTOR = 3
+    MIN_TIMEOUT = 0.1
+
+    def __init__(self):
+        self.__rtts: Deque[float] = deque(maxlen=self.SAMPLE_SIZE)
+        self.__p99: Union[float, None] = None
+
+    def add(self, rtt: float):
+        self.__rtts.append(rtt)
+        self.__p99 = None
+
+    def get(self, network_timeout: float) -> float:
+        if len(self.__rtts) < self.SAMPLE_MIN:
+            return network_timeout
+        if self.__p99 is None:
+            rtts: List[float] = sorted(self.__rtts)
+            self.__p99 = rtts[min(int(len(rtts) * 0.99), len(rtts) - 1)]
+        # rounded up to 10ms, so the serial port is not reconfigured on each small change
+        timeout: float = math.ceil(round(self.__p99 * self.RESPONSE_FACTOR * 100, 6)) / 100
+        return min(max(timeout, self.MIN_TIMEOUT), network_timeout)
+
+
+class ModbusDeviceTimeouts(metaclass=Singleton):
+    """
+    Adaptive request timeouts by device_uuid.
+    A request without response is retried RETRIES times at the adaptive timeout before the device is faulted, a lost
+    frame then costs a fast retry instead of the network timeout.
+    """
+    RETRIES = 1
+
+    def __init__(self):
+        self.__timeouts: Dict[str, ModbusDeviceTimeout] = {}
+        self.__lock = Lock()
+
+    def add(self, device_uuid: Union[str, None], rtt: float):
+        if device_uuid is None:
+            return
+        with self.__lock:
+            device_timeout: Union[ModbusDeviceTimeout, None] = self.__timeouts.get(device_uuid)
+            if device_timeout is None:
+                device_timeout = self.__timeouts[device_uuid] = ModbusDeviceTimeout()
+            device_timeout.add(rtt)
+
+    def get(self, device_uuid: Union[str, None], network_timeout: float) -> float:
+        with self.__lock:
+            device_timeout: Union[ModbusDeviceTimeout, None] = self.__timeouts.get(device_uuid)
+            return device_timeout.get(network_timeout) if device_timeout else network_timeout
+
+    def reset(self, device_uuid: str = None):
+        with self.__lock:
+            if device_uuid is None:
+                self.__timeouts.clear()
+            else:
+                self.__timeouts.pop(device_uuid, None)
+
+
+def set_client_timeout(client: BaseModbusClient, timeout: float):
+    """
+    Sets the response timeout of a synchronous client, the serial port read timeout along with it
+    """
+    if client.timeout == timeout:
+        return
+    client.timeout = timeout
+    if isinstance(client, ModbusSerialClient) and client.socket:
+        client.socket.timeout = timeout
@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import time
+from typing import List, Union
+
+from pymodbus.client.asynchronous.async_io import AsyncioModbusTcpClient
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+from sqlalchemy.orm.exc import ObjectDeletedError
+
+from src import db, FlaskThread
+from src.drivers.modbus.enums.device.device import ModbusCircuitState
+from src.drivers.modbus.models.device import ModbusDeviceModel
+from src.drivers.modbus.models.network import ModbusNetworkModel
+from src.drivers.modbus.models.point import ModbusPointModel
+from src.drivers.modbus.services.modbus_registry import ModbusRegistryConnection
+from src.drivers.modbus.services.polling.adaptive_timeout import ModbusDeviceTimeouts
+from src.drivers.modbus.services.polling.circuit_breaker import ModbusDeviceCircuitBreaker
+from src.drivers.modbus.services.polling.poll import ModbusPollTransaction, ModbusPointStoreBatch
+from src.drivers.modbus.services.polling.poll_plan import ModbusNetworkPollPlan, ModbusDevicePollPlan, \
+    ModbusPollGroup
+from src.drivers.modbus.services.polling.poll_stats import ModbusPollStats
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTcpPollingEngine:
+    """
+    Polls every TCP network as a coroutine on one asyncio event loop, instead of one thread per network.
+    Devices of a network are polled concurrently over a pool of tcp_pool_size sockets.
+    Point grouping, COV events and fault flags are shared with the ModbusPolling service which owns this engine.
+    """
+
+    def __init__(self, polling):
+        self.__polling = polling
+        self.__loop = asyncio.new_event_loop()
+        FlaskThread(target=self.__run_loop, daemon=True).start()
+
+    def __run_loop(self):
+        asyncio.set_event_loop(self.__loop)
+        # cached poll plans keep their models loaded across commits, changes get reloaded by the model events
+        db.session().expire_on_commit = False
+        logger.info('TCP: asyncio polling engine started')
+        self.__loop.run_forever()
+
+    def start_network_polling(self, current_connection: ModbusRegistryConnection, network: ModbusNetworkModel):
+        current_connection.is_running = True
+        asyncio.run_coroutine_threadsafe(self.__poll_network(current_connection, network.uuid), self.__loop)
+
+    async def __poll_network(self, current_connection: ModbusRegistryConnection, network_uuid: str):
+        logger.debug(f'TCP: Starting coroutine for network {network_uuid}')
+        clients: List[AsyncioModbusTcpClient] = []
+        network_plan: ModbusNetworkPollPlan = self.__polling.create_network_poll_plan(network_uuid)
+        try:
+            while True:
+                network: Union[ModbusNetworkModel, None] = network_plan.get_network()
+                if not network:
+                    logger.debug(f'TCP: Stopping coroutine for network {network_uuid}, network not found')
+                    break
+                if self.__polling.get_registry().get_connection(network) is not current_connection:
+                    # connection has been removed or re-created with new details, which starts its own coroutine
+                    logger.debug(f'TCP: Stopping coroutine for network {network_uuid}, connection changed')
+                    break
+                try:
+                    clients = await self.__connect(clients, network)
+                    await self.__poll_network_devices(clients, network_plan)
+                    db.session.commit()
+                except Exception as e:
+                    logger.error(f'TCP: {str(e)}')
+                await asyncio.sleep(network_plan.get_sleep_time())
+        finally:
+            self.__polling.remove_network_poll_plan(network_plan)
+            for client in clients:
+                client.stop()
+
+    async def __connect(self, clients: List[AsyncioModbusTcpClient],
+                        network: ModbusNetworkModel) -> List[AsyncioModbusTcpClient]:
+        """
+        Opens the pool of tcp_pool_size sockets to the network, reconnecting the dropped ones
+        """
+        clients = clients[:network.tcp_pool_size or 1]
+        while len(clients) < (network.tcp_pool_size or 1):
+            clients.append(_create_client(network, self.__loop))
+        for client in clients:
+            if client.connected:
+                continue
+            try:
+                await asyncio.wait_for(client.connect(), network.timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f'TCP: Connection timeout to {network.tcp_ip}:{network.tcp_port}')
+        return clients
+
+    async def __poll_network_devices(self, clients: List[AsyncioModbusTcpClient],
+                                     network_plan: ModbusNetworkPollPlan):
+        """
+        Devices are polled concurrently, spread over the pool sockets, with at most tcp_max_in_flight requests
+        awaiting their responses at once
+        """
+        network: ModbusNetworkModel = network_plan.get_network()
+        pipeline_depth: int = network.tcp_pipeline_depth or 1
+        in_flight = asyncio.Semaphore(network.tcp_max_in_flight or len(clients) * pipeline_depth)
+        start: float = time.time()
+        due_polls = network_plan.get_due_polls(start)
+        await asyncio.gather(*[self.__poll_device(clients[i % len(clients)], in_flight, network, *due_poll)
+                               for i, due_poll in enumerate(due_polls)])
+        if due_polls:
+            ModbusPollStats().add_cycle(network.uuid, time.time() - start, network_plan.get_interval_seconds(None))
+
+    async def __poll_device(self, client: AsyncioModbusTcpClient, in_flight: asyncio.Semaphore,
+                            network: ModbusNetworkModel, device: ModbusDeviceModel,
+                            device_plan: ModbusDevicePollPlan, groups: List[ModbusPollGroup]):
+        """
+        Groups are pipelined, the protocol matches the responses to the requests by their transaction id
+        """
+        circuit_breaker: ModbusDeviceCircuitBreaker = self.__polling.get_circuit_breaker(device.uuid)
+        if not circuit_breaker.allow(time.time()):
+            return
+        responded: Union[bool, None] = None
+        if circuit_breaker.state is ModbusCircuitState.HALF_OPEN:
+            # the responses of the points tell the device is online, the ping point only probes a half open circuit
+            try:
+                responded = await self.__ping_point(client, in_flight, network, device)
+            except ConnectionException:
+                return
+            if responded is False:
+                # we suppose that device is offline, so we are not wasting time for looping
+                self.__polling.update_circuit_breaker(device, False)
+                return
+        elif device.ping_point and not self.__polling.get_ping_point(device):
+            return
+        device_plan.refresh_priority_arrays()
+        pipeline_depth: int = network.tcp_pipeline_depth or 1
+        # point stores of the device are written in one transaction
+        batch = ModbusPointStoreBatch(self.__polling, network, device)
+        try:
+            for i in range(0, len(groups), pipeline_depth):
+                results = await asyncio.gather(*[self.__poll_group(client, in_flight, network, device, group, batch)
+                                                 for group in groups[i:i + pipeline_depth]],
+                                               return_exceptions=True)
+                if any(isinstance(result, ConnectionException) for result in results):
+                    return
+                for result in results:
+                    if isinstance(result, Exception):
+                        raise result
+                batch_responded: List[bool] = [result for result in results if result is not None]
+                if batch_responded:
+                    responded = responded or any(batch_responded)
+                    if not any(batch_responded):
+                        # the device went offline, the rest of the requests would wait for their timeouts too
+                        self.__polling.update_circuit_breaker(device, bool(responded))
+                        return
+                if i + pipeline_depth < len(groups):
+                    await asyncio.sleep(float(network.point_interval_ms_between_points) / 1000)
+            if responded is not None:
+                self.__polling.update_circuit_breaker(device, responded)
+        finally:
+            batch.flush()
+
+    async def __ping_point(self, client: AsyncioModbusTcpClient, in_flight: asyncio.Semaphore,
+                           network: ModbusNetworkModel, device: ModbusDeviceModel) -> Union[bool, None]:
+        """
+        :return: whether the device has answered the ping, None when there is no ping point to probe with
+        """
+        ping_point: Union[ModbusPointModel, None] = self.__polling.get_ping_point(device)
+        if ping_point:
+            transaction = ModbusPollTransaction(device, [ping_point], False)
+            try:
+                await self.__execute(client, in_flight, network, transaction)
+            except ConnectionException as e:
+                self.__polling.update_fault_flags(network, device, e)
+                raise
+            except ModbusIOException as e:
+                self.__polling.update_fault_flags(network, device, e)
+                return False if transaction.no_response else None
+            self.__polling.update_fault_flags(network, device, None)
+            return True
+        elif device.ping_point:
+            return False
+        return None
+
+    async def __poll_group(self, client: AsyncioModbusTcpClient, in_flight: asyncio.Semaphore,
+                           network: ModbusNetworkModel, device: ModbusDeviceModel, group: ModbusPollGroup,
+                           batch: ModbusPointStoreBatch) -> Union[bool, None]:
+        """
+        :return: whether the device has answered the request, None when no request has been sent
+        """
+        point_list: List[ModbusPointModel] = self.__polling.filter_due_writes(group.points,
+                                                                              network.write_refresh_period)
+        if len(point_list) == 0:
+            return None
+        try:
+            transaction = ModbusPollTransaction(device, point_list, group=group)
+            error = None
+            try:
+                await self.__execute(client, in_flight, network, transaction, batch, ModbusDeviceTimeouts.RETRIES)
+            except (ConnectionException, ModbusIOException) as e:
+                error = e
+            self.__polling.update_fault_flags(network, device, error)
+            if isinstance(error, ConnectionException):
+                raise error
+            return not transaction.no_response
+        except ObjectDeletedError:
+            return None
+
+    async def __execute(self, client: AsyncioModbusTcpClient, in_flight: asyncio.Semaphore,
+                        network: ModbusNetworkModel, transaction: ModbusPollTransaction,
+                        batch: ModbusPointStoreBatch = None, retries: int = 0):
+        timeout: float = ModbusDeviceTimeouts().get(transaction.device.uuid, network.timeout)
+        async with in_flight:
+            await transaction.execute_async(self.__get_protocol(client), timeout, retries)
+        transaction.store(self.__polling, network, batch)
+
+    @staticmethod
+    def __get_protocol(client: AsyncioModbusTcpClient):
+        if not client.connected or not client.protocol:
+            raise ConnectionException(f'Failed to connect[{client.host}:{client.port}]')
+        return client.protocol
+
+
+def _create_client(network: ModbusNetworkModel, loop: asyncio.AbstractEventLoop) -> AsyncioModbusTcpClient:
+    """
+    The asyncio client has no timeout of its own, network.timeout is applied to the connect and to each request with
+    asyncio.wait_for
+    """
+    return AsyncioModbusTcpClient(host=network.tcp_ip, port=network.tcp_port, loop=loop)
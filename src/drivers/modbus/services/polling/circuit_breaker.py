@@ -0,0 +1,53 @@
+from typing import Union
+
+from src.drivers.modbus.enums.device.device import ModbusCircuitState
+
+
+class ModbusDeviceCircuitBreaker:
+    """
+    Stops polling an offline device, so it doesn't cost a request timeout on each cycle of the network:
+        - CLOSED: polled on each cycle, FAILURE_THRESHOLD consecutive polls without any response open it
+        - OPEN: skipped until its backoff elapses, the backoff doubles on each failed probe up to MAX_BACKOFF
+        - HALF_OPEN: polled once as a probe, a response closes it, otherwise it opens again
+    Any response counts, a modbus exception response is still a live device.
+    """
+    FAILURE_THRESHOLD = 2
+    MIN_BACKOFF = 5
+    MAX_BACKOFF = 300
+
+    def __init__(self):
+        self.state: ModbusCircuitState = ModbusCircuitState.CLOSED
+        self.failures: int = 0
+        self.backoff: float = 0
+        self.retry_at: float = 0
+
+    def allow(self, now: float) -> bool:
+        if self.state is ModbusCircuitState.OPEN and now >= self.retry_at:
+            self.state = ModbusCircuitState.HALF_OPEN
+        return self.state is not ModbusCircuitState.OPEN
+
+    def record(self, responded: bool, now: float) -> bool:
+        """
+        :param responded: whether the device answered any request of its poll
+        :return: whether the state (or the backoff of the open state) has changed
+        """
+        previous_state: ModbusCircuitState = self.state
+        if responded:
+            self.state = ModbusCircuitState.CLOSED
+            self.failures = 0
+            self.backoff = 0
+            return previous_state is not self.state
+        self.failures += 1
+        if self.state is ModbusCircuitState.HALF_OPEN or self.failures >= self.FAILURE_THRESHOLD:
+            self.backoff = min(self.backoff * 2, self.MAX_BACKOFF) if self.backoff else self.MIN_BACKOFF
+            self.retry_at = now + self.backoff
+            self.state = ModbusCircuitState.OPEN
+            return True
+        return False
+
+    @property
+    def fault_message(self) -> Union[str, None]:
+        if self.state is ModbusCircuitState.CLOSED:
+            return None
+        return f'circuit {self.state.name.lower()} after {self.failures} polls without response, ' \
+               f'next probe in {self.backoff:g}s'
@@ -0,0 +1,132 @@
+import logging
+from typing import Callable, Dict, List, Tuple, Union
+
+from pymodbus.client.sync import BaseModbusClient
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ModbusResponse, ExceptionResponse
+
+from src.drivers.modbus.enums.point.points import ModbusFunctionCode, ModbusDataType, ModbusDataEndian
+from src.drivers.modbus.models.device import ModbusDeviceModel
+from src.drivers.modbus.models.point import ModbusPointModel
+from src.drivers.modbus.services.polling.functions import prepare_read_analogue, prepare_read_digital
+from src.drivers.modbus.services.polling.poll_plan import MODBUS_MAX_REQUEST_LENGTH, PROBED_MAX_LENGTH_ATTRIBUTES, \
+    coalesce_points
+
+logger = logging.getLogger(__name__)
+
+ReadProbe = Callable[[int, int], bool]
+
+
+def find_max_length(read: ReadProbe, register: int, max_length: int) -> int:
+    """
+    Binary search of the longest read from the register which the device accepts, 0 when it rejects a single one.
+    A device which accepts a length is taken to accept the shorter ones too.
+    """
+    if not read(register, 1):
+        return 0
+    low: int = 1
+    high: int = max_length
+    while low < high:
+        length: int = (low + high + 1) // 2
+        if read(register, length):
+            low = length
+        else:
+            high = length - 1
+    return low
+
+
+def find_gap_reads(read: ReadProbe, spans: List[Tuple[int, int]], max_length: int) -> Union[bool, None]:
+    """
+    Whether the device accepts a read across the unpolled registers in between two continuous spans of points.
+    The shortest gap is read along with the registers at both its ends, the read has to fit in max_length so a
+    rejection is down to the gap only.
+    :param spans: (register, register_length) of the continuous spans of points, sorted by register
+    :return: None when the spans have no gap which fits in a read
+    """
+    reads: List[Tuple[int, int]] = [(start + length - 1, next_start - start - length + 2)
+                                    for (start, length), (next_start, _) in zip(spans, spans[1:])]
+    reads = [(register, length) for register, length in reads if length <= max_length]
+    if not reads:
+        return None
+    register, length = min(reads, key=lambda r: r[1])
+    return read(register, length)
+
+
+class ModbusDeviceProbe:
+    """
+    Learns the max request length of each read function code of a device, and whether it accepts reads across
+    unpolled registers, so the poll planner can aggregate the reads without faulting the groups on a bad guess.
+    Only reads are sent, the function codes are probed from the start of the longest continuous span of their points
+    (the first register of the device for the ones without points).
+    """
+
+    def __init__(self, client: BaseModbusClient, device: ModbusDeviceModel, points: List[ModbusPointModel]):
+        self.__client: BaseModbusClient = client
+        self.__device: ModbusDeviceModel = device
+        self.__points: List[ModbusPointModel] = points
+        self.requests: int = 0
+        self.responses: int = 0
+
+    def probe(self) -> Dict[str, Union[int, bool, None]]:
+        """
+        Raises ModbusIOException when the device doesn't answer any request, the last capabilities are kept then
+        :return: the probed device attributes
+        """
+        capabilities: Dict[str, Union[int, bool, None]] = {}
+        gap_reads: List[bool] = []
+        for function_code, attribute in PROBED_MAX_LENGTH_ATTRIBUTES.items():
+            points: List[ModbusPointModel] = [point for point in self.__points if point.function_code is function_code]
+            spans: List[Tuple[int, int]] = self.__get_spans(points)
+            read: ReadProbe = self.__create_read(function_code)
+            # the longest span has mapped registers behind its start, whether the device rejects the gaps or not
+            register: int = max(spans, key=lambda s: s[1])[0] if spans else 0 if self.__device.zero_based else 1
+            max_length: int = find_max_length(read, register, MODBUS_MAX_REQUEST_LENGTH[function_code])
+            capabilities[attribute] = max_length or None
+            if max_length:
+                gap_read: Union[bool, None] = find_gap_reads(read, spans, max_length)
+                if gap_read is not None:
+                    gap_reads.append(gap_read)
+            logger.info(f'Probed device {self.__device.uuid} FC {function_code.name}: max length {max_length}')
+        if not self.responses:
+            raise ModbusIOException(f'Device {self.__device.uuid} not responding to the probe')
+        # a device which rejects a gap of any function code is taken to reject them all
+        capabilities['probed_gap_reads'] = all(gap_reads) if gap_reads else None
+        return capabilities
+
+    def __create_read(self, function_code: ModbusFunctionCode) -> ReadProbe:
+        def read(register: int, length: int) -> bool:
+            """
+            True when the device answers the read in full, False on an exception response or a request left
+            without response (some devices drop the requests they can't serve).
+            """
+            if not self.__device.zero_based:
+                register -= 1
+            if function_code in (ModbusFunctionCode.READ_COILS, ModbusFunctionCode.READ_DISCRETE_INPUTS):
+                request, _ = prepare_read_digital(register, length, self.__device.address, function_code)
+            else:
+                request, _ = prepare_read_analogue(register, length, self.__device.address, ModbusDataType.RAW,
+                                                   ModbusDataEndian.BEB_LEW, function_code)
+            self.requests += 1
+            response: ModbusResponse = self.__client.execute(request)
+            if not isinstance(response, ModbusIOException):
+                self.responses += 1
+            return _is_accepted(response, length)
+
+        return read
+
+    @staticmethod
+    def __get_spans(points: List[ModbusPointModel]) -> List[Tuple[int, int]]:
+        spans: List[Tuple[int, int]] = []
+        for group in coalesce_points(points, 0, 65536):
+            start: int = group[0].register
+            spans.append((start, max(point.register + point.register_length for point in group) - start))
+        return spans
+
+
+def _is_accepted(response: ModbusResponse, length: int) -> bool:
+    if response is None or isinstance(response, (ModbusIOException, ExceptionResponse)):
+        return False
+    if hasattr(response, 'registers'):
+        return len(response.registers) >= length
+    # bits are padded up to whole bytes
+    return len(getattr(response, 'bits', [])) >= length
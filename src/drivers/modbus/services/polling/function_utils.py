@@ -1,11 +1,11 @@
-from typing import List
+import struct
+from functools import lru_cache
+from typing import List, Union
 
 from pymodbus.constants import Endian
-from pymodbus.payload import BinaryPayloadDecoder, BinaryPayloadBuilder
+from pymodbus.payload import BinaryPayloadBuilder
 
 from src.drivers.modbus.enums.point.points import ModbusDataEndian, ModbusDataType
-from src.drivers.modbus.models.point import ModbusPointModel
-from src.models.point.priority_array import PriorityArrayModel
 
 
 def _set_data_length(data_type: ModbusDataType, reg_length: int) -> int:
@@ -18,6 +18,8 @@ def _set_data_length(data_type: ModbusDataType, reg_length: int) -> int:
         return reg_length
     elif data_type == ModbusDataType.DIGITAL or data_type == ModbusDataType.INT16 or data_type == ModbusDataType.UINT16:
         return reg_length if reg_length >= 1 else 1
+    elif data_type == ModbusDataType.BITS:
+        return 1
     elif data_type == ModbusDataType.INT32 or data_type == ModbusDataType.UINT32 or data_type == ModbusDataType.FLOAT:
         return reg_length if reg_length >= 2 else 2
     elif data_type == ModbusDataType.DOUBLE:
@@ -62,22 +64,108 @@ def convert_to_data_type(data, data_type: ModbusDataType, byteorder: Endian, wor
     Converts the data to int, int32, float and so on
     :return: value in the selected data type
     """
-    decoder = BinaryPayloadDecoder.fromRegisters(data, byteorder=byteorder,
-                                                 wordorder=word_order)
-    value = None
-    if data_type == ModbusDataType.INT16:
-        value = decoder.decode_16bit_int()
-    if data_type == ModbusDataType.UINT16:
-        value = decoder.decode_16bit_uint()
-    if data_type == ModbusDataType.INT32:
-        value = decoder.decode_32bit_int()
-    if data_type == ModbusDataType.UINT32:
-        value = decoder.decode_32bit_uint()
-    if data_type == ModbusDataType.FLOAT:
-        value = decoder.decode_32bit_float()
-    elif data_type == ModbusDataType.DOUBLE:
-        value = decoder.decode_16bit_float()
-    return value
+    decoder: Union[RegisterDecoder, None] = get_register_decoder(data_type, _get_data_endian(byteorder, word_order))
+    if decoder is None:
+        return None
+    return decoder.decode(PackedRegisters(data), 0)
+
+
+class PackedRegisters:
+    """
+    Registers of a response packed once, so all the point values are unpacked straight from the bytes:
+        - big: registers in big endian, as they are on the wire
+        - little: bytes of every register swapped
+    """
+
+    __slots__ = ('big', 'little')
+
+    def __init__(self, registers: List[int]):
+        self.big: bytes = struct.pack(f'>{len(registers)}H', *registers)
+        self.little: bytes = struct.pack(f'<{len(registers)}H', *registers)
+
+
+class RegisterDecoder:
+    """
+    Compiled decoder of a data type and data endian, decoding as the pymodbus BinaryPayloadDecoder.fromRegisters:
+        - little endian byte order swaps the bytes of every register
+        - little endian word order reverses the registers of 32 and 64 bit values, which is same as reading the
+          registers with their bytes swapped (once more) as a little endian value
+    """
+
+    __slots__ = ('register_length', '__struct', '__little')
+
+    def __init__(self, data_type: ModbusDataType, data_endian: ModbusDataEndian):
+        fmt, self.register_length = _DATA_TYPE_FORMATS[data_type]
+        byteorder, word_order = _mod_point_data_endian(data_endian)
+        reversed_words: bool = self.register_length > 1 and word_order == Endian.Little
+        self.__little: bool = (byteorder == Endian.Little) != reversed_words
+        self.__struct: struct.Struct = struct.Struct(f'{"<" if reversed_words else ">"}{fmt}')
+
+    def decode(self, registers: PackedRegisters, offset: int):
+        """
+        :param registers: packed registers of the response
+        :param offset: register offset of the value in the response
+        """
+        return self.__struct.unpack_from(registers.little if self.__little else registers.big, offset * 2)[0]
+
+
+class BitFieldDecoder:
+    """
+    Compiled decoder of an unsigned bit field of a register, bit 0 is the least significant bit of the UINT16 value
+    """
+
+    __slots__ = ('register_length', '__register', '__bit_offset', '__mask')
+
+    def __init__(self, data_endian: ModbusDataEndian, bit_offset: int, bit_length: int):
+        self.register_length: int = 1
+        self.__register: RegisterDecoder = RegisterDecoder(ModbusDataType.UINT16, data_endian)
+        self.__bit_offset: int = bit_offset
+        self.__mask: int = (1 << bit_length) - 1
+
+    def decode(self, registers: PackedRegisters, offset: int) -> int:
+        return self.__register.decode(registers, offset) >> self.__bit_offset & self.__mask
+
+
+_DATA_TYPE_FORMATS = {
+    ModbusDataType.INT16: ('h', 1),
+    ModbusDataType.UINT16: ('H', 1),
+    ModbusDataType.INT32: ('i', 2),
+    ModbusDataType.UINT32: ('I', 2),
+    ModbusDataType.FLOAT: ('f', 2),
+    ModbusDataType.DOUBLE: ('d', 4),
+}
+
+
+@lru_cache(maxsize=None)
+def get_register_decoder(data_type: ModbusDataType, data_endian: ModbusDataEndian) -> Union[RegisterDecoder, None]:
+    """
+    :return: shared decoder, None for the RAW and DIGITAL data types which are not decoded
+    """
+    if data_type not in _DATA_TYPE_FORMATS:
+        return None
+    return RegisterDecoder(data_type, data_endian)
+
+
+@lru_cache(maxsize=None)
+def get_bit_field_decoder(data_endian: ModbusDataEndian, bit_offset: int, bit_length: int) -> BitFieldDecoder:
+    return BitFieldDecoder(data_endian, bit_offset, bit_length)
+
+
+def get_point_decoder(point) -> Union[RegisterDecoder, BitFieldDecoder, None]:
+    """
+    :param point: ModbusPointModel
+    :return: shared decoder of the point value
+    """
+    if point.data_type is ModbusDataType.BITS:
+        return get_bit_field_decoder(point.data_endian, point.bit_offset or 0, point.bit_length or 1)
+    return get_register_decoder(point.data_type, point.data_endian)
+
+
+def _get_data_endian(byteorder: Endian, word_order: Endian) -> ModbusDataEndian:
+    for data_endian in ModbusDataEndian:
+        if _mod_point_data_endian(data_endian) == (byteorder, word_order):
+            return data_endian
+    raise ValueError(f'Invalid byte order {byteorder} and word order {word_order}')
 
 
 def _builder_data_type(payload, data_type: ModbusDataType, byteorder: Endian, word_order: Endian):
@@ -99,13 +187,3 @@ def _builder_data_type(payload, data_type: ModbusDataType, byteorder: Endian, wo
     elif data_type == ModbusDataType.DOUBLE:
         builder.add_64bit_float(payload)
     return builder.to_registers()
-
-
-def pack_point_write_registers(point_list: List[ModbusPointModel]):
-    final_payload = []
-    for point in point_list:
-        byteorder, word_order = _mod_point_data_endian(point.data_endian)
-        write_value: float = PriorityArrayModel.get_highest_priority_value_from_priority_array(
-            point.priority_array_write) or 0
-        final_payload.extend(_builder_data_type(write_value, point.data_type, byteorder, word_order))
-    return final_payload
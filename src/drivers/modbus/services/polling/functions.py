@@ -1,97 +1,114 @@
 import logging
-from typing import List
+from typing import List, Callable, Tuple, Union
 
-from pymodbus.bit_write_message import WriteSingleCoilResponse
+from pymodbus.bit_read_message import ReadCoilsRequest, ReadDiscreteInputsRequest
+from pymodbus.bit_write_message import WriteSingleCoilResponse, WriteSingleCoilRequest, WriteMultipleCoilsRequest
 from pymodbus.client.sync import BaseModbusClient
 from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ModbusRequest, ModbusResponse
+from pymodbus.register_read_message import ReadHoldingRegistersRequest, ReadInputRegistersRequest
+from pymodbus.register_write_message import WriteSingleRegisterRequest, WriteMultipleRegistersRequest
 
 from src.drivers.modbus.enums.point.points import ModbusFunctionCode, ModbusDataType, ModbusDataEndian
 from src.drivers.modbus.services.polling.function_utils import _set_data_length, _assertion, \
-    _mod_point_data_endian, convert_to_data_type, _builder_data_type
+    _mod_point_data_endian, _builder_data_type, get_register_decoder, PackedRegisters, RegisterDecoder, \
+    BitFieldDecoder
 
 logger = logging.getLogger(__name__)
 
+"""
+Every modbus operation is split in two halves:
+    - prepare_<operation>: builds the pymodbus request and the handler for its response
+    - <operation>: executes the request on a synchronous client and handles the response
+Async clients execute the prepared request themselves and reuse the same handler.
+"""
+ResponseHandler = Callable[[ModbusResponse], Tuple[any, list]]
 
-def read_analogue(client: BaseModbusClient, reg_start: int, reg_length: int, _unit: int, data_type: ModbusDataType,
-                  endian: ModbusDataEndian, func: ModbusFunctionCode) -> (any, list):
+
+def prepare_read_analogue(reg_start: int, reg_length: int, _unit: int, data_type: ModbusDataType,
+                          endian: ModbusDataEndian, func: ModbusFunctionCode,
+                          decoder: Union[RegisterDecoder, BitFieldDecoder] = None) -> (ModbusRequest, ResponseHandler):
     """
-    Read holding or input register
-    :param client: modbus client
-    :param reg_start: modbus client
-    :param reg_length: modbus client
-    :param _unit: modbus address as an int
-    :param data_type: data type int, float
-    :param endian: data type endian
-    :param func: modbus function type
-    :return: tuple (val: any, array: list)
+    :param decoder: decoder of the value, the one of the data type when None (bit fields need their own)
     """
     debug_log('read_analogue', _unit, func, reg_length, reg_start)
     reg_length: int = _set_data_length(data_type, reg_length)
     if func == ModbusFunctionCode.READ_HOLDING_REGISTERS:
-        read = client.read_holding_registers(reg_start, reg_length, unit=_unit)
+        request = ReadHoldingRegistersRequest(reg_start, reg_length, unit=_unit)
     elif func == ModbusFunctionCode.READ_INPUT_REGISTERS:
-        read = client.read_input_registers(reg_start, reg_length, unit=_unit)
+        request = ReadInputRegistersRequest(reg_start, reg_length, unit=_unit)
     else:
         raise Exception('Invalid Modbus function code', func)
 
-    if not _assertion(read):
-        assertion_ok_debug_log()
+    if decoder is None:
+        decoder = get_register_decoder(data_type, endian)
+
+    def handler(read: ModbusResponse) -> (any, list):
+        __raise_on_error(read)
         if data_type is not ModbusDataType.RAW:
-            byteorder, word_order = _mod_point_data_endian(endian)
-            val = convert_to_data_type(read.registers, data_type, byteorder, word_order)
+            val = decoder.decode(PackedRegisters(read.registers), 0) if decoder else None
         else:
             val = read.registers[0]
         return val, read.registers
-    else:
-        if not isinstance(read, ModbusIOException):
-            read = ModbusIOException(read)
-        raise read
 
+    return request, handler
 
-def read_digital(client: BaseModbusClient, reg_start: int, reg_length: int, _unit: int, func: ModbusFunctionCode) -> (
-        any, list):
+
+def read_analogue(client: BaseModbusClient, reg_start: int, reg_length: int, _unit: int, data_type: ModbusDataType,
+                  endian: ModbusDataEndian, func: ModbusFunctionCode) -> (any, list):
     """
-    Read coil or digital input register
+    Read holding or input register
     :param client: modbus client
     :param reg_start: modbus client
     :param reg_length: modbus client
     :param _unit: modbus address as an int
+    :param data_type: data type int, float
+    :param endian: data type endian
     :param func: modbus function type
     :return: tuple (val: any, array: list)
     """
+    request, handler = prepare_read_analogue(reg_start, reg_length, _unit, data_type, endian, func)
+    return handler(client.execute(request))
+
+
+def prepare_read_digital(reg_start: int, reg_length: int, _unit: int,
+                         func: ModbusFunctionCode) -> (ModbusRequest, ResponseHandler):
     debug_log('read_digital', _unit, func, reg_length, reg_start)
     reg_length: int = _set_data_length(ModbusDataType.DIGITAL, reg_length)
     if func == ModbusFunctionCode.READ_COILS:
-        read = client.read_coils(reg_start, reg_length, unit=_unit)
+        request = ReadCoilsRequest(reg_start, reg_length, unit=_unit)
     elif func == ModbusFunctionCode.READ_DISCRETE_INPUTS:
-        read = client.read_discrete_inputs(reg_start, reg_length, unit=_unit)
+        request = ReadDiscreteInputsRequest(reg_start, reg_length, unit=_unit)
     else:
         raise Exception('Invalid Modbus function code', func)
 
-    if not _assertion(read):
-        assertion_ok_debug_log()
+    def handler(read: ModbusResponse) -> (any, list):
+        __raise_on_error(read)
         for ind in range(len(read.bits)):
             read.bits[ind] = int(read.bits[ind])
         val = read.bits[0]
         return val, read.bits[0:reg_length]
-    else:
-        if not isinstance(read, ModbusIOException):
-            read = ModbusIOException(read)
-        raise read
 
+    return request, handler
 
-def write_digital(client: BaseModbusClient, reg_start: int, reg_length: int, _unit: int, write_values: List[float],
-                  func: ModbusFunctionCode) -> (any, list):
+
+def read_digital(client: BaseModbusClient, reg_start: int, reg_length: int, _unit: int, func: ModbusFunctionCode) -> (
+        any, list):
     """
-    Write coil
+    Read coil or digital input register
     :param client: modbus client
     :param reg_start: modbus client
     :param reg_length: modbus client
     :param _unit: modbus address as an int
-    :param write_values: List[float] of values to write to coils
     :param func: modbus function type
     :return: tuple (val: any, array: list)
     """
+    request, handler = prepare_read_digital(reg_start, reg_length, _unit, func)
+    return handler(client.execute(request))
+
+
+def prepare_write_digital(reg_start: int, reg_length: int, _unit: int, write_values: List[float],
+                          func: ModbusFunctionCode) -> (ModbusRequest, ResponseHandler):
     debug_log('write_digital', _unit, func, reg_length, reg_start)
     data_type: ModbusDataType = ModbusDataType.DIGITAL
     reg_length: int = _set_data_length(data_type, reg_length)
@@ -101,87 +118,123 @@ def write_digital(client: BaseModbusClient, reg_start: int, reg_length: int, _un
         write_values_[i] = int(write_values[i])
 
     if func == ModbusFunctionCode.WRITE_COIL:
-        write = client.write_coil(reg_start, int(write_values_[0]), unit=_unit)
+        request = WriteSingleCoilRequest(reg_start, int(write_values_[0]), unit=_unit)
     elif func == ModbusFunctionCode.WRITE_COILS:
         if len(write_values_) == 1:
             write_values_ = [write_values_[0]] * reg_length
         elif len(write_values_) != reg_length:
             raise Exception('Invalid WRITE_COILS (multiple) write_values length')
-        write = client.write_coils(reg_start, write_values_, unit=_unit)
+        request = WriteMultipleCoilsRequest(reg_start, write_values_, unit=_unit)
     else:
         raise Exception('Invalid Modbus function code', func)
 
-    if not _assertion(write):
-        assertion_ok_debug_log()
+    def handler(write: ModbusResponse) -> (any, list):
+        __raise_on_error(write)
         if isinstance(write, WriteSingleCoilResponse):
             return int(write.value), [int(write.value)]
         else:
             return write_values_[0], write_values_
-    else:
-        if not isinstance(write, ModbusIOException):
-            write = ModbusIOException(write)
-        raise write
 
+    return request, handler
 
-def write_analogue(client: BaseModbusClient, reg_start: int, reg_length: int, _unit: int, data_type: ModbusDataType,
-                   endian: ModbusDataEndian, write_value: float, func: ModbusFunctionCode) -> (any, list):
+
+def write_digital(client: BaseModbusClient, reg_start: int, reg_length: int, _unit: int, write_values: List[float],
+                  func: ModbusFunctionCode) -> (any, list):
     """
-    Write holding reg
+    Write coil
     :param client: modbus client
     :param reg_start: modbus client
     :param reg_length: modbus client
     :param _unit: modbus address as an int
-    :param data_type: data type int, float
-    :param endian: data type endian
-    :param write_value: value to write to register
+    :param write_values: List[float] of values to write to coils
     :param func: modbus function type
     :return: tuple (val: any, array: list)
     """
+    request, handler = prepare_write_digital(reg_start, reg_length, _unit, write_values, func)
+    return handler(client.execute(request))
+
+
+def prepare_write_analogue(reg_start: int, reg_length: int, _unit: int, data_type: ModbusDataType,
+                           endian: ModbusDataEndian, write_value: float,
+                           func: ModbusFunctionCode, payload: List[int] = None) -> (ModbusRequest, ResponseHandler):
+    """
+    :param payload: already encoded registers of the write_value for WRITE_REGISTERS
+    """
     debug_log('write_analogue', _unit, func, reg_length, reg_start)
     byteorder, word_order = _mod_point_data_endian(endian)
     if func == ModbusFunctionCode.WRITE_REGISTER:
         payload = int(write_value)
-        write = client.write_register(reg_start, payload, unit=_unit)
+        request = WriteSingleRegisterRequest(reg_start, payload, unit=_unit)
     elif func == ModbusFunctionCode.WRITE_REGISTERS:
-        payload = _builder_data_type(write_value, data_type, byteorder, word_order)
-        write = client.write_registers(reg_start, payload, unit=_unit)
+        if payload is None:
+            payload = _builder_data_type(write_value, data_type, byteorder, word_order)
+        request = WriteMultipleRegistersRequest(reg_start, payload, unit=_unit)
     else:
         raise Exception('Invalid Modbus function code', func)
 
-    if not _assertion(write):
-        assertion_ok_debug_log()
+    def handler(write: ModbusResponse) -> (any, list):
+        __raise_on_error(write)
         return write_value, payload
-    else:
-        if not isinstance(write, ModbusIOException):
-            write = ModbusIOException(write)
-        raise write
 
+    return request, handler
 
-def write_analogue_aggregate(client: BaseModbusClient, reg_start: int, reg_length: int, _unit: int, payload,
-                             func: ModbusFunctionCode) -> (any, list):
+
+def write_analogue(client: BaseModbusClient, reg_start: int, reg_length: int, _unit: int, data_type: ModbusDataType,
+                   endian: ModbusDataEndian, write_value: float, func: ModbusFunctionCode) -> (any, list):
     """
     Write holding reg
     :param client: modbus client
     :param reg_start: modbus client
     :param reg_length: modbus client
     :param _unit: modbus address as an int
-    :param payload: packed values
+    :param data_type: data type int, float
+    :param endian: data type endian
+    :param write_value: value to write to register
     :param func: modbus function type
     :return: tuple (val: any, array: list)
     """
+    request, handler = prepare_write_analogue(reg_start, reg_length, _unit, data_type, endian, write_value, func)
+    return handler(client.execute(request))
+
+
+def prepare_write_analogue_aggregate(reg_start: int, reg_length: int, _unit: int, payload,
+                                     func: ModbusFunctionCode) -> (ModbusRequest, ResponseHandler):
     debug_log('write_analogue_aggregate', _unit, func, reg_length, reg_start)
     if func == ModbusFunctionCode.WRITE_REGISTERS:
-        write = client.write_registers(reg_start, payload, unit=_unit)
+        request = WriteMultipleRegistersRequest(reg_start, payload, unit=_unit)
     else:
         raise Exception('Invalid Modbus function code', func)
 
-    if not _assertion(write):
-        assertion_ok_debug_log()
+    def handler(write: ModbusResponse) -> (any, list):
+        __raise_on_error(write)
         return None, payload
-    else:
-        if not isinstance(write, ModbusIOException):
-            write = ModbusIOException(write)
-        raise write
+
+    return request, handler
+
+
+def write_analogue_aggregate(client: BaseModbusClient, reg_start: int, reg_length: int, _unit: int, payload,
+                             func: ModbusFunctionCode) -> (any, list):
+    """
+    Write holding reg
+    :param client: modbus client
+    :param reg_start: modbus client
+    :param reg_length: modbus client
+    :param _unit: modbus address as an int
+    :param payload: packed values
+    :param func: modbus function type
+    :return: tuple (val: any, array: list)
+    """
+    request, handler = prepare_write_analogue_aggregate(reg_start, reg_length, _unit, payload, func)
+    return handler(client.execute(request))
+
+
+def __raise_on_error(response: ModbusResponse):
+    if not _assertion(response):
+        assertion_ok_debug_log()
+        return
+    if not isinstance(response, ModbusIOException):
+        response = ModbusIOException(response)
+    raise response
 
 
 def debug_log(function, _unit, fc, reg_length, reg_start):
@@ -2,26 +2,42 @@ import logging
 import time
 from abc import abstractmethod
 from copy import deepcopy
-from typing import Union, List
+from threading import Event as ThreadingEvent
+from typing import Union, List, Dict
 
+from flask import current_app
+from gevent.pool import Pool
 from pymodbus.client.sync import BaseModbusClient
 from pymodbus.exceptions import ConnectionException, ModbusIOException
 from sqlalchemy.orm.exc import ObjectDeletedError
 
-from src import db, FlaskThread
+from src import db, FlaskThread, AppSetting
 from src.drivers.enums.drivers import Drivers
-from src.drivers.modbus.enums.point.points import ModbusFunctionCode
+from src.drivers.modbus.enums.device.device import ModbusCircuitState
 from src.drivers.modbus.models.device import ModbusDeviceModel
+from src.drivers.modbus.enums.network.network import ModbusRequestPriority
 from src.drivers.modbus.models.network import ModbusNetworkModel, ModbusType
 from src.drivers.modbus.models.point import ModbusPointModel
+from src.drivers.modbus.services.modbus_client_pool import ModbusClientPool
 from src.drivers.modbus.services.modbus_registry import ModbusRegistryConnection, ModbusRegistry
 from src.drivers.modbus.services.modbus_rtu_registry import ModbusRtuRegistry
 from src.drivers.modbus.services.modbus_tcp_registry import ModbusTcpRegistry, ModbusTcpRegistryKey
-from src.drivers.modbus.services.polling.poll import poll_point, poll_point_aggregate
+from src.drivers.modbus.services.polling.adaptive_timeout import ModbusDeviceTimeouts, set_client_timeout
+from src.drivers.modbus.services.polling.circuit_breaker import ModbusDeviceCircuitBreaker
+from src.drivers.modbus.services.polling.device_probe import ModbusDeviceProbe
+from src.drivers.modbus.services.polling.poll import poll_point, poll_point_aggregate, ModbusPollTransaction, \
+    ModbusDevicePoll, ModbusPointStoreBatch
+from src.drivers.modbus.services.polling.poll_plan import ModbusNetworkPollPlan, ModbusDevicePollPlan, \
+    ModbusPollGroup, get_model_uuid
+from src.drivers.modbus.services.polling.poll_stats import ModbusPollStats
+from src.drivers.modbus.services.polling.write_cache import ModbusWriteCache
 from src.event_dispatcher import EventDispatcher
+from src.models.device.model_device import DeviceModel
+from src.models.point.model_point import PointModel
 from src.models.point.model_point_store import PointStoreModel
 from src.models.point.priority_array import PriorityArrayModel
 from src.services.event_service_base import EventServiceBase, EventType, HandledByDifferentServiceException, Event
+from src.services.point_value_store import PointValueStore
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +51,13 @@ class ModbusPolling(EventServiceBase):
         self.__network_type = network_type
         self.supported_events[EventType.INTERNAL_SERVICE_TIMEOUT] = True
         self.supported_events[EventType.CALLABLE] = True
+        self.supported_events[EventType.POINT_MODEL] = True
+        self.supported_events[EventType.DEVICE_MODEL] = True
+        self.supported_events[EventType.NETWORK_MODEL] = True
+        self.__network_poll_plans: Dict[str, ModbusNetworkPollPlan] = {}
+        self.__circuit_breakers: Dict[str, ModbusDeviceCircuitBreaker] = {}
         EventDispatcher().add_driver(self)
+        EventDispatcher().add_service(self)
 
     def polling(self):
         self._set_internal_service_timeout(1)
@@ -47,6 +69,8 @@ class ModbusPolling(EventServiceBase):
                 self._set_internal_service_timeout(ModbusPolling.__polling_interval)
             elif event.event_type is EventType.CALLABLE:
                 self._handle_internal_callable(event)
+            elif event.event_type in (EventType.POINT_MODEL, EventType.DEVICE_MODEL, EventType.NETWORK_MODEL):
+                self.__invalidate_poll_plans(event)
             else:
                 self._handle_internal_callable(event)
 
@@ -69,151 +93,203 @@ class ModbusPolling(EventServiceBase):
     def __poll_network(self, network: ModbusNetworkModel):
         current_connection: ModbusRegistryConnection = self.get_registry().add_edit_and_get_connection(network)
         if not current_connection.is_running:
-            FlaskThread(target=self.__poll_network_thread, daemon=True,
-                        kwargs={'network': network}).start()
+            self._start_network_polling(current_connection, network)
 
-    def __poll_network_thread(self, network: ModbusNetworkModel):
+    def _start_network_polling(self, current_connection: ModbusRegistryConnection, network: ModbusNetworkModel):
+        current_connection.is_running = True
+        FlaskThread(target=self.__poll_network_thread, daemon=True,
+                    kwargs={'current_connection': current_connection, 'network': network}).start()
+
+    def __poll_network_thread(self, current_connection: ModbusRegistryConnection, network: ModbusNetworkModel):
         """
         Poll connection points on a thread
         """
         self.__log_debug(f'Starting thread for {network}')
+        # cached poll plans keep their models loaded across commits, changes get reloaded by the model events
+        db.session().expire_on_commit = False
+        network_plan: ModbusNetworkPollPlan = self.create_network_poll_plan(network.uuid)
         while True:
-            current_connection: Union[ModbusRegistryConnection, None] = \
-                self.get_registry().get_connection(network)
-            if not current_connection:
-                self.__log_debug(f'Stopping thread for {network}, no connection')
-                break
-            network: Union[ModbusNetworkModel, None] = self.__get_network(network.uuid)
+            network: Union[ModbusNetworkModel, None] = network_plan.get_network()
             if not network:
-                self.__log_debug(f'Stopping thread for {network}, network not found')
-                return
+                self.__log_debug(f'Stopping thread for {network_plan.network_uuid}, network not found')
+                break
+            if self.get_registry().get_connection(network) is not current_connection:
+                # connection has been removed or re-created with new details, which starts its own thread
+                self.__log_debug(f'Stopping thread for {network}, connection changed')
+                break
             try:
-                self.__poll_network_devices(current_connection, network)
+                self.__poll_network_devices(current_connection, network_plan)
                 db.session.commit()
             except Exception as e:
                 self.__log_error(str(e))
-            time.sleep(network.polling_interval_runtime)
-
-    def __poll_network_devices(self, current_connection, network: ModbusNetworkModel):
-        current_connection.is_running = True
-        devices: List[ModbusDeviceModel] = self.__get_network_devices(network.uuid)
-        for device in devices:
-            if not self.__ping_point(current_connection, network, device):
-                # we suppose that device is offline, so we are not wasting time for looping
-                continue
-            points: List[ModbusPointModel] = self.__get_all_device_points(device.uuid)
-
-            if not device.supports_multiple_rw:
-                self.__log_debug(f'Device {device.uuid} aggregate R/W UNSUPPORTED')
-                for point in points:
-                    try:
-                        self.__poll_point(current_connection.client, network, device, [point])
-                    except ConnectionException:
-                        return
-                    except ModbusIOException:
-                        pass
-                    time.sleep(float(network.point_interval_ms_between_points) / 1000)
-            else:
-                self.__log_debug(f'Device {device.uuid} aggregate R/W SUPPORTED')
-                """
-                group and sort points into corresponding FCs
-                """
-                fc_lists: List[List[ModbusPointModel]] = [[], [], [], [], [], []]
-
-                for point in points:
-                    if point.function_code is ModbusFunctionCode.READ_COILS:
-                        fc_lists[0].append(point)
-                    elif point.function_code is ModbusFunctionCode.READ_DISCRETE_INPUTS:
-                        fc_lists[1].append(point)
-                    elif point.function_code is ModbusFunctionCode.READ_HOLDING_REGISTERS:
-                        fc_lists[2].append(point)
-                    elif point.function_code is ModbusFunctionCode.READ_INPUT_REGISTERS:
-                        fc_lists[3].append(point)
-                    elif point.function_code is ModbusFunctionCode.WRITE_COIL or \
-                            point.function_code is ModbusFunctionCode.WRITE_COILS:
-                        fc_lists[4].append(point)
-                    elif point.function_code is ModbusFunctionCode.WRITE_REGISTER or \
-                            point.function_code is ModbusFunctionCode.WRITE_REGISTERS:
-                        fc_lists[5].append(point)
-                    else:
-                        raise Exception(f'FC {point.function_code} unsupported for aggregate')
-
-                for fc_list in fc_lists:
-                    fc_list.sort(key=lambda p: p.register)
-
-                    last_point = 0
-                    response_size = 0
-                    for i in range(len(fc_list)):
-                        response_size += fc_list[i].register_length
-                        next_reg = 0
-                        if i < len(fc_list) - 1:
-                            next_reg: int = fc_list[i].register + fc_list[i].register_length
-
-                        """
-                        if - end of list
-                            - response size limit reached
-                            - next point is not continuous from current point
-                        """
-                        if i == len(fc_list) - 1 or response_size + fc_list[i+1].register_length >= 253 or \
-                                fc_list[i + 1].register != next_reg:
-                            try:
-                                if last_point == i:
-                                    self.__log_debug(f'Polling SINGLE FC {fc_list[i].function_code}')
-                                    self.__poll_point(current_connection.client, network, device, fc_list[i:i+1])
-                                    last_point += 1
-                                else:
-                                    self.__log_debug(f'Polling AGGREGATE FC {fc_list[i].function_code}')
-                                    self.__poll_point(current_connection.client, network, device,
-                                                      fc_list[last_point:i+1])
-                                    last_point = i + 1
-                                response_size = 0
-                            except ConnectionException:
-                                return
-                            except ModbusIOException:
-                                pass
-                            time.sleep(float(network.point_interval_ms_between_points) / 1000)
-                        else:
-                            continue
+            time.sleep(network_plan.get_sleep_time())
+        self.remove_network_poll_plan(network_plan)
 
-    def __ping_point(self, current_connection: ModbusRegistryConnection, network: ModbusNetworkModel,
-                     device: ModbusDeviceModel) -> bool:
+    def __poll_network_devices(self, current_connection: ModbusRegistryConnection,
+                               network_plan: ModbusNetworkPollPlan):
+        """
+        Requests of the devices are executed concurrently over the connection pool, while the point stores are
+        updated on this thread as each device completes
+        """
+        network: ModbusNetworkModel = network_plan.get_network()
+        start: float = time.time()
+        device_polls: List[ModbusDevicePoll] = []
+        due_polls = network_plan.get_due_polls(start)
+        for device, device_plan, groups in due_polls:
+            device_poll: Union[ModbusDevicePoll, None] = self.__create_device_poll(network, device, device_plan,
+                                                                                   groups)
+            if device_poll:
+                device_polls.append(device_poll)
+        pool: ModbusClientPool = current_connection.pool
+        # the pool keeps the inter-frame delay of a serial line
+        interval: float = 0 if network.type is ModbusType.RTU else \
+            float(network.point_interval_ms_between_points) / 1000
+        aborted = ThreadingEvent()
+
+        pipeline_depth: int = network.tcp_pipeline_depth or 1
+
+        def execute(device_poll: ModbusDevicePoll) -> ModbusDevicePoll:
+            device_poll.execute(pool, interval, aborted, pipeline_depth)
+            return device_poll
+
+        if pool.max_in_flight == 1:
+            executed_device_polls = map(execute, device_polls)
+        else:
+            executed_device_polls = Pool(pool.max_in_flight).imap_unordered(execute, device_polls)
+        for device_poll in executed_device_polls:
+            self.__store_device_poll(network, device_poll)
+        if due_polls:
+            ModbusPollStats().add_cycle(network.uuid, time.time() - start, network_plan.get_interval_seconds(None))
+
+    def __create_device_poll(self, network: ModbusNetworkModel, device: ModbusDeviceModel,
+                             device_plan: ModbusDevicePollPlan,
+                             groups: List[ModbusPollGroup]) -> Union[ModbusDevicePoll, None]:
+        circuit_breaker: ModbusDeviceCircuitBreaker = self.get_circuit_breaker(device.uuid)
+        if not circuit_breaker.allow(time.time()):
+            return None
+        ping_point: Union[ModbusPointModel, None] = self.get_ping_point(device)
+        if device.ping_point and not ping_point:
+            return None
+        # the responses of the points tell the device is online, the ping point only probes a half open circuit
+        ping: Union[ModbusPollTransaction, None] = ModbusPollTransaction(device, [ping_point], False) \
+            if ping_point and circuit_breaker.state is ModbusCircuitState.HALF_OPEN else None
+        device_plan.refresh_priority_arrays()
+        transactions: List[ModbusPollTransaction] = []
+        for group in groups:
+            point_list: List[ModbusPointModel] = self.filter_due_writes(group.points, network.write_refresh_period)
+            if point_list:
+                transactions.append(ModbusPollTransaction(device, point_list, group=group))
+        # setpoint writes go first
+        transactions.sort(key=lambda transaction: transaction.priority)
+        return ModbusDevicePoll(device, ping, transactions, ModbusDeviceTimeouts().get(device.uuid, network.timeout))
+
+    def __store_device_poll(self, network: ModbusNetworkModel, device_poll: ModbusDevicePoll):
+        """
+        Point stores of the device are written in one transaction
         """
-        Poll connection points
-        Checks whether the pinging point is fine or not?
+        batch = ModbusPointStoreBatch(self, network, device_poll.device)
+        for transaction in device_poll.executed_transactions:
+            try:
+                error = None
+                try:
+                    transaction.store(self, network, batch)
+                except (ConnectionException, ModbusIOException) as e:
+                    error = e
+                self.update_fault_flags(network, device_poll.device, error)
+            except ObjectDeletedError:
+                pass
+        batch.flush()
+        if device_poll.connection_error:
+            self.update_fault_flags(network, device_poll.device, device_poll.connection_error)
+        elif device_poll.responded is not None:
+            self.update_circuit_breaker(device_poll.device, device_poll.responded)
+
+    def get_circuit_breaker(self, device_uuid: str) -> ModbusDeviceCircuitBreaker:
+        circuit_breaker: Union[ModbusDeviceCircuitBreaker, None] = self.__circuit_breakers.get(device_uuid)
+        if circuit_breaker is None:
+            circuit_breaker = self.__circuit_breakers[device_uuid] = ModbusDeviceCircuitBreaker()
+        return circuit_breaker
+
+    def update_circuit_breaker(self, device: ModbusDeviceModel, responded: bool):
         """
+        Records the outcome of the device poll, the state of the circuit is kept in the device fault_message
+        """
+        circuit_breaker: ModbusDeviceCircuitBreaker = self.get_circuit_breaker(device.uuid)
+        if not circuit_breaker.record(responded, time.time()):
+            return
+        if circuit_breaker.state is ModbusCircuitState.OPEN:
+            self.__log_debug(f'{device} {circuit_breaker.fault_message}')
+            device.set_fault(True, circuit_breaker.fault_message)
+        elif device.fault_message is not None:
+            device.set_fault(device.fault, None)
+
+    def create_network_poll_plan(self, network_uuid: str) -> ModbusNetworkPollPlan:
+        network_plan = ModbusNetworkPollPlan(network_uuid)
+        self.__network_poll_plans[network_uuid] = network_plan
+        return network_plan
+
+    def remove_network_poll_plan(self, network_plan: ModbusNetworkPollPlan):
+        if self.__network_poll_plans.get(network_plan.network_uuid) is network_plan:
+            del self.__network_poll_plans[network_plan.network_uuid]
+
+    def __invalidate_poll_plans(self, event: Event):
+        model = event.data.get('model')
+        payload: dict = event.data.get('payload') or {}
+        model_uuid: Union[str, None] = get_model_uuid(model)
+        network_plans: List[ModbusNetworkPollPlan] = list(self.__network_poll_plans.values())
+        if event.event_type is EventType.NETWORK_MODEL:
+            network_plan: Union[ModbusNetworkPollPlan, None] = self.__network_poll_plans.get(model_uuid)
+            if network_plan:
+                network_plan.invalidate()
+        elif event.event_type is EventType.DEVICE_MODEL:
+            # an edited device is polled again straight away, and its points are written again
+            self.__circuit_breakers.pop(model_uuid, None)
+            ModbusDeviceTimeouts().reset(model_uuid)
+            ModbusWriteCache().invalidate_device(model_uuid)
+            network_uuids: List[str] = [network_plan.network_uuid for network_plan in network_plans
+                                        if network_plan.has_device(model_uuid)]
+            if not network_uuids:
+                device: Union[DeviceModel, None] = DeviceModel.find_by_uuid(model_uuid)
+                network_uuids = [payload.get('network_uuid') or (device and device.network_uuid)]
+            for network_uuid in network_uuids:
+                network_plan: Union[ModbusNetworkPollPlan, None] = self.__network_poll_plans.get(network_uuid)
+                if network_plan:
+                    network_plan.invalidate()
+                    network_plan.invalidate_device(model_uuid)
+        elif event.event_type is EventType.POINT_MODEL:
+            ModbusWriteCache().invalidate(model_uuid)
+            device_uuids: List[str] = [network_plan.get_device_uuid(model_uuid) for network_plan in network_plans]
+            device_uuids = [device_uuid for device_uuid in device_uuids if device_uuid]
+            if payload.get('device_uuid'):
+                device_uuids.append(payload.get('device_uuid'))
+            if not device_uuids:
+                point: Union[PointModel, None] = PointModel.find_by_uuid(model_uuid)
+                device_uuids = [point.device_uuid] if point else []
+            for network_plan in network_plans:
+                for device_uuid in device_uuids:
+                    if network_plan.has_device(device_uuid):
+                        network_plan.invalidate_device(device_uuid)
+
+    @staticmethod
+    def get_ping_point(device: ModbusDeviceModel) -> Union[ModbusPointModel, None]:
         if device.ping_point:
             try:
-                ping_point = ModbusPointModel.create_temporary_from_string(device.ping_point)
-                self.__poll_point(current_connection.client, network, device, [ping_point], True, False)
-            except (ConnectionException, ModbusIOException):
-                return False
+                return ModbusPointModel.create_temporary_from_string(device.ping_point)
             except ValueError as e:
                 logger.error(f'Modbus device ping_point error: {e}')
-                return False
-        return True
+        return None
 
     def __get_all_networks(self) -> List[ModbusNetworkModel]:
         return ModbusNetworkModel.query.filter_by(type=self.__network_type, enable=True).all()
 
-    @staticmethod
-    def __get_network(network_uuid: str) -> Union[ModbusNetworkModel, None]:
-        return ModbusNetworkModel.query.filter_by(uuid=network_uuid, enable=True).first()
-
-    @staticmethod
-    def __get_network_devices(network_uuid: str) -> List[ModbusDeviceModel]:
-        return ModbusDeviceModel.query.filter_by(network_uuid=network_uuid, enable=True).all()
-
-    @staticmethod
-    def __get_all_device_points(device_uuid: str) -> List[ModbusPointModel]:
-        return ModbusPointModel.query.filter_by(device_uuid=device_uuid, enable=True).all()
-
     def poll_point_not_existing(self, point: ModbusPointModel, device: ModbusDeviceModel, network: ModbusNetworkModel):
         self.__log_debug(f'Manual poll request Non Existing Point {point}')
         connection: ModbusRegistryConnection = self.get_registry().add_edit_and_get_connection(network)
         # TODO network.type is in string for should be on Enum check `ModelBase > create_temporary`
         if network.type != self.__network_type.name:
             raise HandledByDifferentServiceException
-        point_store = self.__poll_point(connection.client, network, device, [point], False, False)
+        with connection.pool.acquire(ModbusRequestPriority.MANUAL) as client:
+            point_store = self.__poll_point(client, network, device, [point], False, False)
         return point_store
 
     def poll_point(self, point: ModbusPointModel) -> ModbusPointModel:
@@ -224,21 +300,62 @@ class ModbusPolling(EventServiceBase):
         network: ModbusNetworkModel = ModbusNetworkModel.find_by_uuid(device.network_uuid)
         self.__log_debug(f'Manual poll request: network: {network.uuid}, device: {device.uuid}, point: {point.uuid}')
         connection: ModbusRegistryConnection = self.get_registry().add_edit_and_get_connection(network)
-        self.__poll_point(connection.client, network, device, [point])
+        with connection.pool.acquire(ModbusRequestPriority.MANUAL) as client:
+            self.__poll_point(client, network, device, [point])
         return point
 
+    def write_point(self, point_uuid: str) -> Union[ModbusPointModel, None]:
+        """
+        Writes the priority array value of the point straight away, ahead of the polls waiting for the bus
+        """
+        point: Union[ModbusPointModel, None] = ModbusPointModel.find_by_uuid(point_uuid)
+        if not point or not ModbusPointModel.is_writable(point.function_code):
+            return None
+        device: ModbusDeviceModel = ModbusDeviceModel.find_by_uuid(point.device_uuid)
+        if device.type is not self.__network_type:
+            raise HandledByDifferentServiceException
+        network: ModbusNetworkModel = ModbusNetworkModel.find_by_uuid(device.network_uuid)
+        if not (network.enable and device.enable and point.enable):
+            return None
+        if not self.get_circuit_breaker(device.uuid).allow(time.time()):
+            return None
+        PriorityArrayModel.filter_by_point_uuid(point.uuid).populate_existing().first()
+        self.__log_debug(f'Write request {point}')
+        connection: ModbusRegistryConnection = self.get_registry().add_edit_and_get_connection(network)
+        with connection.pool.acquire(ModbusRequestPriority.WRITE) as client:
+            self.__poll_point(client, network, device, [point], write_refresh_period=network.write_refresh_period)
+        return point
+
+    def probe_device(self, device_uuid: str) -> Union[ModbusDeviceModel, None]:
+        """
+        Probes the read capabilities of the device and stores them on it, its poll plan is rebuilt with them
+        """
+        device: Union[ModbusDeviceModel, None] = ModbusDeviceModel.find_by_uuid(device_uuid)
+        if not device:
+            return None
+        if device.type is not self.__network_type:
+            raise HandledByDifferentServiceException
+        network: ModbusNetworkModel = ModbusNetworkModel.find_by_uuid(device.network_uuid)
+        points: List[ModbusPointModel] = ModbusPointModel.query.filter_by(device_uuid=device.uuid).all()
+        self.__log_info(f'Probe request: network: {network.uuid}, device: {device.uuid}')
+        connection: ModbusRegistryConnection = self.get_registry().add_edit_and_get_connection(network)
+        with connection.pool.acquire(ModbusRequestPriority.MANUAL) as client:
+            # rejected requests may be left without response, the adaptive timeout doesn't apply to them
+            set_client_timeout(client, network.timeout)
+            device_probe: ModbusDeviceProbe = ModbusDeviceProbe(client, device, points)
+            capabilities: dict = device_probe.probe()
+        self.__log_info(f'Probed device {device.uuid} with {device_probe.requests} requests: {capabilities}')
+        device.update(**capabilities)
+        return device
+
     def __poll_point(self, client: BaseModbusClient, network: ModbusNetworkModel, device: ModbusDeviceModel,
                      point_list: List[ModbusPointModel], update_all: bool = True,
-                     update_point_store: bool = True) -> Union[PointStoreModel, None]:
+                     update_point_store: bool = True,
+                     group: ModbusPollGroup = None,
+                     write_refresh_period: Union[int, None] = 0) -> Union[PointStoreModel, None]:
         point_store: Union[PointStoreModel, None] = None
         if update_all:
-            for point in point_list:
-                write_value: float = PriorityArrayModel.get_highest_priority_value_from_priority_array(
-                    point.priority_array_write) or 0
-                if point.function_code == point.is_writable(point.function_code) and point.write_value_once and \
-                        point.point_store is not None and not point.point_store.fault and \
-                        point.point_store.value_original == write_value:
-                    point_list.remove(point)
+            point_list = self.filter_due_writes(point_list, write_refresh_period)
             if len(point_list) > 0:
                 try:
                     error = None
@@ -246,24 +363,12 @@ class ModbusPolling(EventServiceBase):
                         if len(point_list) == 1:
                             point_store = poll_point(self, client, network, device, point_list[0], update_point_store)
                         elif len(point_list) > 1:
-                            poll_point_aggregate(self, client, network, device, point_list)
+                            poll_point_aggregate(self, client, network, device, point_list, group)
                         else:
                             raise Exception("Invalid __poll_point point_list length")
-                    except ConnectionException as e:
-                        if not network.fault:
-                            network.set_fault(True)
-                        error = e
-                    except ModbusIOException as e:
-                        if not device.fault:
-                            device.set_fault(True)
+                    except (ConnectionException, ModbusIOException) as e:
                         error = e
-
-                    if network.fault and not isinstance(error, ConnectionException):
-                        network.set_fault(False)
-                    elif device.fault and not isinstance(error, ModbusIOException) and \
-                            not isinstance(error, ConnectionException):
-                        device.set_fault(False)
-
+                    self.update_fault_flags(network, device, error)
                     if error is not None:
                         raise error
                 except ObjectDeletedError:
@@ -272,6 +377,44 @@ class ModbusPolling(EventServiceBase):
             point_store = poll_point(self, client, network, device, point_list[0], update_point_store)
         return point_store
 
+    @staticmethod
+    def filter_due_writes(point_list: List[ModbusPointModel],
+                          write_refresh_period: Union[int, None]) -> List[ModbusPointModel]:
+        """
+        Drops the writable points which have already written their current value, a write_value_once point is not
+        written again and the others are after the write_refresh_period seconds of the network
+        """
+        filtered_point_list: List[ModbusPointModel] = []
+        for point in point_list:
+            if point.is_writable(point.function_code):
+                if not ModbusWriteCache().is_due(point, None if point.write_value_once else write_refresh_period):
+                    continue
+                write_value: float = PriorityArrayModel.get_highest_priority_value_from_priority_array(
+                    point.priority_array_write) or 0
+                if point.write_value_once:
+                    # the live value, the point_stores row is written behind
+                    point_store: Union[PointStoreModel, None] = PointValueStore().get(point.uuid)
+                    if point_store is not None and not point_store.fault and point_store.value_original == write_value:
+                        continue
+            filtered_point_list.append(point)
+        return filtered_point_list
+
+    @staticmethod
+    def update_fault_flags(network: ModbusNetworkModel, device: ModbusDeviceModel,
+                           error: Union[ConnectionException, ModbusIOException, None]):
+        if isinstance(error, ConnectionException):
+            if not network.fault:
+                network.set_fault(True)
+        elif isinstance(error, ModbusIOException):
+            if not device.fault:
+                device.set_fault(True)
+
+        if network.fault and not isinstance(error, ConnectionException):
+            network.set_fault(False)
+        elif device.fault and not isinstance(error, ModbusIOException) and \
+                not isinstance(error, ConnectionException):
+            device.set_fault(False)
+
     @abstractmethod
     def get_registry(self) -> ModbusRegistry:
         raise NotImplementedError
@@ -300,6 +443,17 @@ class TcpPolling(ModbusPolling):
 
     def __init__(self):
         super().__init__(ModbusType.TCP)
+        self.__async_engine = None
+        setting: AppSetting = current_app.config[AppSetting.KEY]
+        if setting.drivers.modbus_tcp_asyncio:
+            from src.drivers.modbus.services.polling.async_tcp_polling import AsyncTcpPollingEngine
+            self.__async_engine = AsyncTcpPollingEngine(self)
+
+    def _start_network_polling(self, current_connection: ModbusRegistryConnection, network: ModbusNetworkModel):
+        if self.__async_engine:
+            self.__async_engine.start_network_polling(current_connection, network)
+        else:
+            super()._start_network_polling(current_connection, network)
 
     @abstractmethod
     def get_registry(self) -> ModbusRegistry:
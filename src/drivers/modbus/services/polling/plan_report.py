@@ -0,0 +1,165 @@
+import math
+from typing import List, Tuple, Union
+
+from src.drivers.modbus.enums.network.network import ModbusType
+from src.drivers.modbus.enums.point.points import ModbusFunctionCode
+from src.drivers.modbus.models.device import ModbusDeviceModel
+from src.drivers.modbus.models.network import ModbusNetworkModel
+from src.drivers.modbus.models.point import ModbusPointModel
+from src.drivers.modbus.services.modbus_rtu_registry import get_rtu_frame_spacing, get_rtu_character_time
+from src.drivers.modbus.services.polling.function_utils import _set_data_length
+from src.drivers.modbus.services.polling.poll_plan import ModbusDevicePollPlan, ModbusPollGroup, \
+    get_group_register_length
+from src.drivers.modbus.services.polling.poll_stats import ModbusPollStats, get_points_group_key
+
+# RTU frame bytes on top of the PDU: the device address and the CRC
+RTU_FRAME_BYTES = 3
+
+
+def get_request_function_code(points: List[ModbusPointModel]) -> ModbusFunctionCode:
+    """
+    Function code sent for a request group, aggregated single writes are sent as multiple writes
+    """
+    function_code: ModbusFunctionCode = points[0].function_code
+    if len(points) > 1:
+        if function_code is ModbusFunctionCode.WRITE_COIL:
+            return ModbusFunctionCode.WRITE_COILS
+        if function_code is ModbusFunctionCode.WRITE_REGISTER:
+            return ModbusFunctionCode.WRITE_REGISTERS
+    return function_code
+
+
+def get_request_length(points: List[ModbusPointModel]) -> int:
+    if len(points) == 1:
+        return _set_data_length(points[0].data_type, points[0].register_length) or points[0].register_length
+    return get_group_register_length(points)
+
+
+def get_pdu_sizes(function_code: ModbusFunctionCode, length: int) -> Tuple[int, int]:
+    """
+    Sizes in bytes of the request and the response PDUs, function code included
+    :param length: registers (or bits) of the request
+    """
+    if function_code in (ModbusFunctionCode.READ_COILS, ModbusFunctionCode.READ_DISCRETE_INPUTS):
+        return 5, 2 + math.ceil(length / 8)
+    if function_code in (ModbusFunctionCode.READ_HOLDING_REGISTERS, ModbusFunctionCode.READ_INPUT_REGISTERS):
+        return 5, 2 + 2 * length
+    if function_code is ModbusFunctionCode.WRITE_COILS:
+        return 6 + math.ceil(length / 8), 5
+    if function_code is ModbusFunctionCode.WRITE_REGISTERS:
+        return 6 + 2 * length, 5
+    return 5, 5
+
+
+def get_gap_registers(points: List[ModbusPointModel]) -> int:
+    """
+    Registers (or bits) of the request span which are read without any point on them
+    """
+    start: int = points[0].register
+    covered: List[bool] = [False] * get_group_register_length(points)
+    for point in points:
+        covered[point.register - start:point.register - start + point.register_length] = [True] * point.register_length
+    return covered.count(False)
+
+
+class ModbusPollPlanReport:
+    """
+    Dry run of the poll plan of a device: the requests a polling cycle sends, in the order they are sent (writes
+    first), along with an estimate of how long they take.
+    A request takes its average measured RTT when the poll stats have it (the group, else the device), else the time
+    its frames take on the serial line at the baud rate; the device processing time is unknown then, so the estimate
+    is a lower bound, and a TCP request without a measured RTT is left without estimate.
+    The cycle adds the silences in between the requests: the inter-frame delay on RTU, point_interval_ms_between_points
+    on TCP in between the pipelined batches.
+    """
+
+    def __init__(self, network: ModbusNetworkModel, device: ModbusDeviceModel, device_plan: ModbusDevicePollPlan):
+        self.__network: ModbusNetworkModel = network
+        self.__device: ModbusDeviceModel = device
+        self.__device_plan: ModbusDevicePollPlan = device_plan
+        network_stats: dict = ModbusPollStats().get_stats(network.uuid).get(network.uuid, {})
+        self.__device_stats: dict = network_stats.get('devices', {}).get(device.uuid, {})
+
+    def to_dict(self) -> dict:
+        groups: List[dict] = [self.__get_group(group) for group in self.__sort(self.__device_plan.groups)]
+        return {
+            'network_uuid': self.__network.uuid,
+            'device_uuid': self.__device.uuid,
+            'type': self.__network.type.name,
+            'polling_interval_runtime': self.__network.polling_interval_runtime,
+            'point_interval_ms_between_points': self.__network.point_interval_ms_between_points,
+            'requests': len(groups),
+            'points': sum(len(group['points']) for group in groups),
+            'gap_registers': sum(group['gap_registers'] for group in groups),
+            'request_bytes': sum(group['request_bytes'] for group in groups),
+            'response_bytes': sum(group['response_bytes'] for group in groups),
+            'estimated_cycle_ms': self.__get_cycle_ms(groups),
+            'intervals': [self.__get_interval(interval) for interval in
+                          sorted(self.__device_plan.intervals, key=lambda i: (i is not None, i or 0))],
+            'groups': groups,
+        }
+
+    def __get_interval(self, interval: Union[int, None]) -> dict:
+        """
+        Cycle of an interval class when it is due on its own
+        """
+        groups: List[dict] = [self.__get_group(group)
+                              for group in self.__sort(self.__device_plan.get_groups([interval]))]
+        return {
+            'poll_interval_ms': interval,
+            'requests': len(groups),
+            'estimated_cycle_ms': self.__get_cycle_ms(groups),
+        }
+
+    def __get_group(self, group: ModbusPollGroup) -> dict:
+        points: List[ModbusPointModel] = group.points
+        function_code: ModbusFunctionCode = get_request_function_code(points)
+        length: int = get_request_length(points)
+        request_bytes, response_bytes = get_pdu_sizes(function_code, length)
+        rtt_ms, rtt_source = self.__get_rtt_ms(points, request_bytes, response_bytes)
+        return {
+            'function_code': function_code.name,
+            'register': points[0].register,
+            'register_length': length,
+            'points': [{'uuid': point.uuid, 'name': point.name, 'register': point.register,
+                        'register_length': point.register_length} for point in points],
+            'gap_registers': get_gap_registers(points) if len(points) > 1 else 0,
+            'request_bytes': request_bytes,
+            'response_bytes': response_bytes,
+            'rtt_ms': rtt_ms,
+            'rtt_source': rtt_source,
+        }
+
+    def __get_rtt_ms(self, points: List[ModbusPointModel], request_bytes: int,
+                     response_bytes: int) -> Tuple[Union[float, None], Union[str, None]]:
+        group_stats: dict = self.__device_stats.get('groups', {}).get(get_points_group_key(points), {})
+        for source, stats in (('group', group_stats), ('device', self.__device_stats)):
+            rtt_ms: Union[float, None] = stats.get('rtt', {}).get('avg_ms')
+            if rtt_ms is not None:
+                return rtt_ms, source
+        if self.__network.type is ModbusType.RTU:
+            character_time: float = get_rtu_character_time(self.__network)
+            frame_bytes: int = request_bytes + response_bytes + 2 * RTU_FRAME_BYTES
+            # the device keeps the inter-frame delay before answering
+            rtt: float = frame_bytes * character_time + get_rtu_frame_spacing(self.__network)
+            return round(rtt * 1000, 3), 'baud_rate'
+        return None, None
+
+    def __get_cycle_ms(self, groups: List[dict]) -> Union[float, None]:
+        if not groups:
+            return 0
+        if any(group['rtt_ms'] is None for group in groups):
+            return None
+        if self.__network.type is ModbusType.RTU:
+            silence_ms: float = get_rtu_frame_spacing(self.__network) * 1000
+            return round(sum(group['rtt_ms'] + silence_ms for group in groups), 3)
+        # pipelined requests are answered in about the time of the slowest one
+        depth: int = self.__network.tcp_pipeline_depth or 1
+        batches: List[List[dict]] = [groups[i:i + depth] for i in range(0, len(groups), depth)]
+        interval_ms: float = self.__network.point_interval_ms_between_points or 0
+        return round(sum(max(group['rtt_ms'] for group in batch) for batch in batches) +
+                     interval_ms * (len(batches) - 1), 3)
+
+    @staticmethod
+    def __sort(groups: List[ModbusPollGroup]) -> List[ModbusPollGroup]:
+        return sorted(groups, key=lambda group: not ModbusPointModel.is_writable(group.function_code))
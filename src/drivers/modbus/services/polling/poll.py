@@ -1,34 +1,306 @@
+import asyncio
 import logging
 import numbers
-from typing import List
+import time
+from threading import Event
+from typing import List, Union, Tuple
 
-from pymodbus.client.sync import BaseModbusClient
-from pymodbus.exceptions import ModbusIOException
+from pymodbus.client.asynchronous.mixins import BaseAsyncModbusClient
+from pymodbus.client.sync import BaseModbusClient, ModbusTcpClient
+from pymodbus.exceptions import ModbusIOException, ConnectionException
+from pymodbus.pdu import ModbusRequest, ModbusResponse, ExceptionResponse
 
+from src import db
+from src.drivers.modbus.enums.network.network import ModbusRequestPriority
 from src.drivers.modbus.enums.point.points import ModbusFunctionCode, ModbusDataType, ModbusDataEndian
 from src.drivers.modbus.models.device import ModbusDeviceModel
 from src.drivers.modbus.models.network import ModbusNetworkModel
 from src.drivers.modbus.models.point import ModbusPointModel
-from src.drivers.modbus.services.polling.function_utils import _mod_point_data_endian, convert_to_data_type, \
-    pack_point_write_registers
-from src.drivers.modbus.services.polling.functions import read_digital, write_digital, \
-    read_analogue, write_analogue, write_analogue_aggregate
+from src.drivers.modbus.services.modbus_client_pool import ModbusClientPool
+from src.drivers.modbus.services.modbus_tcp_pipeline import ModbusTcpPipeline
+from src.drivers.modbus.services.polling.adaptive_timeout import ModbusDeviceTimeouts, set_client_timeout
+from src.drivers.modbus.services.polling.function_utils import PackedRegisters, RegisterDecoder, \
+    BitFieldDecoder, get_point_decoder
+from src.drivers.modbus.services.polling.poll_plan import ModbusPollGroup, get_group_register_length
+from src.drivers.modbus.services.polling.poll_stats import ModbusPollStats
+from src.drivers.modbus.services.polling.register_image import ModbusRegisterImage
+from src.drivers.modbus.services.polling.functions import prepare_read_digital, prepare_write_digital, \
+    prepare_read_analogue, prepare_write_analogue, prepare_write_analogue_aggregate, ResponseHandler
+from src.drivers.modbus.services.polling.write_cache import ModbusWriteCache, get_write_version
+from src.models.point.model_point import PointModel
 from src.models.point.model_point_store import PointStoreModel
+from src.models.point.point_transform import PointTransformTable
 from src.models.point.priority_array import PriorityArrayModel
 from src.services.event_service_base import EventServiceBase
 
 logger = logging.getLogger(__name__)
 
 
+class ModbusPollTransaction:
+    """
+    Poll of a single point or of an aggregated point group, split in three steps:
+        - the request is built upfront, it reads the write values from the point models
+        - execute/execute_async only talk to the modbus client, so they can run on any thread or greenlet
+        - store updates the point stores and publishes the COVs, back on the polling thread
+    """
+
+    def __init__(self, device: ModbusDeviceModel, points: List[ModbusPointModel], update: bool = True,
+                 group: ModbusPollGroup = None):
+        """
+        :param group: request group of the device poll plan which the points are polled of
+        """
+        self.device: ModbusDeviceModel = device
+        self.points: List[ModbusPointModel] = points
+        self.update: bool = update
+        self.group: Union[ModbusPollGroup, None] = group
+        # due writes may be filtered out of the group, the rest of the points get their own decoders
+        self.decoders: Union[List[Union[RegisterDecoder, BitFieldDecoder]], None] = group.decoders \
+            if group and points == group.points else None
+        self.image: Union[ModbusRegisterImage, None] = group.image if group else None
+        self.transform_table: Union[PointTransformTable, None] = group.transform_table \
+            if self.decoders is not None and len(points) > 1 else None
+        # versions of the values being written, which are cached as written once the device confirms them
+        self.write_versions: Union[List[tuple], None] = [get_write_version(point) for point in points] \
+            if self.priority is ModbusRequestPriority.WRITE else None
+        if len(points) == 1:
+            self.request, self.__handler = _prepare_point(device, points[0])
+        else:
+            self.request, self.__handler = _prepare_point_aggregate(device, points)
+        self.val = None
+        self.array = None
+        self.error: Union[ModbusIOException, None] = None
+        # a device which has answered, even with an exception response, is online
+        self.no_response: bool = False
+        self.rtt: Union[float, None] = None
+        self.request_bytes: int = _get_pdu_size(self.request)
+        self.response_bytes: int = 0
+        self.exception_code: Union[int, None] = None
+        self.attempts: int = 0
+        # the response repeats the last one of the group, its points are left as they are
+        self.unchanged: bool = False
+
+    @property
+    def priority(self) -> ModbusRequestPriority:
+        if ModbusPointModel.is_writable(self.points[0].function_code):
+            return ModbusRequestPriority.WRITE
+        return ModbusRequestPriority.CYCLIC
+
+    def execute(self, client: BaseModbusClient, timeout: float = None, retries: int = 0):
+        """
+        :param timeout: response timeout of the request, the client keeps its timeout when None
+        :param retries: times the request is sent again when it is left without response
+        """
+        if timeout is not None:
+            set_client_timeout(client, timeout)
+        for _ in range(retries + 1):
+            start: float = time.monotonic()
+            response = client.execute(self.request)
+            self.handle(response, time.monotonic() - start)
+            if not self.no_response:
+                return
+
+    async def execute_async(self, protocol: BaseAsyncModbusClient, timeout: float, retries: int = 0):
+        for _ in range(retries + 1):
+            start: float = time.monotonic()
+            try:
+                response = await _execute_async(protocol, self.request, timeout)
+            except ModbusIOException as e:
+                self.attempts += 1
+                self.error = e
+                self.no_response = True
+                continue
+            self.handle(response, time.monotonic() - start)
+            if not self.no_response:
+                return
+
+    def handle(self, response: ModbusResponse, rtt: float = None):
+        """
+        Handles the response of the request, when it was executed by some other transport
+        :param rtt: seconds from sending the request to receiving its response
+        """
+        self.attempts += 1
+        self.no_response = isinstance(response, ModbusIOException)
+        self.rtt = rtt
+        self.error = None
+        if not self.no_response:
+            self.response_bytes = _get_pdu_size(response)
+            if isinstance(response, ExceptionResponse):
+                self.exception_code = response.exception_code
+            if rtt is not None:
+                ModbusDeviceTimeouts().add(self.device.uuid, rtt)
+        try:
+            self.val, self.array = self.__handler(response)
+        except ModbusIOException as e:
+            self.error = e
+            return
+        if self.write_versions:
+            for point, write_version in zip(self.points, self.write_versions):
+                ModbusWriteCache().set_written(point, write_version)
+
+    def store(self, service: EventServiceBase, network: ModbusNetworkModel,
+              batch: 'ModbusPointStoreBatch' = None) -> Union[PointStoreModel, None]:
+        """
+        Raises the ModbusIOException of the execution after the points are marked as faulty
+        :param batch: collects the point stores to be written on its flush, instead of writing them one by one
+        """
+        if self.image is not None and self.error is None and self.array is not None:
+            self.image.update(self.points[0].register, self.array)
+        self.unchanged = self.__is_unchanged(network)
+        ModbusPollStats().add_transaction(network.uuid, self)
+        if self.unchanged:
+            return None
+        if len(self.points) == 1:
+            return _store_point(service, network, self.device, self.points[0], self.update, self.val, self.array,
+                                self.error, batch)
+        _store_point_aggregate(service, network, self.device, self.points, self.decoders, self.array, self.error,
+                               batch, self.image, self.transform_table)
+        return None
+
+    def __is_unchanged(self, network: ModbusNetworkModel) -> bool:
+        """
+        Most of the reads return the registers of the last cycle, those skip the decoding, scaling and the COV checks
+        """
+        if self.group is None or not self.update or self.priority is ModbusRequestPriority.WRITE:
+            return False
+        if self.error is not None or self.array is None:
+            self.group.reset_response()
+            return False
+        return self.group.is_response_unchanged(self.array, network.read_refresh_period)
+
+
+class ModbusPointStoreBatch:
+    """
+    Point stores of a device poll, written in one transaction on flush.
+    COVs are published for the changed point stores only, after they are committed.
+    """
+
+    def __init__(self, service: EventServiceBase, network: ModbusNetworkModel, device: ModbusDeviceModel):
+        self.__service: EventServiceBase = service
+        self.__network: ModbusNetworkModel = network
+        self.__device: ModbusDeviceModel = device
+        self.__point_stores: List[Tuple[ModbusPointModel, PointStoreModel]] = []
+        self.__transform_tables: List[Tuple[PointTransformTable, List[PointStoreModel]]] = []
+
+    def add(self, point: ModbusPointModel, point_store: PointStoreModel):
+        self.__point_stores.append((point, point_store))
+
+    def add_group(self, points: List[ModbusPointModel], point_stores: List[PointStoreModel],
+                  transform_table: PointTransformTable = None):
+        """
+        :param transform_table: precomputed value transforms of the points, the values are transformed in one pass
+        """
+        self.__point_stores.extend(zip(points, point_stores))
+        if transform_table is not None:
+            self.__transform_tables.append((transform_table, point_stores))
+
+    def flush(self):
+        point_stores, self.__point_stores = self.__point_stores, []
+        transform_tables, self.__transform_tables = self.__transform_tables, []
+        if not point_stores:
+            return
+        try:
+            updated_point_stores = PointModel.update_point_values(point_stores, transform_tables)
+        except BaseException as e:
+            logger.error(e)
+            db.session.rollback()
+            return
+        for point, point_store in updated_point_stores:
+            try:
+                point.publish_cov(point_store, self.__device, self.__network, self.__service.service_name)
+            except BaseException as e:
+                logger.error(e)
+
+
+class ModbusDevicePoll:
+    """
+    Transactions of a device for one polling cycle, a failing ping transaction or an unanswered request skips the
+    rest of them.
+    It is executed on a client pool, and the executed transactions are stored afterwards by the polling thread.
+    """
+
+    def __init__(self, device: ModbusDeviceModel, ping: Union[ModbusPollTransaction, None],
+                 transactions: List[ModbusPollTransaction], timeout: float):
+        """
+        :param timeout: response timeout of the requests, the unanswered point requests get a fast retry
+        """
+        self.device: ModbusDeviceModel = device
+        self.timeout: float = timeout
+        self.ping: Union[ModbusPollTransaction, None] = ping
+        self.transactions: List[ModbusPollTransaction] = transactions
+        self.executed_transactions: List[ModbusPollTransaction] = []
+        self.connection_error: Union[ConnectionException, None] = None
+
+    @property
+    def responded(self) -> Union[bool, None]:
+        """
+        Whether the device has answered any request, None when nothing has been executed
+        """
+        if not self.executed_transactions:
+            return None
+        return any(not transaction.no_response for transaction in self.executed_transactions)
+
+    def execute(self, pool: ModbusClientPool, interval: float, aborted: Event, pipeline_depth: int = 1):
+        """
+        :param pool: client pool of the network
+        :param interval: sleep in seconds in between the transactions (or pipelined batches of them)
+        :param aborted: set on a connection error, so the devices which are not polled yet are skipped
+        :param pipeline_depth: max requests sent back to back on a tcp socket before awaiting their responses
+        """
+        if self.ping:
+            if not self.__execute(pool, [self.ping], aborted, 1, 0) or self.ping.error:
+                # we suppose that device is offline, so we are not wasting time for looping
+                return
+        for i in range(0, len(self.transactions), pipeline_depth):
+            transactions: List[ModbusPollTransaction] = self.transactions[i:i + pipeline_depth]
+            if not self.__execute(pool, transactions, aborted, pipeline_depth, ModbusDeviceTimeouts.RETRIES):
+                return
+            if all(transaction.no_response for transaction in transactions):
+                # the device went offline, the rest of the requests would wait for their timeouts too
+                return
+            if i + pipeline_depth < len(self.transactions):
+                time.sleep(interval)
+
+    def __execute(self, pool: ModbusClientPool, transactions: List[ModbusPollTransaction], aborted: Event,
+                  pipeline_depth: int, retries: int) -> bool:
+        if aborted.is_set():
+            return False
+        try:
+            with pool.acquire(min(transaction.priority for transaction in transactions)) as client:
+                set_client_timeout(client, self.timeout)
+                if len(transactions) > 1 and isinstance(client, ModbusTcpClient):
+                    pipeline = ModbusTcpPipeline(client, pipeline_depth)
+                    responses = pipeline.execute([transaction.request for transaction in transactions])
+                    # each request is timed up to its own response, not to the slowest response of the batch
+                    for transaction, response, rtt in zip(transactions, responses, pipeline.rtts):
+                        transaction.handle(response, rtt)
+                        if transaction.no_response and retries:
+                            transaction.execute(client, retries=retries - 1)
+                        self.executed_transactions.append(transaction)
+                else:
+                    for transaction in transactions:
+                        transaction.execute(client, retries=retries)
+                        self.executed_transactions.append(transaction)
+        except ConnectionException as e:
+            self.connection_error = e
+            aborted.set()
+            return False
+        return True
+
+
 def poll_point_aggregate(service: EventServiceBase, client: BaseModbusClient, network: ModbusNetworkModel,
-                         device: ModbusDeviceModel, point_slice) -> None:
+                         device: ModbusDeviceModel, point_slice, group: ModbusPollGroup = None) -> None:
+    transaction = ModbusPollTransaction(device, point_slice, group=group)
+    transaction.execute(client, ModbusDeviceTimeouts().get(device.uuid, network.timeout), ModbusDeviceTimeouts.RETRIES)
+    transaction.store(service, network)
+
+
+def _prepare_point_aggregate(device: ModbusDeviceModel, point_slice) -> (ModbusRequest, ResponseHandler):
     device_address: int = device.address
     zero_based: bool = device.zero_based
     point_register: int = point_slice[0].register
-    point_register_length = 0
+    point_register_length: int = get_group_register_length(point_slice)
     write_values = []
     for point in point_slice:
-        point_register_length += point.register_length
         write_value: float = PriorityArrayModel.get_highest_priority_value_from_priority_array(
             point.priority_array_write) or 0
         write_values.append(write_value)
@@ -38,42 +310,47 @@ def poll_point_aggregate(service: EventServiceBase, client: BaseModbusClient, ne
     elif point_fc is ModbusFunctionCode.WRITE_REGISTER:
         point_fc = ModbusFunctionCode.WRITE_REGISTERS
     if point_fc is ModbusFunctionCode.WRITE_REGISTERS:
-        write_values = pack_point_write_registers(point_slice)
+        write_values = [register for point in point_slice for register in ModbusWriteCache().get_payload(point)]
     point_data_endian: ModbusDataEndian = point_slice[0].data_endian
+    return _prepare_poll_point(device_address, zero_based, point_register, point_register_length, point_fc,
+                                ModbusDataType.RAW, point_data_endian, write_values)
+
 
-    array = None
+def _store_point_aggregate(service: EventServiceBase, network: ModbusNetworkModel, device: ModbusDeviceModel,
+                            point_slice, decoders: List[Union[RegisterDecoder, BitFieldDecoder]] or None, array,
+                            error: ModbusIOException or None, batch: ModbusPointStoreBatch = None,
+                            image: ModbusRegisterImage = None, transform_table: PointTransformTable = None) -> None:
     fault = False
     fault_message = None
-    error = None
-    try:
-        val, array = __poll_point(client, device_address, zero_based, point_register, point_register_length, point_fc,
-                                  ModbusDataType.RAW, point_data_endian, write_values)
-
-    except ModbusIOException as e:
-        logger.error(str(e))
+    if error is not None:
+        logger.error(str(error))
         fault = True
-        fault_message = str(e)
-        error = e
+        fault_message = str(error)
 
-    arr_ind = 0
-    for point in point_slice:
+    if not decoders:
+        decoders = [get_point_decoder(point) for point in point_slice]
+    # the response is packed once, and every point value is unpacked from it at its offset
+    registers: Union[PackedRegisters, None] = None
+    if not fault and any(decoders):
+        registers = image.pack(point_slice[0].register, len(array)) if image else PackedRegisters(array)
+
+    point_stores: List[PointStoreModel] = []
+    for i, point in enumerate(point_slice):
         point_store_new = None
         if not fault:
+            # registers in between the points are gap fillers, those are just skipped
+            arr_ind: int = point.register - point_slice[0].register
 
             if point.data_type is not ModbusDataType.RAW and point.data_type is not ModbusDataType.DIGITAL:
-                byteorder, word_order = _mod_point_data_endian(point.data_endian)
                 arr_slice = array[arr_ind:arr_ind + point.register_length]
-                val = convert_to_data_type(arr_slice, point.data_type, byteorder,
-                                           word_order)
+                val = decoders[i].decode(registers, arr_ind) if decoders[i] else None
             elif point.data_type is ModbusDataType.DIGITAL:
                 arr_slice = array[arr_ind:arr_ind + 1]
                 val = array[arr_ind]
             else:
-                arr_slice = array[arr_ind:point.register_length]
+                arr_slice = array[arr_ind:arr_ind + point.register_length]
                 val = array[arr_ind]
 
-            arr_ind += point.register_length
-
             if isinstance(val, numbers.Number):
                 point_store_new = PointStoreModel(value_original=float(str(val)), value_raw=str(arr_slice),
                                                   point_uuid=point.uuid)
@@ -85,12 +362,17 @@ def poll_point_aggregate(service: EventServiceBase, client: BaseModbusClient, ne
         if not point_store_new:
             point_store_new = PointStoreModel(fault=fault, fault_message=fault_message, point_uuid=point.uuid)
 
+        if batch is not None:
+            point_stores.append(point_store_new)
+            continue
         try:
             if point.update_point_value(point_store_new, point.driver):
                 point.publish_cov(point_store_new, device, network, service.service_name)
         except BaseException as e:
             logger.error(e)
 
+    if batch is not None:
+        batch.add_group(point_slice, point_stores, transform_table)
     if error is not None:
         raise error
 
@@ -107,7 +389,12 @@ def poll_point(service: EventServiceBase, client: BaseModbusClient, network: Mod
     :param update: update point store or not
     :return: PointStoreModel
     """
+    transaction = ModbusPollTransaction(device, [point], update)
+    transaction.execute(client, ModbusDeviceTimeouts().get(device.uuid, network.timeout), ModbusDeviceTimeouts.RETRIES)
+    return transaction.store(service, network)
 
+
+def _prepare_point(device: ModbusDeviceModel, point: ModbusPointModel) -> (ModbusRequest, ResponseHandler):
     device_address: int = device.address
     zero_based: bool = device.zero_based
     point_register: int = point.register
@@ -117,34 +404,38 @@ def poll_point(service: EventServiceBase, client: BaseModbusClient, network: Mod
     point_data_endian: ModbusDataEndian = point.data_endian
     write_value: float = PriorityArrayModel.get_highest_priority_value_from_priority_array(
         point.priority_array_write) or 0
+    write_payload: Union[List[int], None] = ModbusWriteCache().get_payload(point) \
+        if point_fc is ModbusFunctionCode.WRITE_REGISTERS and point_data_type is not ModbusDataType.RAW else None
+    return _prepare_poll_point(device_address, zero_based, point_register, point_register_length, point_fc,
+                                point_data_type, point_data_endian, [write_value], write_payload,
+                                get_point_decoder(point))
+
 
+def _store_point(service: EventServiceBase, network: ModbusNetworkModel, device: ModbusDeviceModel,
+                 point: ModbusPointModel, update: bool, val, array,
+                 error: ModbusIOException or None, batch: ModbusPointStoreBatch = None) -> PointStoreModel:
     fault: bool = False
     fault_message: str = ""
     point_store_new = None
-    error = None
 
-    try:
-        val, array = __poll_point(client, device_address, zero_based, point_register, point_register_length, point_fc,
-                                  point_data_type, point_data_endian, [write_value])
-
-        if isinstance(val, numbers.Number):
-            point_store_new = PointStoreModel(value_original=float(str(val)), value_raw=str(array),
-                                              point_uuid=point.uuid)
-        else:
-            fault_message = f"Received not numeric value, type is: {type(val)}"
-            fault = True
-            logger.error(fault_message)
-
-    except ModbusIOException as e:
-        logger.error(str(e))
+    if error is not None:
+        logger.error(str(error))
+        fault = True
+        fault_message = str(error)
+    elif isinstance(val, numbers.Number):
+        point_store_new = PointStoreModel(value_original=float(str(val)), value_raw=str(array),
+                                          point_uuid=point.uuid)
+    else:
+        fault_message = f"Received not numeric value, type is: {type(val)}"
         fault = True
-        fault_message = str(e)
-        error = e
+        logger.error(fault_message)
 
     if not point_store_new:
         point_store_new = PointStoreModel(fault=fault, fault_message=fault_message, point_uuid=point.uuid)
 
-    if update:
+    if update and batch is not None:
+        batch.add(point, point_store_new)
+    elif update:
         try:
             is_updated = point.update_point_value(point_store_new, point.driver)
         except BaseException as e:
@@ -159,9 +450,33 @@ def poll_point(service: EventServiceBase, client: BaseModbusClient, network: Mod
     return point_store_new
 
 
-def __poll_point(client: BaseModbusClient, device_address: int, zero_based: bool,
-                 point_register: int, point_register_length: int, point_fc: ModbusFunctionCode,
-                 point_data_type: ModbusDataType, point_data_endian: ModbusDataEndian, write_values: List[float]):
+def _get_pdu_size(pdu: Union[ModbusRequest, ModbusResponse]) -> int:
+    """
+    Size in bytes of the modbus PDU, function code included
+    """
+    try:
+        return len(pdu.encode()) + 1
+    except Exception:
+        return 0
+
+
+async def _execute_async(protocol: BaseAsyncModbusClient, request: ModbusRequest,
+                          timeout: float) -> ModbusResponse:
+    """
+    Executes the request on asyncio modbus client protocol, timeouts are reported same as the sync client does
+    """
+    try:
+        return await asyncio.wait_for(protocol.execute(request), timeout)
+    except asyncio.TimeoutError:
+        raise ModbusIOException(f'No response received within {timeout} seconds')
+
+
+def _prepare_poll_point(device_address: int, zero_based: bool,
+                         point_register: int, point_register_length: int, point_fc: ModbusFunctionCode,
+                         point_data_type: ModbusDataType, point_data_endian: ModbusDataEndian,
+                         write_values: List[float],
+                         write_payload: List[int] = None,
+                         decoder: Union[RegisterDecoder, BitFieldDecoder] = None) -> (ModbusRequest, ResponseHandler):
     logger.debug('--------------- START MODBUS POLL POINT ---------------')
     logger.debug({'device_address': device_address,
                   'point_fc': point_fc,
@@ -176,50 +491,50 @@ def __poll_point(client: BaseModbusClient, device_address: int, zero_based: bool
         point_register -= 1
         logger.debug(f"Device zero_based True, [point_register - 1 = {point_register}]")
 
-    val = None
-    array = ""
-
     if point_fc in [ModbusFunctionCode.READ_COILS, ModbusFunctionCode.READ_DISCRETE_INPUTS]:
-        val, array = read_digital(client,
-                                  point_register,
-                                  point_register_length,
-                                  device_address,
-                                  point_fc)
+        request, handler = prepare_read_digital(point_register,
+                                                point_register_length,
+                                                device_address,
+                                                point_fc)
 
     elif point_fc in [ModbusFunctionCode.READ_HOLDING_REGISTERS, ModbusFunctionCode.READ_INPUT_REGISTERS]:
-        val, array = read_analogue(client,
-                                   point_register,
-                                   point_register_length,
-                                   device_address,
-                                   point_data_type,
-                                   point_data_endian,
-                                   point_fc)
+        request, handler = prepare_read_analogue(point_register,
+                                                 point_register_length,
+                                                 device_address,
+                                                 point_data_type,
+                                                 point_data_endian,
+                                                 point_fc,
+                                                 decoder)
 
     elif point_fc in [ModbusFunctionCode.WRITE_COIL, ModbusFunctionCode.WRITE_COILS]:
-        val, array = write_digital(client, point_register,
-                                   point_register_length,
-                                   device_address,
-                                   write_values,
-                                   point_fc)
+        request, handler = prepare_write_digital(point_register,
+                                                 point_register_length,
+                                                 device_address,
+                                                 write_values,
+                                                 point_fc)
     elif point_fc == ModbusFunctionCode.WRITE_REGISTER or (point_fc == ModbusFunctionCode.WRITE_REGISTERS and
                                                            point_data_type is not ModbusDataType.RAW):
-        val, array = write_analogue(client,
-                                    point_register,
-                                    point_register_length,
-                                    device_address,
-                                    point_data_type,
-                                    point_data_endian,
-                                    write_values[0],
-                                    point_fc)
+        request, handler = prepare_write_analogue(point_register,
+                                                  point_register_length,
+                                                  device_address,
+                                                  point_data_type,
+                                                  point_data_endian,
+                                                  write_values[0],
+                                                  point_fc,
+                                                  write_payload)
     elif point_fc is ModbusFunctionCode.WRITE_REGISTERS and point_data_type is ModbusDataType.RAW:
-        val, array = write_analogue_aggregate(client,
-                                              point_register,
-                                              point_register_length,
-                                              device_address,
-                                              write_values,
-                                              point_fc)
-
-    logger.debug(f'READ/WRITE SUCCESS: val: {val}, array: {array}')
-    logger.debug("--------------- END MODBUS POLL POINT ---------------")
-
-    return val, array
+        request, handler = prepare_write_analogue_aggregate(point_register,
+                                                            point_register_length,
+                                                            device_address,
+                                                            write_values,
+                                                            point_fc)
+    else:
+        raise Exception('Invalid Modbus function code', point_fc)
+
+    def logged_handler(response: ModbusResponse) -> (any, list):
+        val, array = handler(response)
+        logger.debug(f'READ/WRITE SUCCESS: val: {val}, array: {array}')
+        logger.debug("--------------- END MODBUS POLL POINT ---------------")
+        return val, array
+
+    return request, logged_handler
@@ -0,0 +1,369 @@
+import logging
+import heapq
+import time
+from typing import Dict, List, Set, Union, FrozenSet, Iterable, Tuple
+
+from sqlalchemy import inspect
+
+from src.drivers.modbus.enums.point.points import ModbusFunctionCode
+from src.drivers.modbus.models.device import ModbusDeviceModel
+from src.drivers.modbus.models.network import ModbusNetworkModel
+from src.drivers.modbus.models.point import ModbusPointModel
+from src.drivers.modbus.services.polling.function_utils import RegisterDecoder, BitFieldDecoder, get_point_decoder
+from src.drivers.modbus.services.polling.register_image import ModbusRegisterImage
+from src.models.point.point_transform import PointTransformTable
+from src.models.point.priority_array import PriorityArrayModel
+
+logger = logging.getLogger(__name__)
+
+# max registers (coils) per request, so the request and response fit into the 253 bytes of a modbus PDU
+MODBUS_MAX_REQUEST_LENGTH: Dict[ModbusFunctionCode, int] = {
+    ModbusFunctionCode.READ_COILS: 2000,
+    ModbusFunctionCode.READ_DISCRETE_INPUTS: 2000,
+    ModbusFunctionCode.READ_HOLDING_REGISTERS: 125,
+    ModbusFunctionCode.READ_INPUT_REGISTERS: 125,
+    ModbusFunctionCode.WRITE_COIL: 1,
+    ModbusFunctionCode.WRITE_REGISTER: 1,
+    ModbusFunctionCode.WRITE_COILS: 1968,
+    ModbusFunctionCode.WRITE_REGISTERS: 123,
+}
+
+# device attributes of the max request length learned by the device probe, by read function code
+PROBED_MAX_LENGTH_ATTRIBUTES: Dict[ModbusFunctionCode, str] = {
+    ModbusFunctionCode.READ_COILS: 'probed_max_coils',
+    ModbusFunctionCode.READ_DISCRETE_INPUTS: 'probed_max_discrete_inputs',
+    ModbusFunctionCode.READ_HOLDING_REGISTERS: 'probed_max_holding_registers',
+    ModbusFunctionCode.READ_INPUT_REGISTERS: 'probed_max_input_registers',
+}
+
+
+class ModbusPollGroup:
+    """
+    Points which are polled with a single modbus request, with their decoders resolved upfront.
+    Read groups refresh the register image of their function code, the points are decoded from it.
+    """
+
+    def __init__(self, points: List[ModbusPointModel], image: ModbusRegisterImage = None):
+        self.points: List[ModbusPointModel] = points
+        self.function_code: ModbusFunctionCode = points[0].function_code
+        self.decoders: List[Union[RegisterDecoder, BitFieldDecoder, None]] = [get_point_decoder(point)
+                                                                              for point in points]
+        self.image: Union[ModbusRegisterImage, None] = image
+        self.__transform_table: Union[PointTransformTable, None] = None
+        # registers (or bits) of the last read response which has been stored, and when
+        self.__response: Union[list, None] = None
+        self.__response_ts: float = 0
+
+    @property
+    def transform_table(self) -> PointTransformTable:
+        """
+        Value transforms of the points, built on the first stored response
+        """
+        if self.__transform_table is None:
+            self.__transform_table = PointTransformTable(self.points)
+        return self.__transform_table
+
+    def is_response_unchanged(self, response: list, refresh_period: int) -> bool:
+        """
+        Whether a read response repeats the last stored one, so its point values are up to date already.
+        A repeated response is stored again once in every refresh_period seconds, 0 stores every response.
+        """
+        now: float = time.monotonic()
+        if refresh_period and response == self.__response and now - self.__response_ts < refresh_period:
+            return True
+        self.__response = list(response)
+        self.__response_ts = now
+        return False
+
+    def reset_response(self):
+        """
+        A failed request faults the points, so the next response is stored whatever it is
+        """
+        self.__response = None
+
+
+class ModbusDevicePollPlan:
+    """
+    Compiled request groups of a device.
+    Points are split into classes by their poll_interval_ms (None for the network polling interval), the points of
+    the classes which are due together are coalesced into shared requests.
+    """
+
+    def __init__(self, device: ModbusDeviceModel, points: List[ModbusPointModel]):
+        self.device_uuid: str = device.uuid
+        self.point_uuids: Set[str] = {point.uuid for point in points}
+        self.intervals: Set[Union[int, None]] = {point.poll_interval_ms for point in points}
+        self.__device: ModbusDeviceModel = device
+        self.__points: List[ModbusPointModel] = points
+        self.images: Dict[ModbusFunctionCode, ModbusRegisterImage] = self.__create_images(points)
+        self.__groups: Dict[FrozenSet[Union[int, None]], List[ModbusPollGroup]] = {}
+        self.groups: List[ModbusPollGroup] = self.get_groups(self.intervals)
+        self.__writable_point_uuids: List[str] = [point.uuid for point in points
+                                                  if ModbusPointModel.is_writable(point.function_code)]
+
+    def get_groups(self, intervals: Iterable[Union[int, None]]) -> List[ModbusPollGroup]:
+        """
+        Request groups of the points of the given interval classes
+        """
+        key: FrozenSet[Union[int, None]] = frozenset(intervals) & self.intervals
+        if key not in self.__groups:
+            points: List[ModbusPointModel] = [point for point in self.__points if point.poll_interval_ms in key]
+            self.__groups[key] = [ModbusPollGroup(group, self.images.get(group[0].function_code))
+                                  for group in self.__group_points(self.__device, points)]
+        return self.__groups[key]
+
+    def refresh_priority_arrays(self):
+        """
+        Priority array writes don't dispatch model events, so write values are reloaded on each cycle
+        """
+        if self.__writable_point_uuids:
+            PriorityArrayModel.query \
+                .filter(PriorityArrayModel.point_uuid.in_(self.__writable_point_uuids)) \
+                .populate_existing() \
+                .all()
+
+    @staticmethod
+    def __create_images(points: List[ModbusPointModel]) -> Dict[ModbusFunctionCode, ModbusRegisterImage]:
+        """
+        Register images of the read function codes, spanning the registers of their points
+        """
+        spans: Dict[ModbusFunctionCode, Tuple[int, int]] = {}
+        for point in points:
+            if ModbusPointModel.is_writable(point.function_code):
+                continue
+            start, end = spans.get(point.function_code, (point.register, point.register))
+            spans[point.function_code] = (min(start, point.register), max(end, point.register + point.register_length))
+        return {fc: ModbusRegisterImage(start, end - start) for fc, (start, end) in spans.items()}
+
+    @staticmethod
+    def __group_points(device: ModbusDeviceModel, points: List[ModbusPointModel]) -> List[List[ModbusPointModel]]:
+        """
+        group and sort points into corresponding FCs, single writes are sent as multiple writes when aggregated
+        """
+        logger.debug(f'Device {device.uuid} aggregate R/W '
+                     f'{"SUPPORTED" if device.supports_multiple_rw else "UNSUPPORTED"}')
+        fc_lists: Dict[ModbusFunctionCode, List[ModbusPointModel]] = {}
+        for point in points:
+            point_fc: ModbusFunctionCode = point.function_code
+            if device.supports_multiple_rw:
+                if point_fc is ModbusFunctionCode.WRITE_COIL:
+                    point_fc = ModbusFunctionCode.WRITE_COILS
+                elif point_fc is ModbusFunctionCode.WRITE_REGISTER:
+                    point_fc = ModbusFunctionCode.WRITE_REGISTERS
+            fc_lists.setdefault(point_fc, []).append(point)
+
+        point_groups: List[List[ModbusPointModel]] = []
+        for point_fc, fc_list in fc_lists.items():
+            if ModbusPointModel.is_writable(point_fc):
+                if not device.supports_multiple_rw:
+                    # writes are sent one by one
+                    point_groups.extend([point] for point in fc_list)
+                    continue
+                # writes can't skip registers, fillers would overwrite whatever is in between, nor share registers
+                max_length: int = MODBUS_MAX_REQUEST_LENGTH[point_fc]
+                if device.max_registers_per_request:
+                    max_length = min(max_length, device.max_registers_per_request)
+                point_groups.extend(coalesce_points(fc_list, 0, max_length, overlapping=False))
+            else:
+                max_gap, max_length = get_read_limits(device, point_fc)
+                point_groups.extend(coalesce_points(fc_list, max_gap, max_length))
+        return point_groups
+
+
+def get_read_limits(device: ModbusDeviceModel, function_code: ModbusFunctionCode) -> Tuple[int, int]:
+    """
+    Max gap and max length of the read requests of a function code of a device.
+    Reads are aggregated when the device supports multiple R/W, or when the probe has learned the max request length
+    of the function code; the probed capabilities narrow down the configured ones. Without either, the reads still
+    share the request of a point which spans their registers.
+    """
+    probed_max_length: Union[int, None] = getattr(device, PROBED_MAX_LENGTH_ATTRIBUTES[function_code])
+    if not device.supports_multiple_rw and not probed_max_length:
+        return 0, 0
+    max_length: int = MODBUS_MAX_REQUEST_LENGTH[function_code]
+    if device.max_registers_per_request:
+        max_length = min(max_length, device.max_registers_per_request)
+    if probed_max_length:
+        max_length = min(max_length, probed_max_length)
+    max_gap: int = 0 if device.probed_gap_reads is False else device.max_gap or 0
+    return max_gap, max_length
+
+
+def coalesce_points(points: List[ModbusPointModel], max_gap: int, max_length: int,
+                    overlapping: bool = True) -> List[List[ModbusPointModel]]:
+    """
+    Splits points of a function code into request groups, sorted by register.
+    A point joins the current group when the unpolled registers in front of it are at most max_gap, and the request
+    still spans at most max_length registers (or bits). The filler registers are read and discarded on decoding.
+    Overlapping points share the registers they have in common, a point within the span of the group always joins it,
+    so the requests scale with the registers polled instead of the points. Without overlapping (writes) only
+    continuous points are grouped.
+    """
+    point_groups: List[List[ModbusPointModel]] = []
+    group: List[ModbusPointModel] = []
+    group_start = 0
+    group_end = 0
+    for point in sorted(points, key=lambda p: (p.register, -p.register_length)):
+        point_end: int = point.register + point.register_length
+        gap: int = point.register - group_end
+        if group and overlapping and point_end <= group_end:
+            group.append(point)
+            continue
+        if group and (gap <= max_gap if overlapping else gap == 0) and \
+                max(group_end, point_end) - group_start <= max_length:
+            group.append(point)
+            group_end = max(group_end, point_end)
+            continue
+        if group:
+            point_groups.append(group)
+        group = [point]
+        group_start = point.register
+        group_end = point_end
+    if group:
+        point_groups.append(group)
+    for point_group in point_groups:
+        logger.debug(f'Grouping {"SINGLE" if len(point_group) == 1 else "AGGREGATE"} FC '
+                     f'{point_group[0].function_code}')
+    return point_groups
+
+
+def get_group_register_length(points: List[ModbusPointModel]) -> int:
+    """
+    Registers (or bits) spanned by a request group, including the gap fillers
+    """
+    return max(point.register + point.register_length for point in points) - points[0].register
+
+
+class ModbusNetworkPollPlan:
+    """
+    Cached network, devices and device poll plans of a polling network.
+    It is built and used by the network polling thread (or coroutine) only, model events just mark parts of it as
+    stale, and they get reloaded on the next cycle.
+    The interval classes of the devices are scheduled on a heap ordered by their next deadline.
+    """
+
+    def __init__(self, network_uuid: str):
+        self.network_uuid: str = network_uuid
+        self.__network: Union[ModbusNetworkModel, None] = None
+        self.__devices: List[ModbusDeviceModel] = []
+        self.__device_plans: Dict[str, ModbusDevicePollPlan] = {}
+        self.__stale: bool = True
+        self.__stale_device_uuids: Set[str] = set()
+        # (deadline, sequence, device_uuid, poll_interval_ms), entries not matching __deadlines are outdated
+        self.__schedule: List[Tuple[float, int, str, Union[int, None]]] = []
+        self.__deadlines: Dict[Tuple[str, Union[int, None]], float] = {}
+        self.__sequence: int = 0
+
+    def invalidate(self):
+        self.__stale = True
+
+    def invalidate_device(self, device_uuid: str):
+        self.__stale_device_uuids.add(device_uuid)
+
+    def has_device(self, device_uuid: str) -> bool:
+        return any(device.uuid == device_uuid for device in self.__devices)
+
+    def get_device_uuid(self, point_uuid: str) -> Union[str, None]:
+        for device_plan in list(self.__device_plans.values()):
+            if point_uuid in device_plan.point_uuids:
+                return device_plan.device_uuid
+        return None
+
+    def get_network(self) -> Union[ModbusNetworkModel, None]:
+        if self.__stale:
+            self.__stale = False
+            self.__network = ModbusNetworkModel.query \
+                .filter_by(uuid=self.network_uuid, enable=True) \
+                .populate_existing() \
+                .first()
+            self.__devices = ModbusDeviceModel.query \
+                .filter_by(network_uuid=self.network_uuid, enable=True) \
+                .populate_existing() \
+                .all() if self.__network else []
+            device_uuids: Set[str] = {device.uuid for device in self.__devices}
+            self.__device_plans = {k: v for k, v in self.__device_plans.items() if k in device_uuids}
+            self.__deadlines = {k: v for k, v in self.__deadlines.items() if k[0] in device_uuids}
+        return self.__network
+
+    def get_devices(self) -> List[ModbusDeviceModel]:
+        return self.__devices
+
+    def get_device_plan(self, device: ModbusDeviceModel) -> ModbusDevicePollPlan:
+        device_plan: Union[ModbusDevicePollPlan, None] = self.__device_plans.get(device.uuid)
+        if device_plan is None or device.uuid in self.__stale_device_uuids:
+            self.__stale_device_uuids.discard(device.uuid)
+            points: List[ModbusPointModel] = ModbusPointModel.query \
+                .filter_by(device_uuid=device.uuid, enable=True) \
+                .populate_existing() \
+                .all()
+            device_plan = ModbusDevicePollPlan(device, points)
+            self.__device_plans[device.uuid] = device_plan
+            self.__reschedule_device(device_plan)
+        return device_plan
+
+    def get_due_polls(self, now: float) -> List[Tuple[ModbusDeviceModel, ModbusDevicePollPlan, List[ModbusPollGroup]]]:
+        """
+        Pops the interval classes which are due, and returns the request groups of them per device.
+        An overrun class is not polled again to catch up, its next deadline is set from now.
+        """
+        device_plans: List[ModbusDevicePollPlan] = [self.get_device_plan(device) for device in self.__devices]
+        due_intervals: Dict[str, List[Union[int, None]]] = {}
+        while self.__schedule and self.__schedule[0][0] <= now:
+            deadline, _, device_uuid, interval = heapq.heappop(self.__schedule)
+            if self.__deadlines.get((device_uuid, interval)) != deadline:
+                continue
+            due_intervals.setdefault(device_uuid, []).append(interval)
+            next_deadline: float = deadline + self.get_interval_seconds(interval)
+            self.__push(device_uuid, interval, next_deadline if next_deadline > now else
+                        now + self.get_interval_seconds(interval))
+        due_polls = []
+        for device, device_plan in zip(self.__devices, device_plans):
+            if device.uuid in due_intervals:
+                due_polls.append((device, device_plan, device_plan.get_groups(due_intervals[device.uuid])))
+        return due_polls
+
+    def get_next_deadline(self) -> Union[float, None]:
+        while self.__schedule and \
+                self.__deadlines.get((self.__schedule[0][2], self.__schedule[0][3])) != self.__schedule[0][0]:
+            heapq.heappop(self.__schedule)
+        return self.__schedule[0][0] if self.__schedule else None
+
+    def get_sleep_time(self) -> float:
+        """
+        Time until the next deadline, at most the network polling interval so the network changes are picked up
+        """
+        sleep_time: float = self.get_interval_seconds(None)
+        next_deadline: Union[float, None] = self.get_next_deadline()
+        if next_deadline is not None:
+            sleep_time = min(sleep_time, next_deadline - time.time())
+        return max(sleep_time, 0)
+
+    def get_interval_seconds(self, interval: Union[int, None]) -> float:
+        if interval:
+            return interval / 1000
+        return (self.__network and self.__network.polling_interval_runtime) or 2
+
+    def __reschedule_device(self, device_plan: ModbusDevicePollPlan):
+        """
+        New interval classes are due now, the existing ones keep their deadlines
+        """
+        now: float = time.time()
+        for key in [key for key in self.__deadlines if key[0] == device_plan.device_uuid]:
+            if key[1] not in device_plan.intervals:
+                del self.__deadlines[key]
+        for interval in device_plan.intervals:
+            if (device_plan.device_uuid, interval) not in self.__deadlines:
+                self.__push(device_plan.device_uuid, interval, now)
+
+    def __push(self, device_uuid: str, interval: Union[int, None], deadline: float):
+        self.__sequence += 1
+        self.__deadlines[(device_uuid, interval)] = deadline
+        heapq.heappush(self.__schedule, (deadline, self.__sequence, device_uuid, interval))
+
+
+def get_model_uuid(model) -> Union[str, None]:
+    """
+    Reads the primary key from the identity, so a model of other session is not refreshed from this thread
+    """
+    identity = inspect(model).identity
+    return identity[0] if identity else None
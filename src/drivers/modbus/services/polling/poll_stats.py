@@ -0,0 +1,195 @@
+from collections import deque
+from threading import Lock
+from typing import Deque, Dict, List, Union
+
+from src.drivers.modbus.services.polling.poll_plan import get_group_register_length
+from src.utils import Singleton
+
+
+class LatencyHistogram:
+    """
+    Durations in fixed millisecond buckets, the percentiles are taken from the last SAMPLE_SIZE durations
+    """
+    BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+    SAMPLE_SIZE = 1000
+
+    def __init__(self):
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+        self.buckets: List[int] = [0] * (len(self.BUCKETS_MS) + 1)
+        self.samples: Deque[float] = deque(maxlen=self.SAMPLE_SIZE)
+
+    def add(self, seconds: float):
+        milliseconds: float = seconds * 1000
+        self.count += 1
+        self.total += milliseconds
+        self.max = max(self.max, milliseconds)
+        self.samples.append(milliseconds)
+        for i, bound in enumerate(self.BUCKETS_MS):
+            if milliseconds <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, percent: float) -> Union[float, None]:
+        if not self.samples:
+            return None
+        samples: List[float] = sorted(self.samples)
+        return samples[min(int(len(samples) * percent / 100), len(samples) - 1)]
+
+    def to_dict(self) -> dict:
+        buckets: Dict[str, int] = {f'le_{bound}': count for bound, count in zip(self.BUCKETS_MS, self.buckets)}
+        buckets['inf'] = self.buckets[-1]
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count, 3) if self.count else None,
+            'max_ms': round(self.max, 3),
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'buckets': buckets,
+        }
+
+
+class ModbusRequestStats:
+    """
+    Counters of the requests sent to a network, device or request group, bytes are the modbus PDU sizes.
+    Points are the point values read or written by the requests answered without an exception, retries are the
+    requests sent again after a timeout, unchanged are the read responses which repeated the last one of their group.
+    """
+
+    def __init__(self):
+        self.requests: int = 0
+        self.points: int = 0
+        self.retries: int = 0
+        self.request_bytes: int = 0
+        self.response_bytes: int = 0
+        self.timeouts: int = 0
+        self.unchanged: int = 0
+        self.exception_codes: Dict[int, int] = {}
+        self.rtt: LatencyHistogram = LatencyHistogram()
+
+    def add(self, points: int, retries: int, request_bytes: int, response_bytes: int, rtt: Union[float, None],
+            no_response: bool, exception_code: Union[int, None], unchanged: bool = False):
+        self.requests += 1
+        self.retries += retries
+        if not no_response and exception_code is None:
+            self.points += points
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+        if unchanged:
+            self.unchanged += 1
+        if no_response:
+            self.timeouts += 1
+        elif rtt is not None:
+            self.rtt.add(rtt)
+        if exception_code is not None:
+            self.exception_codes[exception_code] = self.exception_codes.get(exception_code, 0) + 1
+
+    def to_dict(self) -> dict:
+        return {
+            'requests': self.requests,
+            'points': self.points,
+            'retries': self.retries,
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+            'timeouts': self.timeouts,
+            'unchanged': self.unchanged,
+            'exception_codes': {str(code): count for code, count in sorted(self.exception_codes.items())},
+            'rtt': self.rtt.to_dict(),
+        }
+
+
+class ModbusDeviceStats(ModbusRequestStats):
+
+    def __init__(self):
+        super().__init__()
+        self.groups: Dict[str, ModbusRequestStats] = {}
+
+    def to_dict(self) -> dict:
+        return {**super().to_dict(), 'groups': {key: group.to_dict() for key, group in self.groups.items()}}
+
+
+class ModbusNetworkStats(ModbusRequestStats):
+
+    def __init__(self):
+        super().__init__()
+        self.cycles: int = 0
+        self.overruns: int = 0
+        self.polling_interval: Union[float, None] = None
+        self.cycle_duration: LatencyHistogram = LatencyHistogram()
+        self.devices: Dict[str, ModbusDeviceStats] = {}
+
+    def to_dict(self) -> dict:
+        return {
+            **super().to_dict(),
+            'cycles': self.cycles,
+            'overruns': self.overruns,
+            'polling_interval_runtime': self.polling_interval,
+            'cycle_duration': self.cycle_duration.to_dict(),
+            'devices': {uuid: device.to_dict() for uuid, device in self.devices.items()},
+        }
+
+
+def get_request_group_key(transaction) -> str:
+    """
+    Request group of a poll transaction, by its function code and register span: e.g. READ_HOLDING_REGISTERS:1+10
+    """
+    return get_points_group_key(transaction.points)
+
+
+def get_points_group_key(points: list) -> str:
+    return f'{points[0].function_code.name}:{points[0].register}+{get_group_register_length(points)}'
+
+
+class ModbusPollStats(metaclass=Singleton):
+    """
+    Poll statistics by network, device and request group, kept in memory since the start or the last reset
+    """
+
+    def __init__(self):
+        self.__networks: Dict[str, ModbusNetworkStats] = {}
+        self.__lock = Lock()
+
+    def add_transaction(self, network_uuid: str, transaction):
+        """
+        :param transaction: executed ModbusPollTransaction
+        """
+        if network_uuid is None:
+            return
+        stats = (len(transaction.points), max(transaction.attempts - 1, 0), transaction.request_bytes,
+                 transaction.response_bytes, transaction.rtt, transaction.no_response, transaction.exception_code,
+                 transaction.unchanged)
+        with self.__lock:
+            network_stats: ModbusNetworkStats = self.__networks.setdefault(network_uuid, ModbusNetworkStats())
+            device_stats: ModbusDeviceStats = network_stats.devices.setdefault(transaction.device.uuid,
+                                                                               ModbusDeviceStats())
+            group_stats: ModbusRequestStats = device_stats.groups.setdefault(get_request_group_key(transaction),
+                                                                             ModbusRequestStats())
+            for request_stats in (network_stats, device_stats, group_stats):
+                request_stats.add(*stats)
+
+    def add_cycle(self, network_uuid: str, duration: float, polling_interval: float):
+        """
+        A cycle which takes longer than the polling interval of the network is an overrun
+        """
+        with self.__lock:
+            network_stats: ModbusNetworkStats = self.__networks.setdefault(network_uuid, ModbusNetworkStats())
+            network_stats.cycles += 1
+            network_stats.polling_interval = polling_interval
+            network_stats.cycle_duration.add(duration)
+            if duration > polling_interval:
+                network_stats.overruns += 1
+
+    def get_stats(self, network_uuid: str = None) -> dict:
+        with self.__lock:
+            return {uuid: network_stats.to_dict() for uuid, network_stats in self.__networks.items()
+                    if network_uuid is None or uuid == network_uuid}
+
+    def reset(self, network_uuid: str = None):
+        with self.__lock:
+            if network_uuid is None:
+                self.__networks.clear()
+            else:
+                self.__networks.pop(network_uuid, None)
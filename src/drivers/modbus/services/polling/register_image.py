@@ -0,0 +1,39 @@
+from array import array
+from typing import List
+
+from src.drivers.modbus.services.polling.function_utils import PackedRegisters
+
+
+class ModbusRegisterImage:
+    """
+    Shadow of the registers (or bits) of a read function code of a device, from the first to the last register of its
+    points, kept as an array of unsigned 16 bit values.
+    Responses of the request groups are copied in, and the points decode their values from it, so the points which
+    share registers are served by a single read.
+    """
+
+    __slots__ = ('register', 'registers')
+
+    def __init__(self, register: int, register_length: int):
+        self.register: int = register
+        self.registers: array = array('H', bytes(register_length * 2))
+
+    def update(self, register: int, values: List[int]):
+        """
+        :param register: first register of the values
+        :param values: registers (or bits) of a response, the ones out of the image span are dropped
+        """
+        offset: int = register - self.register
+        if offset < 0:
+            values = values[-offset:]
+            offset = 0
+        values = values[:max(len(self.registers) - offset, 0)]
+        self.registers[offset:offset + len(values)] = array('H', values)
+
+    def get(self, register: int, register_length: int) -> array:
+        offset: int = register - self.register
+        return self.registers[offset:offset + register_length]
+
+    def pack(self, register: int, register_length: int) -> PackedRegisters:
+        return PackedRegisters(self.get(register, register_length))
+
@@ -0,0 +1,88 @@
+import time
+from typing import Dict, List, Set, Tuple, Union
+
+from src.drivers.modbus.models.point import ModbusPointModel
+from src.drivers.modbus.services.polling.function_utils import _builder_data_type, _mod_point_data_endian
+from src.models.point.priority_array import PriorityArrayModel
+from src.utils import Singleton
+
+
+def get_priority_array_version(priority_array: Union[PriorityArrayModel, None]) -> Union[tuple, None]:
+    """
+    Version of the priority array, which is its 16 slot values
+    """
+    if priority_array is None:
+        return None
+    return priority_array.slots
+
+
+def get_write_version(point: ModbusPointModel) -> tuple:
+    """
+    Version of the write of a point, its priority array version along with the point details of the request
+    """
+    return (get_priority_array_version(point.priority_array_write), point.register, point.function_code,
+            point.data_type, point.data_endian)
+
+
+class ModbusWriteCache(metaclass=Singleton):
+    """
+    Encoded register payloads of the writable points, and their last successful writes, by their write version.
+    A write is due when its version has changed, or when the refresh period has elapsed since it was written.
+    """
+
+    def __init__(self):
+        self.__payloads: Dict[str, Tuple[tuple, List[int]]] = {}
+        self.__writes: Dict[str, Tuple[tuple, float]] = {}
+        self.__device_points: Dict[str, Set[str]] = {}
+
+    def get_payload(self, point: ModbusPointModel) -> List[int]:
+        """
+        :return: registers of the highest priority value of the point, in its data type and data endian
+        """
+        version: tuple = get_write_version(point)
+        payload: Union[Tuple[tuple, List[int]], None] = self.__payloads.get(point.uuid)
+        if payload is None or payload[0] != version:
+            write_value: float = PriorityArrayModel.get_highest_priority_value_from_priority_array(
+                point.priority_array_write) or 0
+            byteorder, word_order = _mod_point_data_endian(point.data_endian)
+            payload = self.__payloads[point.uuid] = (version, _builder_data_type(write_value, point.data_type,
+                                                                                 byteorder, word_order))
+        return payload[1]
+
+    def is_due(self, point: ModbusPointModel, refresh_period: Union[int, None]) -> bool:
+        """
+        :param refresh_period: seconds after which an unchanged value is written again, 0 writes it on every poll
+        and None never writes it again
+        """
+        if refresh_period == 0:
+            return True
+        write: Union[Tuple[tuple, float], None] = self.__writes.get(point.uuid)
+        if write is None or write[0] != get_write_version(point):
+            return True
+        return refresh_period is not None and time.time() - write[1] >= refresh_period
+
+    def set_written(self, point: ModbusPointModel, version: tuple):
+        """
+        :param version: write version of the point when its request was built
+        """
+        self.__writes[point.uuid] = (version, time.time())
+        self.__device_points.setdefault(point.device_uuid, set()).add(point.uuid)
+
+    def invalidate(self, point_uuid: str = None):
+        """
+        Drops the point (or all the points) so its next write is due
+        """
+        if point_uuid is None:
+            self.__payloads.clear()
+            self.__writes.clear()
+            self.__device_points.clear()
+        else:
+            self.__payloads.pop(point_uuid, None)
+            self.__writes.pop(point_uuid, None)
+
+    def invalidate_device(self, device_uuid: str):
+        """
+        Drops the written points of the device so their next writes are due
+        """
+        for point_uuid in self.__device_points.pop(device_uuid, ()):
+            self.invalidate(point_uuid)
@@ -4,3 +4,9 @@ import enum
 class HistoryType(enum.Enum):
     COV = 0,
     INTERVAL = 1
+
+
+class CovDecision(enum.Enum):
+    PUBLISH = 0
+    DEFER = 1
+    SKIP = 2
@@ -18,6 +18,7 @@ class DeviceModel(ModelBase):
     name = db.Column(db.String(80), nullable=False)
     enable = db.Column(db.Boolean(), nullable=False)
     fault = db.Column(db.Boolean(), nullable=True)
+    fault_message = db.Column(db.String())
     history_enable = db.Column(db.Boolean(), nullable=False, default=False)
     points = db.relationship('PointModel', cascade="all,delete", backref='device', lazy=True)
     driver = db.Column(db.Enum(Drivers), default=Drivers.GENERIC)
@@ -53,6 +54,7 @@ class DeviceModel(ModelBase):
     def get_model_event_type(self) -> EventType:
         return EventType.DEVICE_MODEL
 
-    def set_fault(self, is_fault: bool):
+    def set_fault(self, is_fault: bool, fault_message: str = None):
         self.fault = is_fault
+        self.fault_message = fault_message
         db.session.commit()
@@ -1,6 +1,7 @@
 import logging
 import random
 import re
+from typing import List, Tuple, Dict, Union, Set
 
 from sqlalchemy import UniqueConstraint
 from sqlalchemy.orm import validates
@@ -14,9 +15,12 @@ from src.models.model_base import ModelBase
 from src.models.network.model_network import NetworkModel
 from src.models.point.model_point_store import PointStoreModel
 from src.models.point.model_point_store_history import PointStoreHistoryModel
+from src.models.point.point_transform import PointTransformTable, apply_scale, transform_value, set_transform_fault
 from src.models.point.priority_array import PriorityArrayModel
 from src.services.event_service_base import Event, EventType
-from src.utils.math_functions import eval_arithmetic_expression
+from src.services.point_cov import PointCovPolicy
+from src.services.point_value_store import PointValueStore
+from src.utils.math_functions import ArithmeticExpression, compile_arithmetic_expression
 from src.utils.model_utils import validate_json
 
 logger = logging.getLogger(__name__)
@@ -38,6 +42,10 @@ class PointModel(ModelBase):
                                            uselist=False,
                                            cascade="all,delete")
     cov_threshold = db.Column(db.Float, nullable=False, default=0)
+    cov_percent_threshold = db.Column(db.Float, nullable=False, default=0)
+    cov_min_interval = db.Column(db.Float, nullable=False, default=0)
+    cov_max_interval = db.Column(db.Float, nullable=False, default=0)
+    fault_debounce = db.Column(db.Integer, nullable=False, default=0)
     value_round = db.Column(db.Integer(), nullable=False, default=2)
     value_operation = db.Column(db.String, nullable=True, default="x + 0")
     input_min = db.Column(db.Float())
@@ -71,11 +79,23 @@ class PointModel(ModelBase):
     def validate_value_operation(self, _, value):
         try:
             if value and value.strip():
-                eval_arithmetic_expression(value.lower().replace('x', str(random.randint(1, 9))))
+                compile_arithmetic_expression(value)(random.randint(1, 9))
         except Exception:
             raise ValueError("Invalid value_operation, must be a valid arithmetic expression")
         return value
 
+    def get_value_operation(self) -> Union[ArithmeticExpression, None]:
+        """
+        Compiled value_operation, cached on the point until its expression changes
+        """
+        value_operation: Union[str, None] = self.value_operation
+        if value_operation is None or not value_operation.strip():
+            return None
+        compiled: Union[ArithmeticExpression, None] = self.__dict__.get('_compiled_value_operation')
+        if compiled is None or compiled.expression != value_operation:
+            compiled = self._compiled_value_operation = compile_arithmetic_expression(value_operation)
+        return compiled
+
     @classmethod
     def find_by_name(cls, network_name: str, device_name: str, point_name: str):
         results = cls.query.filter_by(name=point_name) \
@@ -88,19 +108,62 @@ class PointModel(ModelBase):
         self.point_store = PointStoreModel.create_new_point_store_model(self.uuid)
         super().save_to_db()
 
-    def update_point_value(self, point_store: PointStoreModel, driver: Drivers, cov_threshold: float = None) -> bool:
+    def delete_from_db(self):
+        super().delete_from_db()
+        PointValueStore().remove(self.uuid)
+
+    def get_cov_policy(self) -> PointCovPolicy:
+        return PointCovPolicy(self.cov_threshold, self.cov_percent_threshold, self.cov_min_interval,
+                              self.cov_max_interval, self.fault_debounce)
+
+    def update_point_value(self, point_store: PointStoreModel, driver: Drivers,
+                           cov_policy: PointCovPolicy = None) -> bool:
         if not point_store.fault:
-            if cov_threshold is None:
-                cov_threshold = self.cov_threshold
-
-            value = point_store.value_original
-            if value is not None:
-                value = self.apply_scale(value, self.input_min, self.input_max, self.scale_min,
-                                         self.scale_max)
-                value = self.apply_value_operation(value, self.value_operation)
-                value = round(value, self.value_round)
-            point_store.value = self.apply_point_type(value)
-        return point_store.update(driver, cov_threshold)
+            try:
+                self.apply_point_store_value(point_store)
+            except Exception as e:
+                set_transform_fault(point_store, e)
+        return PointValueStore().update(point_store, driver, cov_policy or self.get_cov_policy())
+
+    def apply_point_store_value(self, point_store: PointStoreModel):
+        value = transform_value(point_store.value_original,
+                                (self.input_min, self.input_max, self.scale_min, self.scale_max),
+                                self.get_value_operation(), self.value_round)
+        point_store.value = self.apply_point_type(value)
+
+    @staticmethod
+    def update_point_values(point_stores: List[Tuple['PointModel', PointStoreModel]],
+                            transform_tables: List[Tuple[PointTransformTable, List[PointStoreModel]]] = None) \
+            -> List[Tuple['PointModel', PointStoreModel]]:
+        """
+        Bulk version of update_point_value, the values are transformed in batches and the point stores are compared
+        per driver
+        :param transform_tables: precomputed transform tables along with the point stores of their points, the rest
+        of the point stores are transformed with a table built here
+        :return: points with their changed point stores
+        """
+        transformed: Set[int] = set()
+        for transform_table, table_point_stores in transform_tables or []:
+            transform_table.apply(table_point_stores)
+            transformed.update(id(point_store) for point_store in table_point_stores)
+        untransformed: List[Tuple[PointModel, PointStoreModel]] = [
+            (point, point_store) for point, point_store in point_stores
+            if not point_store.fault and id(point_store) not in transformed]
+        if untransformed:
+            PointTransformTable([point for point, _ in untransformed]).apply(
+                [point_store for _, point_store in untransformed])
+        points_by_driver: Dict[Drivers, Dict[str, PointModel]] = {}
+        point_stores_by_driver: Dict[Drivers, List[PointStoreModel]] = {}
+        for point, point_store in point_stores:
+            points_by_driver.setdefault(point.driver, {})[point.uuid] = point
+            point_stores_by_driver.setdefault(point.driver, []).append(point_store)
+        updated: List[Tuple[PointModel, PointStoreModel]] = []
+        for driver, points in points_by_driver.items():
+            cov_policies: Dict[str, PointCovPolicy] = {point_uuid: point.get_cov_policy()
+                                                       for point_uuid, point in points.items()}
+            for point_store in PointValueStore().update_many(point_stores_by_driver[driver], driver, cov_policies):
+                updated.append((points[point_store.point_uuid], point_store))
+        return updated
 
     @validates('tags')
     def validate_tags(self, _, value):
@@ -123,6 +186,12 @@ class PointModel(ModelBase):
             raise ValueError("history_interval needs to be at least 1, default is 15 (in minutes)")
         return value
 
+    @validates('cov_threshold', 'cov_percent_threshold', 'cov_min_interval', 'cov_max_interval', 'fault_debounce')
+    def validate_cov_policy(self, key, value):
+        if value is not None and value < 0:
+            raise ValueError(f"{key} cannot be negative")
+        return value
+
     @validates('input_min')
     def validate_input_min(self, _, value):
         if value is not None and self.input_max is not None and value > self.input_max:
@@ -156,19 +225,25 @@ class PointModel(ModelBase):
     def update(self, **kwargs):
         super().update(**kwargs)
 
-        point_store: PointStoreModel = PointStoreModel.find_by_point_uuid(self.uuid)
-        updated: bool = self.update_point_value(point_store, self.driver, 0)
-        self.point_store = point_store
+        point_store: PointStoreModel = PointValueStore().get(self.uuid)
+        # re-applied with the new point details, any change of the value is published
+        cov_policy: PointCovPolicy = self.get_cov_policy()
+        cov_policy.threshold = cov_policy.percent_threshold = 0
+        updated: bool = self.update_point_value(point_store, self.driver, cov_policy)
 
         if updated:
-            self.publish_cov(self.point_store)
+            # written through, so the point_store of the returned point is up to date
+            PointValueStore().flush()
+            self.publish_cov(point_store)
 
         return self
 
     def update_point_store(self, value: float, priority: int, priority_array_write: dict):
-        self.update_priority_value(value, priority, priority_array_write)
-        highest_priority_value: float = PriorityArrayModel.get_highest_priority_value(self.uuid)
-        self.update_point_store_value(highest_priority_value)
+        """
+        Writes the priority array and the point store from its effective value, committed in one transaction
+        """
+        priority_array: PriorityArrayModel = self.write_priority_array(value, priority, priority_array_write)
+        self.update_point_store_value(PriorityArrayModel.get_highest_priority_value_from_priority_array(priority_array))
 
     def update_point_store_value(self, highest_priority_value: float):
         point_store = PointStoreModel(point_uuid=self.uuid,
@@ -179,37 +254,32 @@ class PointModel(ModelBase):
         db.session.commit()
 
     def update_priority_value(self, value: float, priority: int, priority_array_write: dict):
-        if priority_array_write:
-            PriorityArrayModel.filter_by_point_uuid(self.uuid).update(priority_array_write)
-            db.session.commit()
-            return
-        if not priority:
-            priority = 16
-        if priority not in range(1, 17):
-            raise ValueError('priority should be in range(1, 17)')
-        if priority:
-            PriorityArrayModel.filter_by_point_uuid(self.uuid).update({f"_{priority}": value})
-            db.session.commit()
+        self.write_priority_array(value, priority, priority_array_write)
+        db.session.commit()
+
+    def write_priority_array(self, value: float, priority: int, priority_array_write: dict) -> PriorityArrayModel:
+        """
+        Writes the priority_array_write slots, else the value at the priority (16 by default), left uncommitted
+        """
+        if not priority_array_write:
+            if not priority:
+                priority = 16
+            if priority not in range(1, 17):
+                raise ValueError('priority should be in range(1, 17)')
+            priority_array_write = {f"_{priority}": value}
+        return PriorityArrayModel.write_priority_array(self.uuid, priority_array_write)
 
     @classmethod
     def apply_value_operation(cls, original_value, value_operation: str) -> float or None:
         """Do calculations on original value with the help of point details"""
         if original_value is None or value_operation is None or not value_operation.strip():
             return original_value
-        return eval_arithmetic_expression(value_operation.lower().replace('x', str(original_value)))
+        return compile_arithmetic_expression(value_operation)(original_value)
 
     @classmethod
     def apply_scale(cls, value: float, input_min: float, input_max: float, output_min: float, output_max: float) \
             -> float or None:
-        if value is None or input_min is None or input_max is None or output_min is None or output_max is None:
-            return value
-        scaled = ((value - input_min) / (input_max - input_min)) * (output_max - output_min) + output_min
-        if scaled > max(output_max, output_min):
-            return max(output_max, output_min)
-        elif scaled < min(output_max, output_min):
-            return min(output_max, output_min)
-        else:
-            return scaled
+        return apply_scale(value, input_min, input_max, output_min, output_max)
 
     def apply_point_type(self, value: float) -> float:
         return value
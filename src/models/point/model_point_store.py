@@ -6,12 +6,11 @@ import gevent
 from flask import Response
 from rubix_http.method import HttpMethod
 from rubix_http.request import gw_request
-from sqlalchemy import and_, or_
+from sqlalchemy import bindparam
 
 from src import db
 from src.drivers.enums.drivers import Drivers
 from src.drivers.modbus.models.mapping import MPGBPMapping
-from src.utils.model_utils import get_datetime
 
 
 class PointStoreModelMixin(db.Model):
@@ -48,49 +47,44 @@ class PointStoreModel(PointStoreModelMixin):
         else:
             return None
 
-    def update(self, driver: Drivers, cov_threshold: float = None) -> bool:
-        ts = get_datetime()
-        if not self.fault:
-            self.fault = bool(self.fault)
-            res = db.session.execute(
-                self.__table__
-                    .update()
-                    .values(value=self.value,
-                            value_original=self.value_original,
-                            value_raw=self.value_raw,
-                            fault=False,
-                            fault_message=None,
-                            ts_value=ts)
-                    .where(and_(self.__table__.c.point_uuid == self.point_uuid,
-                                or_(self.__table__.c.value == None,
-                                    db.func.abs(self.__table__.c.value - self.value) > cov_threshold,
-                                    self.__table__.c.fault != self.fault))))
-            if res.rowcount:  # WARNING: this could cause secondary write to db is store if fetched/linked from DB
-                self.ts_value = ts
-        else:
-            res = db.session.execute(
-                self.__table__
-                    .update()
-                    .values(fault=self.fault,
-                            fault_message=self.fault_message,
-                            ts_fault=ts)
-                    .where(and_(self.__table__.c.point_uuid == self.point_uuid,
-                                or_(self.__table__.c.fault != self.fault,
-                                    self.__table__.c.fault_message != self.fault_message))))
-            if res.rowcount:  # WARNING: this could cause secondary write to db is store if fetched/linked from DB
-                self.ts_fault = ts
+    @classmethod
+    def find_all_by_point_uuids(cls, point_uuids: List[str]) -> List['PointStoreModel']:
+        return cls.query.filter(cls.point_uuid.in_(point_uuids)).all()
+
+    def sync_point_value(self, driver: Drivers):
+        if driver == Drivers.GENERIC:
+            """Generic > Modbus point value"""
+            self.__sync_point_value_gp_to_mp_process()
+            """Generic > BACnet point value"""
+            self.__sync_point_value_gp_to_bp_process()
+        elif driver == Drivers.MODBUS:
+            """Modbus > Generic | BACnet point value"""
+            self.__sync_point_value_mp_to_gbp_process()
+
+    @classmethod
+    def write_many(cls, point_stores: List['PointStoreModel']):
+        """
+        Writes the point stores with an executemany, committed in one transaction
+        """
+        table = cls.__table__
+        db.session.execute(table.update()
+                           .where(table.c.point_uuid == bindparam('_point_uuid'))
+                           .values(value=bindparam('_value'),
+                                   value_original=bindparam('_value_original'),
+                                   value_raw=bindparam('_value_raw'),
+                                   fault=bindparam('_fault'),
+                                   fault_message=bindparam('_fault_message'),
+                                   ts_value=bindparam('_ts_value'),
+                                   ts_fault=bindparam('_ts_fault')),
+                           [{'_point_uuid': point_store.point_uuid,
+                             '_value': point_store.value,
+                             '_value_original': point_store.value_original,
+                             '_value_raw': point_store.value_raw,
+                             '_fault': point_store.fault,
+                             '_fault_message': point_store.fault_message,
+                             '_ts_value': point_store.ts_value,
+                             '_ts_fault': point_store.ts_fault} for point_store in point_stores])
         db.session.commit()
-        updated: bool = bool(res.rowcount)
-        if updated:
-            if driver == Drivers.GENERIC:
-                """Generic > Modbus point value"""
-                self.__sync_point_value_gp_to_mp_process()
-                """Generic > BACnet point value"""
-                self.__sync_point_value_gp_to_bp_process()
-            elif driver == Drivers.MODBUS:
-                """Modbus > Generic | BACnet point value"""
-                self.__sync_point_value_mp_to_gbp_process()
-        return updated
 
     def __sync_point_value_gp_to_mp(self, modbus_point_uuid: str):
         gw_request(
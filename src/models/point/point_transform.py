@@ -0,0 +1,175 @@
+from typing import Callable, Dict, List, Tuple, Union
+
+from src.models.point.model_point_store import PointStoreModel
+from src.utils.math_functions import ArithmeticExpression
+
+try:
+    import numpy
+except ImportError:  # optional, the transforms fall back to pure python
+    numpy = None
+
+# smaller batches are quicker to transform in pure python than to copy in and out of arrays
+NUMPY_MIN_VALUES = 16
+
+
+def apply_scale(value: float, input_min: float, input_max: float, output_min: float, output_max: float) \
+        -> float or None:
+    if value is None or input_min is None or input_max is None or output_min is None or output_max is None:
+        return value
+    scaled = ((value - input_min) / (input_max - input_min)) * (output_max - output_min) + output_min
+    if scaled > max(output_max, output_min):
+        return max(output_max, output_min)
+    elif scaled < min(output_max, output_min):
+        return min(output_max, output_min)
+    else:
+        return scaled
+
+
+def transform_value(value: float, scale: Union[Tuple[float, float, float, float], None],
+                    value_operation: Union[ArithmeticExpression, None], value_round: int) -> float or None:
+    """
+    Scales, operates and rounds an original point value
+    :param scale: input_min, input_max, scale_min and scale_max, None when the point is not scaled
+    """
+    if value is None:
+        return value
+    return round(_scale_and_operate(value, scale, value_operation), value_round)
+
+
+def set_transform_fault(point_store: PointStoreModel, error: Exception):
+    point_store.value = None
+    point_store.fault = True
+    point_store.fault_message = f'Value transform failed: {str(error)}'
+
+
+def _scale_and_operate(value: float, scale: Union[Tuple[float, float, float, float], None],
+                       value_operation: Union[ArithmeticExpression, None]) -> float:
+    if scale:
+        value = apply_scale(value, *scale)
+    if value_operation:
+        value = value_operation(value)
+    return value
+
+
+class PointTransformTable:
+    """
+    Value transform parameters of a list of points, read off the point models once so a batch of their original
+    values is transformed (scale, value_operation, round and point type) in one pass.
+    The scales and operations run on NumPy arrays when NumPy is installed and the batch is large enough, in pure
+    python otherwise, both give the values of PointModel.apply_point_store_value.
+    """
+
+    def __init__(self, points: list):
+        self.point_uuids: List[str] = [point.uuid for point in points]
+        self.scales: List[Union[Tuple[float, float, float, float], None]] = []
+        self.value_operations: List[Union[ArithmeticExpression, None]] = [point.get_value_operation()
+                                                                          for point in points]
+        self.value_rounds: List[int] = [point.value_round for point in points]
+        self.point_types: List[Callable[[float], float]] = [point.apply_point_type for point in points]
+        for point in points:
+            scale = (point.input_min, point.input_max, point.scale_min, point.scale_max)
+            self.scales.append(None if any(limit is None for limit in scale) else scale)
+        self.__arrays: Union[dict, None] = None
+
+    def __len__(self) -> int:
+        return len(self.point_uuids)
+
+    def transform(self, values: List[Union[float, None]]) -> List[Union[float, None]]:
+        """
+        :param values: original values, in the order of the points
+        :return: final values
+        """
+        if numpy is not None and len(values) >= NUMPY_MIN_VALUES:
+            values = self.__scale_and_operate_numpy(values)
+        else:
+            values = [None if value is None else _scale_and_operate(value, scale, value_operation)
+                      for value, scale, value_operation in zip(values, self.scales, self.value_operations)]
+        # rounded by python, NumPy rounds half way values differently at times
+        return [point_type(None if value is None else round(value, value_round))
+                for point_type, value, value_round in zip(self.point_types, values, self.value_rounds)]
+
+    def transform_one(self, index: int, value: Union[float, None]) -> Union[float, None]:
+        """
+        :param index: index of the point
+        :param value: original value of the point
+        :return: final value
+        """
+        if value is not None:
+            value = round(_scale_and_operate(value, self.scales[index], self.value_operations[index]),
+                          self.value_rounds[index])
+        return self.point_types[index](value)
+
+    def apply(self, point_stores: List[PointStoreModel]):
+        """
+        Sets the values of the point stores from their original values, the faulty ones are left as they are.
+        When the batch fails (e.g. a division by zero) the values are transformed one by one, and the point stores of
+        the failing ones are faulted instead.
+        :param point_stores: point stores in the order of the points
+        """
+        try:
+            values: List[Union[float, None]] = self.transform([point_store.value_original
+                                                               for point_store in point_stores])
+        except Exception:
+            values = [self.__transform_or_fault(i, point_store) for i, point_store in enumerate(point_stores)]
+        for point_store, value in zip(point_stores, values):
+            if not point_store.fault:
+                point_store.value = value
+
+    def __transform_or_fault(self, index: int, point_store: PointStoreModel) -> Union[float, None]:
+        if point_store.fault:
+            return None
+        try:
+            return self.transform_one(index, point_store.value_original)
+        except Exception as e:
+            set_transform_fault(point_store, e)
+            return None
+
+    def __scale_and_operate_numpy(self, values: List[Union[float, None]]) -> List[Union[float, None]]:
+        arrays: dict = self.__get_arrays()
+        missing = numpy.array([value is None for value in values])
+        originals = numpy.array([numpy.nan if value is None else value for value in values], dtype=float)
+        results = originals.copy()
+        with numpy.errstate(all='ignore'):
+            scaled = arrays['scaled']
+            if scaled.any():
+                results[scaled] = numpy.clip(
+                    (originals[scaled] - arrays['input_min']) / arrays['input_range'] * arrays['scale_range'] +
+                    arrays['scale_min'], arrays['lower'], arrays['upper'])
+            for value_operation, indexes in arrays['value_operations']:
+                results[indexes] = value_operation(results[indexes])
+        # divisions by zero and overflows are evaluated by python, which raises as the pure python pass would
+        python = (~numpy.isfinite(results) | arrays['python']) & ~missing
+        results_list: List[Union[float, None]] = results.tolist()
+        for i in numpy.flatnonzero(python).tolist():
+            results_list[i] = _scale_and_operate(values[i], self.scales[i], self.value_operations[i])
+        for i in numpy.flatnonzero(missing).tolist():
+            results_list[i] = None
+        return results_list
+
+    def __get_arrays(self) -> dict:
+        """
+        Parameter arrays of the NumPy pass, built on its first run
+        """
+        if self.__arrays is None:
+            # a point with an empty input range divides by zero, it is evaluated by python
+            python = numpy.array([scale is not None and scale[0] == scale[1] for scale in self.scales], dtype=bool)
+            scaled = numpy.array([scale is not None for scale in self.scales], dtype=bool) & ~python
+            scales = numpy.array([scale for scale, is_scaled in zip(self.scales, scaled) if is_scaled],
+                                 dtype=float).reshape(-1, 4)
+            value_operations: Dict[ArithmeticExpression, List[int]] = {}
+            for i, value_operation in enumerate(self.value_operations):
+                if value_operation:
+                    value_operations.setdefault(value_operation, []).append(i)
+            self.__arrays = {
+                'python': python,
+                'scaled': scaled,
+                'input_min': scales[:, 0],
+                'input_range': scales[:, 1] - scales[:, 0],
+                'scale_min': scales[:, 2],
+                'scale_range': scales[:, 3] - scales[:, 2],
+                'lower': numpy.minimum(scales[:, 2], scales[:, 3]),
+                'upper': numpy.maximum(scales[:, 2], scales[:, 3]),
+                'value_operations': [(value_operation, numpy.array(indexes))
+                                     for value_operation, indexes in value_operations.items()],
+            }
+        return self.__arrays
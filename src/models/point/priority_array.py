@@ -1,7 +1,30 @@
+from typing import Iterable, Tuple, Union
+
+from sqlalchemy.orm import validates
+
 from src import db
 
+PRIORITIES = range(1, 17)
+PRIORITY_KEYS = tuple(f'_{priority}' for priority in PRIORITIES)
+
+
+def get_active_priority_value(slots: Iterable[Union[float, None]]) -> Tuple[Union[int, None], Union[float, None]]:
+    """
+    :param slots: the 16 slot values, priority 1 first
+    :return: the highest priority holding a value along with that value, (None, None) when all the slots are empty
+    """
+    for priority, value in zip(PRIORITIES, slots):
+        if value is not None:
+            return priority, value
+    return None, None
+
 
 class PriorityArrayModel(db.Model):
+    """
+    The 16 priority slots of a writable point, along with the active priority and its effective value which are
+    kept up to date on every slot write, so a write stores its slot and the effective value in the same UPDATE and
+    reading the effective value back doesn't scan the slots.
+    """
     __tablename__ = 'priority_array'
     point_uuid = db.Column(db.String, db.ForeignKey('points.uuid'), primary_key=True, nullable=False)
     _1 = db.Column(db.Float(), nullable=True)
@@ -20,10 +43,37 @@ class PriorityArrayModel(db.Model):
     _14 = db.Column(db.Float(), nullable=True)
     _15 = db.Column(db.Float(), nullable=True)
     _16 = db.Column(db.Float(), nullable=True)
+    active_priority = db.Column(db.Integer(), nullable=True)
+    effective_value = db.Column(db.Float(), nullable=True)
 
     def __repr__(self):
         return f"PriorityArray(uuid = {self.point_uuid})"
 
+    @validates(*PRIORITY_KEYS)
+    def validate_slot(self, key, value):
+        slots: list = list(self.slots)
+        slots[PRIORITY_KEYS.index(key)] = value
+        self.active_priority, self.effective_value = get_active_priority_value(slots)
+        return value
+
+    @property
+    def slots(self) -> Tuple[Union[float, None], ...]:
+        """
+        The 16 slot values, priority 1 first
+        """
+        return tuple(getattr(self, key) for key in PRIORITY_KEYS)
+
+    def write(self, priority_array_write: dict):
+        """
+        Sets the given slots, the active priority and the effective value follow
+        :param priority_array_write: values by slot key (_1 to _16), None releases a slot
+        """
+        for key in priority_array_write:
+            if key not in PRIORITY_KEYS:
+                raise ValueError(f'Invalid priority_array_write key {key}, it should be one of _1 to _16')
+        for key, value in priority_array_write.items():
+            setattr(self, key, value)
+
     @classmethod
     def create_priority_array_model(cls, point_uuid, priority_array_write):
         return PriorityArrayModel(point_uuid=point_uuid, **priority_array_write)
@@ -32,16 +82,34 @@ class PriorityArrayModel(db.Model):
     def filter_by_point_uuid(cls, point_uuid):
         return cls.query.filter_by(point_uuid=point_uuid)
 
+    @classmethod
+    def find_by_point_uuid(cls, point_uuid: str) -> Union['PriorityArrayModel', None]:
+        """
+        Served from the session when it holds the priority array already
+        """
+        return cls.query.get(point_uuid)
+
+    @classmethod
+    def write_priority_array(cls, point_uuid: str, priority_array_write: dict) -> Union['PriorityArrayModel', None]:
+        """
+        Writes the slots of the priority array of a point, left uncommitted
+        :return: the written priority array, None if the point has none
+        """
+        priority_array: Union[PriorityArrayModel, None] = cls.find_by_point_uuid(point_uuid)
+        if priority_array is not None:
+            priority_array.write(priority_array_write)
+        return priority_array
+
     @classmethod
     def get_highest_priority_value(cls, point_uuid):
-        priority_array: PriorityArrayModel = cls.filter_by_point_uuid(point_uuid).first()
+        priority_array: PriorityArrayModel = cls.find_by_point_uuid(point_uuid)
         return cls.get_highest_priority_value_from_priority_array(priority_array)
 
     @classmethod
     def get_highest_priority_value_from_priority_array(cls, priority_array):
         if priority_array:
-            for i in range(1, 17):
-                value = getattr(priority_array, f'_{i}', None)
-                if value is not None:
-                    return value
+            if priority_array.active_priority is not None:
+                return priority_array.effective_value
+            # the arrays stored before the effective value was kept have it empty, their slots are scanned
+            return get_active_priority_value(priority_array.slots)[1]
         return None
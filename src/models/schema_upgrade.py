@@ -0,0 +1,50 @@
+import logging
+from typing import List, Set, Tuple
+
+from sqlalchemy import MetaData, Table, UniqueConstraint, inspect, literal
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import Column
+
+logger = logging.getLogger(__name__)
+
+
+def upgrade_schema(engine: Engine, metadata: MetaData):
+    """
+    db.create_all only creates the missing tables, so the columns added to the models are added here to the existing
+    tables, the rows already there get the scalar default of the column.
+    The unique constraints changed on the models are not altered, they are logged as their table needs to be
+    recreated (dropped from the database and created again on start) for them.
+    """
+    inspector = inspect(engine)
+    table_names: Set[str] = set(inspector.get_table_names())
+    for table in metadata.sorted_tables:
+        if table.name not in table_names:
+            continue
+        column_names: Set[str] = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in column_names:
+                _add_column(engine, table, column)
+        unique_constraints: List[Tuple[str, ...]] = [tuple(sorted(constraint['column_names']))
+                                                     for constraint in inspector.get_unique_constraints(table.name)]
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint):
+                column_names: Tuple[str, ...] = tuple(sorted(column.name for column in constraint.columns))
+                if column_names not in unique_constraints:
+                    logger.warning(f'Table {table.name} is missing the unique constraint on {", ".join(column_names)}, '
+                                   f'drop the table to have it created again with it')
+
+
+def _add_column(engine: Engine, table: Table, column: Column):
+    preparer = engine.dialect.identifier_preparer
+    ddl: str = f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} ' \
+               f'{column.type.compile(dialect=engine.dialect)}'
+    default = column.default.arg if column.default is not None and column.default.is_scalar else None
+    if default is not None:
+        ddl += f' DEFAULT {literal(default).compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})}'
+        if not column.nullable:
+            ddl += ' NOT NULL'
+    elif not column.nullable:
+        logger.warning(f'Column {table.name}.{column.name} has no default for the existing rows, it is added nullable')
+    logger.info(f'Upgrading schema: {ddl}')
+    with engine.begin() as connection:
+        connection.execute(ddl)
@@ -35,6 +35,9 @@ device_return_attributes = {
         'nested': True,
         'dict': 'driver.name'
     },
+    'fault_message': {
+        'type': str,
+    },
     'created_on': {
         'type': str,
     },
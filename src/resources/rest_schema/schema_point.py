@@ -3,6 +3,7 @@ from collections import OrderedDict
 from flask_restful import fields, reqparse
 
 from src.resources.utils import map_rest_schema
+from src.services.point_value_store import PointValueStore
 
 priority_array_write_fields = OrderedDict({
     '_1': fields.Float,
@@ -67,6 +68,18 @@ point_all_attributes = {
     'cov_threshold': {
         'type': float,
     },
+    'cov_percent_threshold': {
+        'type': float,
+    },
+    'cov_min_interval': {
+        'type': float,
+    },
+    'cov_max_interval': {
+        'type': float,
+    },
+    'fault_debounce': {
+        'type': int,
+    },
     'value_round': {
         'type': int,
     },
@@ -109,7 +122,8 @@ point_return_attributes = {
         'type': fields.Nested(priority_array_write_fields),
     },
     'point_store': {
-        'type': fields.Nested(point_store_fields),
+        # live point store, the point_stores table is written behind
+        'type': fields.Nested(point_store_fields, attribute=lambda point: PointValueStore().get(point.uuid)),
     }
 }
 
@@ -12,7 +12,9 @@ from src.drivers.generic.resources.point.point_singular import GenericPointSingu
     GenericPointSingularByName
 from src.drivers.generic.resources.point.point_value_writer import GenericPointUUIDValueWriter, \
     GenericPointNameValueWriter
+from src.drivers.modbus.resources.device.device_plan import ModbusDevicePlanResource
 from src.drivers.modbus.resources.device.device_plural import ModbusDevicePlural
+from src.drivers.modbus.resources.device.device_probe import ModbusDeviceProbeResource
 from src.drivers.modbus.resources.device.device_singular import ModbusDeviceSingularByUUID, \
     ModbusDeviceSingularByName
 from src.drivers.modbus.resources.mapping.mapping import MPGBPMappingResourceList, \
@@ -29,6 +31,7 @@ from src.drivers.modbus.resources.point.point_stores import ModbusPointPluralPoi
     ModbusDevicePointPluralPointStore
 from src.drivers.modbus.resources.point.point_sync import MPToBPSync
 from src.drivers.modbus.resources.point.point_value_writer import ModbusPointUUIDValueWriter, ModbusPointNameValueWriter
+from src.drivers.modbus.resources.stats.stats import ModbusPollStatsResource
 from src.resources.resource_device import DeviceResourceByUUID, DeviceResourceByName, DeviceResourceList
 from src.resources.resource_network import NetworkResourceByUUID, NetworkResourceByName, NetworkResourceList
 from src.resources.resource_point import PointResourceByUUID, PointResourceByName, PointResourceList
@@ -78,6 +81,8 @@ api_modbus.add_resource(ModbusNetworkSingularByName, '/networks/name/<string:nam
 api_modbus.add_resource(ModbusDevicePlural, '/devices')
 api_modbus.add_resource(ModbusDeviceSingularByUUID, '/devices/uuid/<string:uuid>')
 api_modbus.add_resource(ModbusDeviceSingularByName, '/devices/name/<string:network_name>/<string:device_name>')
+api_modbus.add_resource(ModbusDeviceProbeResource, '/devices/uuid/<string:uuid>/probe')
+api_modbus.add_resource(ModbusDevicePlanResource, '/devices/uuid/<string:uuid>/plan')
 api_modbus.add_resource(ModbusPointPlural, '/points')
 api_modbus.add_resource(ModbusPointSingularByUUID, '/points/uuid/<string:uuid>')
 api_modbus.add_resource(ModbusPointSingularByName,
@@ -90,6 +95,7 @@ api_modbus.add_resource(ModbusDevicePointPluralPointStore, '/<string:device_uuid
 api_modbus.add_resource(ModbusPointUUIDValueWriter, '/points_value/uuid/<string:uuid>')
 api_modbus.add_resource(ModbusPointNameValueWriter,
                         '/points_value/name/<string:network_name>/<string:device_name>/<string:point_name>')
+api_modbus.add_resource(ModbusPollStatsResource, '/stats')
 
 # Modbus <> Generic|BACnet points mappings
 bp_mapping_mp_gbp = Blueprint('mappings_mp_gbp', __name__, url_prefix='/api/mappings/mp_gbp')
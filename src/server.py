@@ -31,6 +31,7 @@ def init_gunicorn_option(_options=None):
                     'logger_class': Logger.__module__ + '.' + Logger.__name__,
                     'when_ready': when_ready,
                     'timeout': 120,
+                    'worker_exit': worker_exit,
                     'on_exit': on_exit})
     return options
 
@@ -39,6 +40,12 @@ def on_exit(server: Arbiter):
     server.log.info('Server is stopped')
 
 
+def worker_exit(_: Arbiter, worker):
+    """Writes the live point values which are not flushed yet"""
+    from src.services.point_value_store import PointValueStore
+    PointValueStore().flush_on_exit(worker.wsgi)
+
+
 def when_ready(server: Arbiter):
     server.log.info("Server is ready. Doing something before spawning workers...")
 
@@ -65,6 +72,8 @@ class GunicornFlaskApplication(BaseApplication, ABC):
         output = super(GunicornFlaskApplication, self).wsgi()
         with self.application.app_context():
             db.create_all()
+            from src.models.schema_upgrade import upgrade_schema
+            upgrade_schema(db.engine, db.metadata)
             from src.background import Background
             Background.run()
         return output
@@ -0,0 +1,131 @@
+import logging
+from threading import RLock
+from typing import Dict, List, Set, Union
+
+from gevent import thread
+
+from src import db
+from src.drivers.enums.drivers import Drivers
+from src.drivers.generic.models.point import GenericPointModel
+from src.models.point.model_point_store import PointStoreModel
+from src.services.calculation_graph import CalculationGraph
+from src.services.event_service_base import EventServiceBase, Event, EventType
+from src.services.point_value_store import PointValueStore
+from src.utils import Singleton
+from src.utils.math_functions import CalculationExpression
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME_CALCULATED_POINTS = 'calculated_points'
+
+
+class CalculatedPoints(EventServiceBase, metaclass=Singleton):
+    """
+    Computes the generic points which have a calculation, an arithmetic expression of other points.
+    The POINT_COV events mark their points as changed, and every TICK_PERIOD seconds the calculated points depending
+    on the changed ones (directly or through other calculated points) are recomputed once each, in topological order,
+    so a calculated point sees the new values of the calculated points it depends on.
+    The results go through the COV of the point and publish_cov, as the values of the other points do.
+    The dependency graph is rebuilt on the POINT_MODEL events, all the calculated points are recomputed then (as the
+    points they depend on may have gone), the unchanged results are dropped by their COV.
+    """
+    TICK_PERIOD = 0.5
+
+    def __init__(self):
+        super().__init__(SERVICE_NAME_CALCULATED_POINTS, False)
+        self.supported_events[EventType.POINT_COV] = True
+        self.supported_events[EventType.POINT_MODEL] = True
+        self.__graph: CalculationGraph = CalculationGraph({})
+        self.__changed: Set[str] = set()
+        self.__computing: Set[str] = set()
+        self.__stale: bool = True
+        self.__lock = RLock()
+
+    def run(self):
+        from src.event_dispatcher import EventDispatcher
+        EventDispatcher().add_service(self)
+        logger.info(f'Calculated points: recomputing the changed calculations every {self.TICK_PERIOD} seconds')
+        while True:
+            try:
+                self.tick()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f'Calculated points: {str(e)}')
+            thread.sleep(self.TICK_PERIOD)
+
+    def tick(self):
+        with self.__lock:
+            stale, self.__stale = self.__stale, False
+            changed, self.__changed = self.__changed, set()
+        if stale:
+            self.__rebuild()
+            # the cyclic ones first, they only get their fault
+            point_uuids: List[str] = sorted(self.__graph.inputs,
+                                            key=lambda point_uuid: self.__graph.ranks.get(point_uuid, -1))
+        else:
+            point_uuids: List[str] = self.__graph.get_affected(changed)
+        if point_uuids:
+            self.__compute(point_uuids)
+
+    def _run_event(self, event: Event):
+        if event.event_type is EventType.POINT_COV:
+            point_uuid: str = event.data.get('point').uuid
+            with self.__lock:
+                if point_uuid in self.__graph.dependents and point_uuid not in self.__computing:
+                    self.__changed.add(point_uuid)
+        elif event.event_type is EventType.POINT_MODEL:
+            with self.__lock:
+                self.__stale = True
+
+    def __rebuild(self):
+        points: List[GenericPointModel] = GenericPointModel.query.filter(GenericPointModel.calculation.isnot(None)) \
+            .all()
+        graph: CalculationGraph = CalculationGraph({point.uuid: point.get_calculation_inputs().values()
+                                                    for point in points if point.is_calculated()})
+        for point_uuid in graph.cyclic - self.__graph.cyclic:
+            logger.error(f'Calculated points: point {point_uuid} calculation has a circular dependency')
+        with self.__lock:
+            self.__graph = graph
+
+    def __compute(self, point_uuids: List[str]):
+        points: Dict[str, GenericPointModel] = {
+            point.uuid: point for point in GenericPointModel.query.filter(GenericPointModel.uuid.in_(point_uuids))}
+        with self.__lock:
+            self.__computing = set(point_uuids)
+        try:
+            for point_uuid in point_uuids:
+                point: Union[GenericPointModel, None] = points.get(point_uuid)
+                if point is None or not point.is_calculated():
+                    continue
+                point_store: PointStoreModel = self.__calculate(point)
+                if point.update_point_value(point_store, Drivers.GENERIC):
+                    point.publish_cov(point_store)
+            db.session.commit()
+        finally:
+            with self.__lock:
+                self.__computing = set()
+
+    def __calculate(self, point: GenericPointModel) -> PointStoreModel:
+        """
+        Point store of the calculated value, faulty when an input has no value or the calculation fails
+        """
+        if point.uuid in self.__graph.cyclic:
+            return self.__fault(point, 'calculation has a circular dependency')
+        calculation: CalculationExpression = point.get_calculation()
+        values: Dict[str, float] = {}
+        for variable, input_uuid in point.get_calculation_inputs().items():
+            if variable not in calculation.names:
+                continue
+            input_point_store: Union[PointStoreModel, None] = PointValueStore().get(input_uuid)
+            if input_point_store is None or input_point_store.fault or input_point_store.value is None:
+                return self.__fault(point, f'calculation input {variable} has no value')
+            values[variable] = input_point_store.value
+        try:
+            value: float = calculation(values)
+        except (ArithmeticError, ValueError) as e:
+            return self.__fault(point, f'calculation failed, {str(e)}')
+        return PointStoreModel(point_uuid=point.uuid, value_original=value)
+
+    @staticmethod
+    def __fault(point: GenericPointModel, fault_message: str) -> PointStoreModel:
+        return PointStoreModel(point_uuid=point.uuid, fault=True, fault_message=fault_message)
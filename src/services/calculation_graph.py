@@ -0,0 +1,52 @@
+from typing import Dict, Iterable, List, Set
+
+
+class CalculationGraph:
+    """
+    Dependency graph of the calculated points, by point uuid.
+    The calculated points are ranked in topological order, so a calculated point is recomputed after the calculated
+    points it depends on. The ones in a dependency cycle, or depending on one, are left out of the ranking as cyclic.
+    """
+
+    def __init__(self, inputs: Dict[str, Iterable[str]]):
+        """
+        :param inputs: input point uuids by calculated point uuid
+        """
+        self.inputs: Dict[str, Set[str]] = {point_uuid: set(input_uuids) for point_uuid, input_uuids in inputs.items()}
+        self.dependents: Dict[str, Set[str]] = {}
+        for point_uuid, input_uuids in self.inputs.items():
+            for input_uuid in input_uuids:
+                self.dependents.setdefault(input_uuid, set()).add(point_uuid)
+        self.ranks: Dict[str, int] = self.__rank()
+        self.cyclic: Set[str] = set(self.inputs) - set(self.ranks)
+
+    def get_affected(self, point_uuids: Iterable[str]) -> List[str]:
+        """
+        :param point_uuids: changed points
+        :return: calculated points depending on them, directly or not, in topological order
+        """
+        affected: Set[str] = set()
+        stack: List[str] = list(point_uuids)
+        while stack:
+            for dependent in self.dependents.get(stack.pop(), ()):
+                if dependent not in affected and dependent in self.ranks:
+                    affected.add(dependent)
+                    stack.append(dependent)
+        return sorted(affected, key=self.ranks.__getitem__)
+
+    def __rank(self) -> Dict[str, int]:
+        """
+        Kahn's algorithm over the calculated points, the inputs which aren't calculated points are ready from the start
+        """
+        pending: Dict[str, int] = {point_uuid: len(input_uuids & self.inputs.keys())
+                                   for point_uuid, input_uuids in self.inputs.items()}
+        ready: List[str] = [point_uuid for point_uuid, count in pending.items() if not count]
+        ranks: Dict[str, int] = {}
+        while ready:
+            point_uuid: str = ready.pop()
+            ranks[point_uuid] = len(ranks)
+            for dependent in self.dependents.get(point_uuid, ()):
+                pending[dependent] -= 1
+                if not pending[dependent]:
+                    ready.append(dependent)
+        return ranks
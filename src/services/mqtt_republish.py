@@ -8,6 +8,7 @@ from src.models.network.model_network import NetworkModel
 from src.models.point.model_point import PointModel
 from src.models.point.model_point_store import PointStoreModel
 from src.services.mqtt_client import MqttRegistry
+from src.services.point_value_store import PointValueStore
 from src.utils import Singleton
 
 logger = logging.getLogger(__name__)
@@ -45,7 +46,7 @@ class MqttRepublish(metaclass=Singleton):
         self.__points: List[PointModel] = PointModel.find_all()
         for point in self.__points:
             point.dispatch_event(point.to_dict())
-            point_store: PointStoreModel = PointStoreModel.find_by_point_uuid(point.uuid)
+            point_store: PointStoreModel = PointValueStore().get(point.uuid)
             point.publish_cov(point_store)
 
     def _publish_networks(self):
@@ -0,0 +1,100 @@
+from typing import Union
+
+from src.drivers.enums.drivers import Drivers
+from src.enums.point import CovDecision
+
+
+class PointCovPolicy:
+    """
+    COV rules of a point:
+        - threshold: absolute deadband
+        - percent_threshold: deadband in percent of the last published value, the larger of both deadbands applies
+        - min_interval: seconds after a publish during which the value changes are held back, the last one held is
+          published when it elapses
+        - max_interval: seconds without publish after which the value is published again as a heartbeat, 0 never
+        - fault_debounce: consecutive faulty samples which are dropped before the fault is published
+    """
+    __slots__ = ('threshold', 'percent_threshold', 'min_interval', 'max_interval', 'fault_debounce')
+
+    def __init__(self, threshold: float = 0, percent_threshold: float = 0, min_interval: float = 0,
+                 max_interval: float = 0, fault_debounce: int = 0):
+        self.threshold: float = threshold or 0
+        self.percent_threshold: float = percent_threshold or 0
+        self.min_interval: float = min_interval or 0
+        self.max_interval: float = max_interval or 0
+        self.fault_debounce: int = fault_debounce or 0
+
+    def is_change(self, published_value: float, value: Union[float, None]) -> bool:
+        if value is None:
+            return False
+        deadband: float = max(self.threshold, abs(published_value) * self.percent_threshold / 100)
+        return abs(published_value - value) > deadband
+
+
+class PointCovState:
+    """
+    COV state machine of a live point value, a new sample is:
+        - PUBLISH: the first value, the recovery of a fault, a change beyond the deadband once min_interval has
+          elapsed since the last publish, a fault past its debounce or a fault with a new message
+        - DEFER: a change beyond the deadband within min_interval, it is held as the pending sample (in place of the
+          previous one) and published when is_due
+        - SKIP: otherwise, a value back within the deadband drops the pending sample
+    The samples and the live values are point stores (value, fault and fault_message).
+    """
+    __slots__ = ('policy', 'driver', 'published_at', 'faults', 'pending')
+
+    def __init__(self):
+        self.policy: PointCovPolicy = PointCovPolicy()
+        self.driver: Union[Drivers, None] = None
+        self.published_at: Union[float, None] = None
+        self.faults: int = 0
+        self.pending = None
+
+    def on_sample(self, live_value, point_store, now: float) -> CovDecision:
+        if point_store.fault:
+            return self.__on_fault(live_value, point_store, now)
+        self.faults = 0
+        if live_value.value is None or live_value.fault:
+            return self.__publish(now)
+        if not self.policy.is_change(live_value.value, point_store.value):
+            self.pending = None
+            return CovDecision.SKIP
+        if self.published_at is not None and now - self.published_at < self.policy.min_interval:
+            self.pending = point_store
+            return CovDecision.DEFER
+        return self.__publish(now)
+
+    def is_timed(self) -> bool:
+        """
+        Whether the state has a pending sample or a heartbeat to publish later on
+        """
+        return self.pending is not None or bool(self.policy.max_interval)
+
+    def is_due(self, now: float) -> bool:
+        """
+        Whether the pending sample is due, else the heartbeat
+        """
+        if self.published_at is None:
+            return False
+        if self.pending is not None:
+            return now - self.published_at >= self.policy.min_interval
+        return bool(self.policy.max_interval) and now - self.published_at >= self.policy.max_interval
+
+    def set_published(self, now: float):
+        self.published_at = now
+        self.pending = None
+
+    def __on_fault(self, live_value, point_store, now: float) -> CovDecision:
+        if live_value.fault:
+            if live_value.fault_message is not None and point_store.fault_message is not None and \
+                    live_value.fault_message != point_store.fault_message:
+                return self.__publish(now)
+            return CovDecision.SKIP
+        self.faults += 1
+        if self.faults <= self.policy.fault_debounce:
+            return CovDecision.SKIP
+        return self.__publish(now)
+
+    def __publish(self, now: float) -> CovDecision:
+        self.set_published(now)
+        return CovDecision.PUBLISH
@@ -0,0 +1,207 @@
+import logging
+import time
+from threading import RLock
+from typing import Dict, List, Set, Tuple, Union
+
+from flask import Flask
+from gevent import thread
+
+from src import db
+from src.drivers.enums.drivers import Drivers
+from src.enums.point import CovDecision
+from src.models.point.model_point_store import PointStoreModel
+from src.services.point_cov import PointCovPolicy, PointCovState
+from src.utils import Singleton
+from src.utils.model_utils import get_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class LivePointValue:
+    __slots__ = ('value', 'value_original', 'value_raw', 'fault', 'fault_message', 'ts_value', 'ts_fault', 'cov')
+
+    def __init__(self, point_store: PointStoreModel):
+        self.value = point_store.value
+        self.value_original = point_store.value_original
+        self.value_raw = point_store.value_raw
+        self.fault = bool(point_store.fault)
+        self.fault_message = point_store.fault_message
+        self.ts_value = point_store.ts_value
+        self.ts_fault = point_store.ts_fault
+        self.cov: PointCovState = PointCovState()
+
+    def to_point_store(self, point_uuid: str) -> PointStoreModel:
+        return PointStoreModel(point_uuid=point_uuid, value=self.value, value_original=self.value_original,
+                               value_raw=self.value_raw, fault=self.fault, fault_message=self.fault_message,
+                               ts_value=self.ts_value, ts_fault=self.ts_fault)
+
+
+class PointValueStore(metaclass=Singleton):
+    """
+    Live point values by point_uuid, the COV is decided in memory and the changed values are written behind to the
+    point_stores table every FLUSH_PERIOD seconds and on shutdown.
+    Values are loaded from the point_stores table on their first access.
+    The COV of a point follows its PointCovPolicy, the samples held back by min_interval and the heartbeats of
+    max_interval are published every COV_PERIOD seconds.
+    """
+    FLUSH_PERIOD = 5
+    COV_PERIOD = 1
+
+    def __init__(self):
+        self.__values: Dict[str, LivePointValue] = {}
+        self.__dirty: Dict[str, LivePointValue] = {}
+        self.__timed: Set[str] = set()
+        self.__lock = RLock()
+
+    def flush_interval(self):
+        logger.info(f'Point value store: writing changed values every {self.FLUSH_PERIOD} seconds')
+        while True:
+            thread.sleep(self.FLUSH_PERIOD)
+            self.flush()
+
+    def cov_interval(self):
+        logger.info(f'Point value store: publishing deferred COVs every {self.COV_PERIOD} seconds')
+        while True:
+            thread.sleep(self.COV_PERIOD)
+            self.publish_due()
+
+    def get(self, point_uuid: str) -> Union[PointStoreModel, None]:
+        """
+        :return: detached copy of the live point store, None if the point doesn't exist
+        """
+        self.__load([point_uuid])
+        with self.__lock:
+            live_value: Union[LivePointValue, None] = self.__values.get(point_uuid)
+            return live_value.to_point_store(point_uuid) if live_value else None
+
+    def update(self, point_store: PointStoreModel, driver: Drivers, cov_policy: PointCovPolicy = None) -> bool:
+        return bool(self.update_many([point_store], driver, {point_store.point_uuid: cov_policy}))
+
+    def update_many(self, point_stores: List[PointStoreModel], driver: Drivers,
+                    cov_policies: Dict[str, PointCovPolicy]) -> List[PointStoreModel]:
+        """
+        Runs the new point stores through the COV of the live values, the published ones get their ts_value or
+        ts_fault and replace the live values
+        :param point_stores: new point stores
+        :param driver: driver of the points
+        :param cov_policies: COV policy by point_uuid, the default one (any change) for the missing ones
+        :return: point stores to publish
+        """
+        self.__load([point_store.point_uuid for point_store in point_stores])
+        ts = get_datetime()
+        now: float = time.monotonic()
+        updated_point_stores: List[PointStoreModel] = []
+        with self.__lock:
+            for point_store in point_stores:
+                live_value: Union[LivePointValue, None] = self.__values.get(point_store.point_uuid)
+                if live_value is None:
+                    continue
+                live_value.cov.policy = cov_policies.get(point_store.point_uuid) or PointCovPolicy()
+                live_value.cov.driver = driver
+                decision: CovDecision = live_value.cov.on_sample(live_value, point_store, now)
+                if decision is CovDecision.PUBLISH:
+                    self.__apply(live_value, point_store, ts)
+                    self.__dirty[point_store.point_uuid] = live_value
+                    updated_point_stores.append(point_store)
+                if live_value.cov.is_timed():
+                    self.__timed.add(point_store.point_uuid)
+        for point_store in updated_point_stores:
+            point_store.sync_point_value(driver)
+        return updated_point_stores
+
+    def publish_due(self):
+        """
+        Publishes the samples held back by min_interval once it has elapsed, and the heartbeats of max_interval
+        """
+        ts = get_datetime()
+        now: float = time.monotonic()
+        due: List[Tuple[str, PointStoreModel, Drivers]] = []
+        with self.__lock:
+            for point_uuid in list(self.__timed):
+                live_value: Union[LivePointValue, None] = self.__values.get(point_uuid)
+                if live_value is None or not live_value.cov.is_timed():
+                    self.__timed.discard(point_uuid)
+                    continue
+                if not live_value.cov.is_due(now):
+                    continue
+                point_store: Union[PointStoreModel, None] = live_value.cov.pending
+                if point_store is not None:
+                    self.__apply(live_value, point_store, ts)
+                else:
+                    if not live_value.fault:
+                        live_value.ts_value = ts
+                    point_store = live_value.to_point_store(point_uuid)
+                live_value.cov.set_published(now)
+                self.__dirty[point_uuid] = live_value
+                due.append((point_uuid, point_store, live_value.cov.driver))
+        if not due:
+            return
+        from src.models.point.model_point import PointModel
+        for point_uuid, point_store, driver in due:
+            try:
+                point_store.sync_point_value(driver)
+                point: Union[PointModel, None] = PointModel.find_by_uuid(point_uuid)
+                if point:
+                    point.publish_cov(point_store)
+            except Exception as e:
+                logger.error(f'Point value store: failed to publish the COV of point {point_uuid}, {str(e)}')
+
+    def remove(self, point_uuid: str):
+        with self.__lock:
+            self.__values.pop(point_uuid, None)
+            self.__dirty.pop(point_uuid, None)
+            self.__timed.discard(point_uuid)
+
+    def flush(self):
+        """
+        Writes the values changed since the last flush in one transaction, they are kept for the next flush on error
+        """
+        with self.__lock:
+            dirty, self.__dirty = self.__dirty, {}
+            point_stores: List[PointStoreModel] = [live_value.to_point_store(point_uuid)
+                                                   for point_uuid, live_value in dirty.items()]
+        if not point_stores:
+            return
+        try:
+            PointStoreModel.write_many(point_stores)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'Point value store: failed to write {len(point_stores)} point stores, {str(e)}')
+            with self.__lock:
+                for point_uuid, live_value in dirty.items():
+                    self.__dirty.setdefault(point_uuid, live_value)
+
+    def flush_on_exit(self, app: Flask):
+        with app.app_context():
+            self.flush()
+
+    def __load(self, point_uuids: List[str]):
+        with self.__lock:
+            missing: List[str] = [point_uuid for point_uuid in point_uuids if point_uuid not in self.__values]
+        if not missing:
+            return
+        point_stores: List[PointStoreModel] = PointStoreModel.find_all_by_point_uuids(missing)
+        with self.__lock:
+            for point_store in point_stores:
+                if point_store.point_uuid not in self.__values:
+                    self.__values[point_store.point_uuid] = LivePointValue(point_store)
+
+    @staticmethod
+    def __apply(live_value: LivePointValue, point_store: PointStoreModel, ts):
+        """
+        Replaces the live value with a published point store
+        """
+        if not point_store.fault:
+            point_store.fault = False
+            point_store.ts_value = ts
+            live_value.value = point_store.value
+            live_value.value_original = point_store.value_original
+            live_value.value_raw = point_store.value_raw
+            live_value.fault = False
+            live_value.fault_message = None
+            live_value.ts_value = ts
+        else:
+            point_store.ts_fault = ts
+            live_value.fault = True
+            live_value.fault_message = point_store.fault_message
+            live_value.ts_fault = ts
@@ -33,6 +33,7 @@ class ServiceSetting(BaseSetting):
         self.cleaner = False
         self.history_sync_influxdb = False
         self.history_sync_postgres = False
+        self.calculated_points = True
 
 
 class DriverSetting(BaseSetting):
@@ -46,6 +47,7 @@ class DriverSetting(BaseSetting):
         self.generic: bool = False
         self.modbus_rtu: bool = True
         self.modbus_tcp: bool = False
+        self.modbus_tcp_asyncio: bool = False
 
 
 class MqttSetting(MqttSettingBase):
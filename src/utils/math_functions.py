@@ -1,5 +1,8 @@
 import ast
+import numbers
 import operator as op
+from functools import lru_cache
+from typing import Callable, FrozenSet, Iterable, List, Mapping
 
 # supported operators
 operators = {ast.Add: op.add, ast.Sub: op.sub, ast.Mult: op.mul, ast.Div: op.truediv, ast.FloorDiv: op.floordiv,
@@ -39,3 +42,129 @@ def __eval(node):
         return operators[type(node.op)](__eval(node.operand))
     else:
         raise TypeError(node)
+
+
+class ArithmeticExpression:
+    """
+    Arithmetic expression of a variable compiled into nested closures, with the operators of
+    eval_arithmetic_expression, so it is parsed once instead of on each evaluation.
+    The operators work element wise on arrays which support them (e.g. NumPy ones), so the closure takes them as is.
+    >>> ArithmeticExpression('(x - 32) * 5 / 9')(212)
+    100.0
+    >>> ArithmeticExpression('-x**2')(3)
+    -9
+    >>> ArithmeticExpression('x * 10').apply([1, 2.5])
+    [10, 25.0]
+    """
+
+    __slots__ = ('expression', '__function')
+
+    def __init__(self, expression: str, variable: str = 'x'):
+        """
+        Raises SyntaxError or TypeError when the expression is not a valid arithmetic expression of the variable
+        """
+        self.expression: str = expression
+        function, _ = _compile(ast.parse(expression.lower(), mode='eval').body, _load_variable(variable))
+        self.__function: Callable = function
+
+    def __call__(self, value):
+        return self.__function(value)
+
+    def apply(self, values: Iterable) -> List:
+        """
+        Evaluates the expression for each value
+        """
+        function: Callable = self.__function
+        return [function(value) for value in values]
+
+
+class CalculationExpression:
+    """
+    Arithmetic expression of named variables compiled into nested closures, evaluated with a mapping of the values
+    of its variables.
+    >>> CalculationExpression('(a + b) / 2', ('a', 'b'))({'a': 1, 'b': 2})
+    1.5
+    >>> sorted(CalculationExpression('zone_1 - 2 * zone_1', ('zone_1', 'zone_2')).names)
+    ['zone_1']
+    """
+
+    __slots__ = ('expression', 'variables', 'names', '__function')
+
+    def __init__(self, expression: str, variables: Iterable[str]):
+        """
+        Raises SyntaxError or TypeError when the expression is not a valid arithmetic expression of the variables
+        """
+        self.expression: str = expression
+        self.variables: FrozenSet[str] = frozenset(variables)
+        names: set = set()
+
+        def load_variable(name: str) -> Callable:
+            if name not in self.variables:
+                raise TypeError(f'Unknown variable {name}')
+            names.add(name)
+            return lambda values: values[name]
+
+        function, _ = _compile(ast.parse(expression, mode='eval').body, load_variable)
+        self.names: FrozenSet[str] = frozenset(names)
+        self.__function: Callable = function
+
+    def __call__(self, values: Mapping[str, float]):
+        return self.__function(values)
+
+
+@lru_cache(maxsize=1024)
+def compile_arithmetic_expression(expression: str) -> ArithmeticExpression:
+    """
+    Compiled expressions are shared, points usually have a handful of distinct expressions between them
+    """
+    return ArithmeticExpression(expression)
+
+
+@lru_cache(maxsize=1024)
+def compile_calculation_expression(expression: str, variables: FrozenSet[str]) -> CalculationExpression:
+    return CalculationExpression(expression, variables)
+
+
+def _load_variable(variable: str) -> Callable[[str], Callable]:
+    def load_variable(name: str) -> Callable:
+        if name != variable:
+            raise TypeError(f'Unknown variable {name}')
+        return lambda x: x
+
+    return load_variable
+
+
+def _compile(node, load_variable: Callable[[str], Callable]) -> (Callable, bool):
+    """
+    :param load_variable: closure of a variable by its name, raises TypeError for an unknown one
+    :return: closure of the node, and whether it is a constant, constant operations are folded
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, numbers.Number) and \
+            not isinstance(node.value, bool):
+        constant = node.value
+        return lambda x: constant, True
+    elif isinstance(node, ast.Name):
+        return load_variable(node.id), False
+    elif isinstance(node, ast.BinOp) and type(node.op) in operators:
+        operator = operators[type(node.op)]
+        left, left_constant = _compile(node.left, load_variable)
+        right, right_constant = _compile(node.right, load_variable)
+        if left_constant and right_constant:
+            constant = operator(left(None), right(None))
+            return lambda x: constant, True
+        if left_constant:
+            left_value = left(None)
+            return lambda x: operator(left_value, right(x)), False
+        if right_constant:
+            right_value = right(None)
+            return lambda x: operator(left(x), right_value), False
+        return lambda x: operator(left(x), right(x)), False
+    elif isinstance(node, ast.UnaryOp) and type(node.op) in operators:
+        operator = operators[type(node.op)]
+        operand, operand_constant = _compile(node.operand, load_variable)
+        if operand_constant:
+            constant = operator(operand(None))
+            return lambda x: constant, True
+        return lambda x: operator(operand(x)), False
+    else:
+        raise TypeError(node)
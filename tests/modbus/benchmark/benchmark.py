@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Polling throughput benchmark against simulated modbus devices, no hardware needed:
+
+    python -m tests.modbus.benchmark.benchmark --networks 2 --devices 10 --points 100 --duration 30
+
+It prints a JSON report of the points/sec, cycle time, CPU usage and COV-to-event latency of the poll engine.
+"""
+import json
+import statistics
+import tempfile
+import threading
+import time
+from typing import List, Union
+
+import click
+
+from src import AppSetting, FlaskThread, create_app, db
+from src.drivers.modbus.models.device import ModbusDeviceModel
+from src.drivers.modbus.models.network import ModbusNetworkModel
+from src.drivers.modbus.models.point import ModbusPointModel
+from src.drivers.modbus.services.polling.poll_stats import ModbusPollStats
+from src.event_dispatcher import EventDispatcher
+from src.services.event_service_base import EventServiceBase, EventType, Event
+from src.services.point_value_store import PointValueStore
+from tests.modbus.benchmark.provision import provision
+from tests.modbus.benchmark.simulator import ModbusSimulator, SimulatedNetwork, SimulatedDevice
+
+CLI_CTX_SETTINGS = dict(help_option_names=["-h", "--help"], max_content_width=120)
+
+
+class CovLatencyProbe(EventServiceBase):
+    """
+    Counts the POINT_COV events, and times the one expected for the probed point value
+    """
+
+    def __init__(self):
+        super().__init__('BENCHMARK', False)
+        self.supported_events[EventType.POINT_COV] = True
+        self.covs: int = 0
+        self.__expected: Union[tuple, None] = None
+        self.__received = threading.Event()
+        self.__latency: Union[float, None] = None
+
+    def expect(self, point_uuid: str, value: float):
+        self.__received.clear()
+        self.__expected = (point_uuid, value, time.time())
+
+    def wait(self, timeout: float) -> Union[float, None]:
+        """
+        :return: seconds from the expect call to the COV event, None when it hasn't arrived within the timeout
+        """
+        return self.__latency if self.__received.wait(timeout) else None
+
+    def _run_event(self, event: Event):
+        self.covs += 1
+        expected: Union[tuple, None] = self.__expected
+        if expected and event.data['point'].uuid == expected[0] and \
+                event.data['point_store'].value_original == expected[1]:
+            self.__latency = time.time() - expected[2]
+            self.__expected = None
+            self.__received.set()
+
+
+def run_benchmark(networks: List[SimulatedNetwork], points_per_device: int, duration: float,
+                  polling_interval: int, timeout: int, asyncio: bool, cov_samples: int,
+                  network_options: dict) -> dict:
+    simulator = ModbusSimulator(networks)
+    endpoints = simulator.start()
+    try:
+        setting = AppSetting(global_dir=tempfile.mkdtemp(prefix='modbus-benchmark-')).reload(json.dumps({
+            'drivers': {'generic': False, 'modbus_rtu': any(network.rtu for network in networks),
+                        'modbus_tcp': not all(network.rtu for network in networks), 'modbus_tcp_asyncio': asyncio},
+            'services': {'mqtt': False, 'histories': False, 'cleaner': False, 'history_sync_influxdb': False,
+                         'history_sync_postgres': False}
+        }), is_json_str=True)
+        app = create_app(setting)
+        with app.app_context():
+            db.create_all()
+            network_models: List[ModbusNetworkModel] = provision(networks, endpoints, points_per_device,
+                                                                 polling_interval, timeout, network_options)
+            probe = CovLatencyProbe()
+            EventDispatcher().add_service(probe)
+            _start_polling(setting)
+            _wait_first_cycles([network.uuid for network in network_models], polling_interval + timeout * 10)
+            return _measure(simulator, network_models[0], probe, duration, polling_interval, timeout, cov_samples)
+    finally:
+        simulator.stop()
+
+
+def _start_polling(setting: AppSetting):
+    FlaskThread(target=PointValueStore().flush_interval, daemon=True).start()
+    if setting.drivers.modbus_tcp:
+        from src.drivers.modbus.services.polling.modbus_polling import TcpPolling, ModbusTcpRegistry
+        ModbusTcpRegistry().register()
+        FlaskThread(target=TcpPolling().polling, daemon=True).start()
+    if setting.drivers.modbus_rtu:
+        from src.drivers.modbus.services.polling.modbus_polling import RtuPolling, ModbusRtuRegistry
+        ModbusRtuRegistry().register()
+        FlaskThread(target=RtuPolling().polling, daemon=True).start()
+
+
+def _wait_first_cycles(network_uuids: List[str], timeout: float):
+    """
+    The first cycle of each network loads the poll plans and the point stores, it is not measured
+    """
+    deadline: float = time.time() + timeout
+    while time.time() < deadline:
+        stats: dict = ModbusPollStats().get_stats()
+        if all(stats.get(network_uuid, {}).get('cycles') for network_uuid in network_uuids):
+            break
+        time.sleep(0.1)
+    else:
+        raise TimeoutError(f'Networks have not completed a polling cycle within {timeout} seconds')
+    ModbusPollStats().reset()
+
+
+def _measure(simulator: ModbusSimulator, network: ModbusNetworkModel, probe: CovLatencyProbe, duration: float,
+             polling_interval: int, timeout: int, cov_samples: int) -> dict:
+    """
+    COVs are probed by changing the register of the first point of the first network, spread over the duration
+    """
+    device_address: int = simulator.networks[0].devices[0].address
+    device: ModbusDeviceModel = ModbusDeviceModel.query.filter_by(network_uuid=network.uuid,
+                                                                  address=device_address).first()
+    point: ModbusPointModel = ModbusPointModel.query.filter_by(device_uuid=device.uuid, register=1).first()
+    cov_latencies: List[float] = []
+    covs_before: int = probe.covs
+    cpu_start: float = time.process_time()
+    start: float = time.time()
+    for i in range(cov_samples):
+        value: int = 10000 + i
+        probe.expect(point.uuid, value)
+        simulator.set_register(0, device_address, point.register - 1, value)
+        latency: Union[float, None] = probe.wait(polling_interval * 2 + timeout)
+        if latency is not None:
+            cov_latencies.append(latency)
+        time.sleep(max(start + duration * (i + 1) / cov_samples - time.time(), 0))
+    time.sleep(max(start + duration - time.time(), 0))
+    elapsed: float = time.time() - start
+    cpu: float = time.process_time() - cpu_start
+    stats: dict = ModbusPollStats().get_stats()
+    points: int = sum(network_stats['points'] for network_stats in stats.values())
+    requests: int = sum(network_stats['requests'] for network_stats in stats.values())
+    return {
+        'duration': round(elapsed, 3),
+        'points_per_second': round(points / elapsed, 1),
+        'requests_per_second': round(requests / elapsed, 1),
+        'timeouts': sum(network_stats['timeouts'] for network_stats in stats.values()),
+        'unchanged': sum(network_stats['unchanged'] for network_stats in stats.values()),
+        'cpu_percent': round(cpu / elapsed * 100, 1),
+        'covs': probe.covs - covs_before,
+        'cov_latency_ms': {
+            'samples': len(cov_latencies),
+            'missed': cov_samples - len(cov_latencies),
+            'median': round(statistics.median(cov_latencies) * 1000, 1) if cov_latencies else None,
+            'max': round(max(cov_latencies) * 1000, 1) if cov_latencies else None,
+        },
+        'networks': [{
+            'cycles': network_stats['cycles'],
+            'overruns': network_stats['overruns'],
+            'cycle_duration': {k: v for k, v in network_stats['cycle_duration'].items() if k != 'buckets'},
+            'rtt': {k: v for k, v in network_stats['rtt'].items() if k != 'buckets'},
+        } for network_stats in stats.values()],
+    }
+
+
+@click.command(context_settings=CLI_CTX_SETTINGS)
+@click.option('--rtu', is_flag=True, help='Simulate RTU networks over pty pairs instead of TCP networks')
+@click.option('--networks', type=int, default=1, show_default=True, help='Simulated networks')
+@click.option('--devices', type=int, default=5, show_default=True, help='Devices per network')
+@click.option('--points', type=int, default=50, show_default=True, help='Holding register points per device')
+@click.option('--latency-ms', type=float, default=0, show_default=True, help='Device response latency')
+@click.option('--error-rate', type=float, default=0, show_default=True, help='Share of exception responses')
+@click.option('--drop-rate', type=float, default=0, show_default=True, help='Share of unanswered requests')
+@click.option('--baudrate', type=int, default=None, help='Serial line speed emulated on RTU networks')
+@click.option('--duration', type=float, default=30, show_default=True, help='Measured seconds')
+@click.option('--polling-interval', type=int, default=1, show_default=True, help='polling_interval_runtime')
+@click.option('--timeout', type=int, default=1, show_default=True, help='Network timeout')
+@click.option('--pool-size', type=int, default=1, show_default=True, help='tcp_pool_size')
+@click.option('--pipeline-depth', type=int, default=1, show_default=True, help='tcp_pipeline_depth')
+@click.option('--asyncio', is_flag=True, help='Poll TCP networks with the asyncio engine')
+@click.option('--cov-samples', type=int, default=10, show_default=True, help='COV latency probes')
+def cli(rtu, networks, devices, points, latency_ms, error_rate, drop_rate, baudrate, duration, polling_interval,
+        timeout, pool_size, pipeline_depth, asyncio, cov_samples):
+    from gevent import monkey
+    monkey.patch_all()
+    simulated_networks: List[SimulatedNetwork] = [
+        SimulatedNetwork(rtu, [SimulatedDevice(address, max(points, 1), latency_ms / 1000, error_rate, drop_rate)
+                               for address in range(1, devices + 1)], baudrate)
+        for _ in range(networks)]
+    network_options: dict = {} if rtu else {'tcp_pool_size': pool_size, 'tcp_pipeline_depth': pipeline_depth}
+    report: dict = run_benchmark(simulated_networks, points, duration, polling_interval, timeout, asyncio,
+                                 cov_samples, network_options)
+    click.echo(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    cli()
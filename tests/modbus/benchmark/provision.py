@@ -0,0 +1,52 @@
+import uuid
+from typing import List, Tuple, Union
+
+from src.drivers.modbus.enums.network.network import ModbusType
+from src.drivers.modbus.enums.point.points import ModbusFunctionCode, ModbusDataType
+from src.drivers.modbus.models.device import ModbusDeviceModel
+from src.drivers.modbus.models.network import ModbusNetworkModel
+from src.drivers.modbus.models.point import ModbusPointModel
+from src.models.point.model_point_store import PointStoreModel
+from src.models.point.priority_array import PriorityArrayModel
+from tests.modbus.benchmark.simulator import SimulatedNetwork
+
+
+def provision(networks: List[SimulatedNetwork], endpoints: List[Union[Tuple[str, int], str]], points_per_device: int,
+              polling_interval: int = 2, timeout: int = 1, network_options: dict = None) -> List[ModbusNetworkModel]:
+    """
+    Creates the networks, devices and points of the simulated networks, each device gets points_per_device INT16
+    holding register points from register 1 on
+    :param endpoints: started endpoints of the simulated networks
+    :param network_options: extra ModbusNetworkModel columns, e.g. tcp_pipeline_depth
+    """
+    network_models: List[ModbusNetworkModel] = []
+    for i, (network, endpoint) in enumerate(zip(networks, endpoints)):
+        data: dict = {'name': f'benchmark_network_{i}', 'enable': True, 'timeout': timeout,
+                      'polling_interval_runtime': polling_interval, 'point_interval_ms_between_points': 0,
+                      **(network_options or {})}
+        if network.rtu:
+            data.update(rtu_port=endpoint, rtu_speed=network.baudrate or 9600, type=ModbusType.RTU.name)
+        else:
+            data.update(tcp_ip=endpoint[0], tcp_port=endpoint[1], type=ModbusType.TCP.name)
+        network_model = ModbusNetworkModel(uuid=str(uuid.uuid4()), **data)
+        network_model.save_to_db()
+        network_models.append(network_model)
+        for device in network.devices:
+            device_model = ModbusDeviceModel(uuid=str(uuid.uuid4()), network_uuid=network_model.uuid,
+                                             name=f'benchmark_device_{device.address}', enable=True,
+                                             type=data['type'], address=device.address, zero_based=False,
+                                             supports_multiple_rw=True)
+            device_model.save_to_db()
+            for register in range(1, min(points_per_device, device.registers) + 1):
+                point_uuid: str = str(uuid.uuid4())
+                point = ModbusPointModel(uuid=point_uuid, device_uuid=device_model.uuid,
+                                         name=f'benchmark_point_{register}', enable=True, register=register,
+                                         register_length=1,
+                                         function_code=ModbusFunctionCode.READ_HOLDING_REGISTERS,
+                                         data_type=ModbusDataType.INT16,
+                                         priority_array_write=PriorityArrayModel.create_priority_array_model(
+                                             point_uuid, {}))
+                point.point_store = PointStoreModel.create_new_point_store_model(point_uuid)
+                point.save_to_db_no_commit()
+            ModbusPointModel.commit()
+    return network_models
@@ -0,0 +1,155 @@
+import multiprocessing
+import os
+import random
+import select
+import threading
+import time
+import tty
+from multiprocessing.connection import Connection
+from typing import List, Tuple, Union
+
+from pymodbus.datastore import ModbusSequentialDataBlock, ModbusServerContext, ModbusSlaveContext
+from pymodbus.exceptions import NoSuchSlaveException
+from pymodbus.server.sync import ModbusTcpServer, ModbusSerialServer
+from pymodbus.transaction import ModbusRtuFramer
+
+
+class SimulatedDevice:
+    """
+    Register map and faults of a simulated modbus device
+    :param address: modbus unit id
+    :param registers: size of each of the coils, discrete inputs, holding and input registers blocks
+    :param latency: seconds the device takes to answer a request
+    :param error_rate: share of the requests answered with a SLAVE_FAILURE exception response
+    :param drop_rate: share of the requests left without response, the poller waits for its timeout
+    """
+
+    def __init__(self, address: int = 1, registers: int = 1000, latency: float = 0, error_rate: float = 0,
+                 drop_rate: float = 0):
+        self.address: int = address
+        self.registers: int = registers
+        self.latency: float = latency
+        self.error_rate: float = error_rate
+        self.drop_rate: float = drop_rate
+
+
+class SimulatedNetwork:
+    """
+    Devices served on a TCP port of localhost, or on a pty pair for RTU
+    :param baudrate: serial line speed emulated by the pty bridge, None for no throttling
+    """
+
+    def __init__(self, rtu: bool, devices: List[SimulatedDevice], baudrate: Union[int, None] = None):
+        self.rtu: bool = rtu
+        self.devices: List[SimulatedDevice] = devices
+        self.baudrate: Union[int, None] = baudrate
+
+
+class SimulatedSlaveContext(ModbusSlaveContext):
+    """
+    Injects the latency and the faults of the device in front of the datastore
+    """
+
+    def __init__(self, device: SimulatedDevice):
+        super().__init__(di=ModbusSequentialDataBlock(0, [0] * device.registers),
+                         co=ModbusSequentialDataBlock(0, [0] * device.registers),
+                         hr=ModbusSequentialDataBlock(0, list(range(device.registers))),
+                         ir=ModbusSequentialDataBlock(0, list(range(device.registers))),
+                         zero_mode=True)
+        self.device: SimulatedDevice = device
+
+    def validate(self, fx, address, count=1):
+        if self.device.latency:
+            time.sleep(self.device.latency)
+        chance: float = random.random()
+        if chance < self.device.drop_rate:
+            # the server is started with ignore_missing_slaves, so it doesn't respond at all
+            raise NoSuchSlaveException(f'Dropped request of unit {self.device.address}')
+        if chance < self.device.drop_rate + self.device.error_rate:
+            raise Exception(f'Injected failure of unit {self.device.address}')
+        return super().validate(fx, address, count)
+
+
+class ModbusSimulator:
+    """
+    Serves the simulated networks from a child process, so their CPU time is not accounted to the poller.
+    The process is spawned, it doesn't inherit the gevent monkey patching of the poller.
+    Endpoints are (host, port) for TCP and the client side pty name for RTU.
+    """
+
+    def __init__(self, networks: List[SimulatedNetwork]):
+        self.networks: List[SimulatedNetwork] = networks
+        self.endpoints: List[Union[Tuple[str, int], str]] = []
+        context = multiprocessing.get_context('spawn')
+        self.__connection, child_connection = context.Pipe()
+        self.__process = context.Process(target=_serve, args=(networks, child_connection), daemon=True)
+
+    def start(self) -> List[Union[Tuple[str, int], str]]:
+        self.__process.start()
+        self.endpoints = self.__connection.recv()
+        return self.endpoints
+
+    def set_register(self, network_index: int, address: int, register: int, value: int):
+        """
+        Sets a holding register of a device, the register is zero based
+        """
+        self.__connection.send(('set', network_index, address, register, value))
+        self.__connection.recv()
+
+    def stop(self):
+        if self.__process.is_alive():
+            self.__connection.send(('stop',))
+            self.__process.join(5)
+            if self.__process.is_alive():
+                self.__process.terminate()
+
+
+def _serve(networks: List[SimulatedNetwork], connection: Connection):
+    contexts: List[ModbusServerContext] = []
+    endpoints: List[Union[Tuple[str, int], str]] = []
+    for network in networks:
+        context = ModbusServerContext(slaves={device.address: SimulatedSlaveContext(device)
+                                              for device in network.devices}, single=False)
+        contexts.append(context)
+        if network.rtu:
+            server_port, client_port = _open_null_modem(network.baudrate)
+            server = ModbusSerialServer(context, framer=ModbusRtuFramer, port=server_port, timeout=0.005,
+                                        baudrate=network.baudrate or 9600, ignore_missing_slaves=True)
+            endpoints.append(client_port)
+        else:
+            server = ModbusTcpServer(context, address=('127.0.0.1', 0), ignore_missing_slaves=True)
+            endpoints.append(server.server_address)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    connection.send(endpoints)
+    while True:
+        command = connection.recv()
+        if command[0] == 'stop':
+            return
+        _, network_index, address, register, value = command
+        contexts[network_index][address].setValues(3, register, [value])
+        connection.send(True)
+
+
+def _open_null_modem(baudrate: Union[int, None]) -> Tuple[str, str]:
+    """
+    Two pty pairs bridged at their master ends, like a null modem cable in between two serial ports
+    :return: tty names of both ends
+    """
+    master_a, slave_a = os.openpty()
+    master_b, slave_b = os.openpty()
+    for slave in (slave_a, slave_b):
+        tty.setraw(slave)
+    threading.Thread(target=_bridge, args=(master_a, master_b, baudrate), daemon=True).start()
+    return os.ttyname(slave_a), os.ttyname(slave_b)
+
+
+def _bridge(master_a: int, master_b: int, baudrate: Union[int, None]):
+    peers = {master_a: master_b, master_b: master_a}
+    while True:
+        readable, _, _ = select.select(list(peers), [], [])
+        for fd in readable:
+            data: bytes = os.read(fd, 1024)
+            if baudrate:
+                # a start bit, 8 data bits and a stop bit per byte
+                time.sleep(len(data) * 10 / baudrate)
+            os.write(peers[fd], data)
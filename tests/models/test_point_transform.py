@@ -0,0 +1,77 @@
+import random
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.models.point import point_transform
+from src.models.point.point_transform import PointTransformTable, transform_value
+from src.utils.math_functions import compile_arithmetic_expression
+
+
+def _point(uuid: str, value_operation: str = None, value_round: int = 2, scale: tuple = (None, None, None, None),
+           point_type=lambda value: value) -> SimpleNamespace:
+    compiled = compile_arithmetic_expression(value_operation) if value_operation else None
+    return SimpleNamespace(uuid=uuid, input_min=scale[0], input_max=scale[1], scale_min=scale[2], scale_max=scale[3],
+                           value_round=value_round, apply_point_type=point_type, get_value_operation=lambda: compiled)
+
+
+def _points(count: int) -> list:
+    operations = [None, 'x + 0', 'x * 0.1', '(x - 32) * 5 / 9', 'x ** 2 // 3']
+    scales = [(None, None, None, None), (0, 100, 0, 10), (0, 10, 100, 0), (4, 20, -50, 50)]
+    return [_point(str(i), operations[i % len(operations)], i % 4, scales[i % len(scales)],
+                   (lambda value: None if value is None else round(value, 0)) if i % 7 == 0 else lambda value: value)
+            for i in range(count)]
+
+
+class TestPointTransform(unittest.TestCase):
+
+    def test_transform_value(self):
+        operation = compile_arithmetic_expression('x * 2')
+        self.assertEqual(5.0, transform_value(50.0, (0, 100, 0, 10), None, 2))
+        self.assertEqual(10.0, transform_value(500.0, (0, 100, 0, 10), None, 2))
+        self.assertEqual(6.67, transform_value(10 / 3, None, operation, 2))
+        self.assertIsNone(transform_value(None, (0, 100, 0, 10), operation, 2))
+
+    def test_python_table(self):
+        table = PointTransformTable([_point('1', 'x / 10', 1), _point('2', scale=(0, 10, 0, 100), point_type=int)])
+        self.assertEqual([1.2, 50], table.transform([12.3, 5.0]))
+        self.assertEqual([None, 0], table.transform([None, -1.0]))
+
+    def test_apply(self):
+        point_stores = [SimpleNamespace(value_original=1.234, value=None, fault=False),
+                        SimpleNamespace(value_original=None, value=None, fault=True)]
+        PointTransformTable([_point('1'), _point('2')]).apply(point_stores)
+        self.assertEqual([1.23, None], [point_store.value for point_store in point_stores])
+
+    def test_apply_faults_failing_points(self):
+        points = [_point('1', scale=(5, 5, 0, 10)), _point('2', '100 / x'), _point('3', '100 / x')]
+        point_stores = [SimpleNamespace(value_original=value, value=None, fault=False, fault_message=None)
+                        for value in (5.0, 0.0, 4.0)]
+        PointTransformTable(points).apply(point_stores)
+        self.assertEqual([True, True, False], [point_store.fault for point_store in point_stores])
+        self.assertIn('division by zero', point_stores[0].fault_message)
+        self.assertEqual([None, None, 25.0], [point_store.value for point_store in point_stores])
+        # NumPy sized batch
+        point_stores = [SimpleNamespace(value_original=float(i), value=None, fault=False, fault_message=None)
+                        for i in range(20)]
+        PointTransformTable([_point(str(i), '100 / x') for i in range(20)]).apply(point_stores)
+        self.assertTrue(point_stores[0].fault)
+        self.assertEqual([round(100 / i, 2) for i in range(1, 20)],
+                         [point_store.value for point_store in point_stores[1:]])
+
+    @unittest.skipIf(point_transform.numpy is None, 'NumPy is not installed')
+    def test_numpy_table(self):
+        points = _points(200)
+        values = [None if i % 11 == 0 else random.uniform(-100, 100) for i in range(len(points))]
+        with patch.object(point_transform, 'numpy', None):
+            expected = PointTransformTable(points).transform(values)
+        self.assertEqual(expected, PointTransformTable(points).transform(values))
+        # the division by zero is evaluated by python, so it raises as it does without NumPy
+        table = PointTransformTable(points + [_point('zero', '100 / x')])
+        self.assertEqual(expected + [10.0], table.transform(values + [10.0]))
+        with self.assertRaises(ZeroDivisionError):
+            table.transform(values + [0.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
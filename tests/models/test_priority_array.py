@@ -0,0 +1,42 @@
+import unittest
+
+from src.models.point.priority_array import PriorityArrayModel, get_active_priority_value
+
+
+class TestPriorityArray(unittest.TestCase):
+
+    def test_active_priority_value(self):
+        self.assertEqual(get_active_priority_value([None] * 16), (None, None))
+        self.assertEqual(get_active_priority_value([None, None, 0.0] + [None] * 12 + [5.0]), (3, 0.0))
+        self.assertEqual(get_active_priority_value([None] * 15 + [5.0]), (16, 5.0))
+
+    def test_create(self):
+        priority_array = PriorityArrayModel.create_priority_array_model('point', {'_16': 5.0, '_8': 8.0})
+        self.assertEqual(priority_array.active_priority, 8)
+        self.assertEqual(priority_array.effective_value, 8.0)
+        self.assertEqual(priority_array.slots, (None,) * 7 + (8.0,) + (None,) * 7 + (5.0,))
+        empty = PriorityArrayModel.create_priority_array_model('point', {})
+        self.assertIsNone(empty.active_priority)
+        self.assertIsNone(PriorityArrayModel.get_highest_priority_value_from_priority_array(empty))
+
+    def test_write(self):
+        priority_array = PriorityArrayModel.create_priority_array_model('point', {'_16': 5.0})
+        priority_array.write({'_1': 1.0})
+        self.assertEqual(PriorityArrayModel.get_highest_priority_value_from_priority_array(priority_array), 1.0)
+        priority_array.write({'_1': None, '_10': 0.0})
+        self.assertEqual(priority_array.active_priority, 10)
+        self.assertEqual(PriorityArrayModel.get_highest_priority_value_from_priority_array(priority_array), 0.0)
+        priority_array.write({'_10': None, '_16': None})
+        self.assertIsNone(priority_array.active_priority)
+        self.assertIsNone(PriorityArrayModel.get_highest_priority_value_from_priority_array(priority_array))
+        with self.assertRaises(ValueError):
+            priority_array.write({'_0': 1.0})
+
+    def test_stored_without_effective_value(self):
+        priority_array = PriorityArrayModel.create_priority_array_model('point', {'_12': 12.0})
+        priority_array.active_priority = priority_array.effective_value = None
+        self.assertEqual(PriorityArrayModel.get_highest_priority_value_from_priority_array(priority_array), 12.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, UniqueConstraint, create_engine, inspect
+
+from src.models.schema_upgrade import upgrade_schema
+
+
+class TestSchemaUpgrade(unittest.TestCase):
+
+    def test_adds_missing_columns(self):
+        engine = create_engine('sqlite://')
+        engine.execute('CREATE TABLE points (uuid VARCHAR NOT NULL PRIMARY KEY, register INTEGER, UNIQUE (register))')
+        engine.execute("INSERT INTO points (uuid, register) VALUES ('point', 1)")
+        metadata = MetaData()
+        Table('points', metadata,
+              Column('uuid', String, primary_key=True),
+              Column('register', Integer),
+              Column('bit_offset', Integer, nullable=False, default=0),
+              Column('poll_interval_ms', Integer),
+              UniqueConstraint('register', 'bit_offset'))
+        with self.assertLogs('src.models.schema_upgrade', 'WARNING') as logs:
+            upgrade_schema(engine, metadata)
+        self.assertIn('missing the unique constraint on bit_offset, register', logs.output[-1])
+        columns = {column['name']: column for column in inspect(engine).get_columns('points')}
+        self.assertFalse(columns['bit_offset']['nullable'])
+        self.assertTrue(columns['poll_interval_ms']['nullable'])
+        self.assertEqual(engine.execute('SELECT bit_offset, poll_interval_ms FROM points').fetchall(), [(0, None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
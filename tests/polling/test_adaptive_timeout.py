@@ -0,0 +1,46 @@
+import unittest
+
+from src.drivers.modbus.services.polling.adaptive_timeout import ModbusDeviceTimeout, ModbusDeviceTimeouts
+
+
+class TestAdaptiveTimeout(unittest.TestCase):
+
+    def setUp(self):
+        ModbusDeviceTimeouts().reset()
+
+    def test_network_timeout_until_sample_min(self):
+        device_timeout = ModbusDeviceTimeout()
+        for _ in range(ModbusDeviceTimeout.SAMPLE_MIN - 1):
+            device_timeout.add(0.05)
+        self.assertEqual(device_timeout.get(3), 3)
+        device_timeout.add(0.05)
+        self.assertAlmostEqual(device_timeout.get(3), 0.05 * ModbusDeviceTimeout.RESPONSE_FACTOR)
+
+    def test_floor_and_ceiling(self):
+        device_timeout = ModbusDeviceTimeout()
+        for _ in range(ModbusDeviceTimeout.SAMPLE_MIN):
+            device_timeout.add(0.001)
+        self.assertEqual(device_timeout.get(3), ModbusDeviceTimeout.MIN_TIMEOUT)
+        for _ in range(ModbusDeviceTimeout.SAMPLE_SIZE):
+            device_timeout.add(2)
+        self.assertEqual(device_timeout.get(3), 3)
+
+    def test_p99(self):
+        device_timeout = ModbusDeviceTimeout()
+        for _ in range(ModbusDeviceTimeout.SAMPLE_SIZE - 1):
+            device_timeout.add(0.05)
+        device_timeout.add(0.5)
+        self.assertAlmostEqual(device_timeout.get(3), 0.5 * ModbusDeviceTimeout.RESPONSE_FACTOR)
+
+    def test_by_device(self):
+        for _ in range(ModbusDeviceTimeout.SAMPLE_MIN):
+            ModbusDeviceTimeouts().add('device', 0.1)
+        ModbusDeviceTimeouts().add(None, 0.1)
+        self.assertAlmostEqual(ModbusDeviceTimeouts().get('device', 3), 0.3)
+        self.assertEqual(ModbusDeviceTimeouts().get('other', 3), 3)
+        ModbusDeviceTimeouts().reset('device')
+        self.assertEqual(ModbusDeviceTimeouts().get('device', 3), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
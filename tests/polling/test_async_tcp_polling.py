@@ -0,0 +1,34 @@
+import asyncio
+import socket
+import unittest
+from types import SimpleNamespace
+
+from src.drivers.modbus.services.polling.async_tcp_polling import _create_client
+
+
+class TestAsyncTcpPolling(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_create_client(self):
+        network = SimpleNamespace(tcp_ip='127.0.0.1', tcp_port=502, timeout=1)
+        client = _create_client(network, self.loop)
+        self.assertEqual((client.host, client.port), ('127.0.0.1', 502))
+        self.assertFalse(client.connected)
+
+    def test_connect_refused(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port: int = sock.getsockname()[1]
+        network = SimpleNamespace(tcp_ip='127.0.0.1', tcp_port=port, timeout=1)
+        client = _create_client(network, self.loop)
+        self.loop.run_until_complete(asyncio.wait_for(client.connect(), network.timeout))
+        self.assertFalse(client.connected)
+
+
+if __name__ == '__main__':
+    unittest.main()
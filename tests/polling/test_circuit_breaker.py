@@ -0,0 +1,44 @@
+import unittest
+
+from src.drivers.modbus.enums.device.device import ModbusCircuitState
+from src.drivers.modbus.services.polling.circuit_breaker import ModbusDeviceCircuitBreaker
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_after_failure_threshold(self):
+        circuit_breaker = ModbusDeviceCircuitBreaker()
+        self.assertFalse(circuit_breaker.record(False, 0))
+        self.assertTrue(circuit_breaker.allow(0))
+        self.assertTrue(circuit_breaker.record(False, 0))
+        self.assertIs(circuit_breaker.state, ModbusCircuitState.OPEN)
+        self.assertFalse(circuit_breaker.allow(ModbusDeviceCircuitBreaker.MIN_BACKOFF - 1))
+        self.assertIsNotNone(circuit_breaker.fault_message)
+
+    def test_half_open_probe(self):
+        circuit_breaker = ModbusDeviceCircuitBreaker()
+        circuit_breaker.record(False, 0)
+        circuit_breaker.record(False, 0)
+        self.assertTrue(circuit_breaker.allow(ModbusDeviceCircuitBreaker.MIN_BACKOFF))
+        self.assertIs(circuit_breaker.state, ModbusCircuitState.HALF_OPEN)
+        self.assertTrue(circuit_breaker.record(True, ModbusDeviceCircuitBreaker.MIN_BACKOFF))
+        self.assertIs(circuit_breaker.state, ModbusCircuitState.CLOSED)
+        self.assertIsNone(circuit_breaker.fault_message)
+
+    def test_exponential_backoff(self):
+        circuit_breaker = ModbusDeviceCircuitBreaker()
+        now = 0
+        backoffs = []
+        for _ in range(ModbusDeviceCircuitBreaker.FAILURE_THRESHOLD - 1):
+            circuit_breaker.record(False, now)
+        for _ in range(10):
+            circuit_breaker.record(False, now)
+            backoffs.append(circuit_breaker.backoff)
+            now = circuit_breaker.retry_at
+            self.assertTrue(circuit_breaker.allow(now))
+        self.assertEqual(backoffs[:3], [5, 10, 20])
+        self.assertEqual(backoffs[-1], ModbusDeviceCircuitBreaker.MAX_BACKOFF)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import threading
+import time
+import unittest
+
+from src.drivers.modbus.enums.network.network import ModbusRequestPriority
+from src.drivers.modbus.services.modbus_client_pool import ModbusClientPool
+
+
+class TestClientPool(unittest.TestCase):
+
+    def test_waiting_requests_are_served_by_priority(self):
+        pool = ModbusClientPool(['client'])
+        served = []
+
+        def request(priority: ModbusRequestPriority):
+            with pool.acquire(priority):
+                served.append(priority)
+
+        with pool.acquire():
+            threads = [threading.Thread(target=request, args=(priority,))
+                       for priority in (ModbusRequestPriority.CYCLIC, ModbusRequestPriority.MANUAL,
+                                        ModbusRequestPriority.WRITE, ModbusRequestPriority.CYCLIC)]
+            for thread in threads:
+                thread.start()
+                time.sleep(0.01)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(served, [ModbusRequestPriority.WRITE, ModbusRequestPriority.MANUAL,
+                                  ModbusRequestPriority.CYCLIC, ModbusRequestPriority.CYCLIC])
+
+    def test_max_in_flight(self):
+        pool = ModbusClientPool(['client1', 'client2', 'client3'], 2)
+        with pool.acquire() as client1, pool.acquire() as client2:
+            self.assertNotEqual(client1, client2)
+            acquired = threading.Event()
+
+            def request():
+                with pool.acquire():
+                    acquired.set()
+
+            thread = threading.Thread(target=request)
+            thread.start()
+            self.assertFalse(acquired.wait(0.05))
+        thread.join()
+        self.assertTrue(acquired.is_set())
+
+    def test_frame_spacing(self):
+        pool = ModbusClientPool(['client'], frame_spacing=0.05)
+        with pool.acquire():
+            pass
+        start = time.time()
+        with pool.acquire():
+            self.assertGreaterEqual(time.time() - start, 0.04)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from collections import namedtuple
+from typing import List
+
+from pymodbus.exceptions import ModbusIOException
+from pymodbus.pdu import ExceptionResponse
+from pymodbus.register_read_message import ReadHoldingRegistersResponse
+
+from src.drivers.modbus.enums.point.points import ModbusFunctionCode
+from src.drivers.modbus.services.polling.device_probe import ModbusDeviceProbe, find_max_length, find_gap_reads
+
+Device = namedtuple('Device', ['uuid', 'address', 'zero_based'])
+Point = namedtuple('Point', ['register', 'register_length', 'function_code'])
+
+
+class FakeClient:
+    """
+    Device with holding registers 0-19 and 30-39, which serves reads of at most max_length registers.
+    Coils are not mapped, input registers and discrete inputs are left without response.
+    """
+
+    def __init__(self, max_length: int, gap_reads: bool):
+        self.max_length: int = max_length
+        self.gap_reads: bool = gap_reads
+
+    def execute(self, request):
+        if request.function_code == ModbusFunctionCode.READ_COILS.value:
+            return ExceptionResponse(request.function_code, 2)
+        if request.function_code != ModbusFunctionCode.READ_HOLDING_REGISTERS.value:
+            return ModbusIOException('No response')
+        registers: List[int] = list(range(request.address, request.address + request.count))
+        mapped: List[int] = list(range(0, 20)) + list(range(30, 40)) if not self.gap_reads else list(range(0, 40))
+        if request.count > self.max_length or any(register not in mapped for register in registers):
+            return ExceptionResponse(request.function_code, 2)
+        return ReadHoldingRegistersResponse(registers)
+
+
+class TestDeviceProbe(unittest.TestCase):
+
+    def test_find_max_length(self):
+        for limit in (1, 7, 64, 125):
+            self.assertEqual(limit, find_max_length(lambda register, length: length <= limit, 1, 125))
+        self.assertEqual(0, find_max_length(lambda register, length: False, 1, 125))
+
+    def test_find_gap_reads(self):
+        reads = []
+
+        def read(register: int, length: int) -> bool:
+            reads.append((register, length))
+            return True
+
+        self.assertTrue(find_gap_reads(read, [(1, 4), (10, 2), (14, 1)], 125))
+        self.assertEqual([(11, 4)], reads)
+        self.assertIsNone(find_gap_reads(read, [(1, 4), (10, 2)], 6))
+        self.assertIsNone(find_gap_reads(read, [(1, 4)], 125))
+
+    def test_probe(self):
+        points = [Point(1, 10, ModbusFunctionCode.READ_HOLDING_REGISTERS),
+                  Point(11, 10, ModbusFunctionCode.READ_HOLDING_REGISTERS),
+                  Point(31, 2, ModbusFunctionCode.READ_HOLDING_REGISTERS)]
+        capabilities = ModbusDeviceProbe(FakeClient(16, False), Device('device', 1, False), points).probe()
+        self.assertEqual({'probed_max_coils': None, 'probed_max_discrete_inputs': None,
+                          'probed_max_holding_registers': 16, 'probed_max_input_registers': None,
+                          'probed_gap_reads': False}, capabilities)
+        capabilities = ModbusDeviceProbe(FakeClient(64, False), Device('device', 1, False), points).probe()
+        self.assertEqual(20, capabilities['probed_max_holding_registers'])
+        self.assertIs(False, capabilities['probed_gap_reads'])
+        capabilities = ModbusDeviceProbe(FakeClient(64, True), Device('device', 1, False), points).probe()
+        self.assertEqual(40, capabilities['probed_max_holding_registers'])
+        self.assertIs(True, capabilities['probed_gap_reads'])
+
+    def test_probe_no_response(self):
+        client = FakeClient(16, False)
+        client.execute = lambda request: ModbusIOException('No response')
+        with self.assertRaises(ModbusIOException):
+            ModbusDeviceProbe(client, Device('device', 1, False), []).probe()
+
+
+if __name__ == '__main__':
+    unittest.main()
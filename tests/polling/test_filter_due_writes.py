@@ -0,0 +1,35 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.drivers.modbus.enums.point.points import ModbusFunctionCode, ModbusDataType, ModbusDataEndian
+from src.drivers.modbus.models.point import ModbusPointModel
+from src.drivers.modbus.services.polling.modbus_polling import ModbusPolling
+from src.drivers.modbus.services.polling.write_cache import ModbusWriteCache
+from src.models.point.model_point_store import PointStoreModel
+from src.models.point.priority_array import PriorityArrayModel
+from src.services.point_value_store import PointValueStore
+
+
+def _point(uuid: str, value: float) -> SimpleNamespace:
+    return SimpleNamespace(uuid=uuid, device_uuid='device', register=1, function_code=ModbusFunctionCode.WRITE_REGISTER,
+                           data_type=ModbusDataType.INT16, data_endian=ModbusDataEndian.BEB_LEW, write_value_once=True,
+                           is_writable=ModbusPointModel.is_writable,
+                           priority_array_write=PriorityArrayModel.create_priority_array_model(uuid, {'_16': value}))
+
+
+class TestFilterDueWrites(unittest.TestCase):
+
+    def setUp(self):
+        ModbusWriteCache().invalidate()
+
+    def test_write_value_once_reads_live_value(self):
+        points = [_point('written', 5.0), _point('changed', 6.0)]
+        live = {'written': PointStoreModel(point_uuid='written', value_original=5.0, fault=False),
+                'changed': PointStoreModel(point_uuid='changed', value_original=5.0, fault=False)}
+        with patch.object(PointValueStore, 'get', side_effect=live.get):
+            self.assertEqual([points[1]], ModbusPolling.filter_due_writes(points, 60))
+
+
+if __name__ == '__main__':
+    unittest.main()
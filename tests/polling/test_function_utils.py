@@ -0,0 +1,49 @@
+import math
+import unittest
+
+from pymodbus.payload import BinaryPayloadDecoder
+
+from src.drivers.modbus.enums.point.points import ModbusDataType, ModbusDataEndian
+from src.drivers.modbus.services.polling.function_utils import PackedRegisters, get_register_decoder, \
+    _mod_point_data_endian, get_bit_field_decoder
+
+
+class TestFunctionUtils(unittest.TestCase):
+    registers = [0x1234, 0x5678, 0x9abc, 0xdef0, 0x4000, 0x0000, 0x3f80, 0x0001]
+    decode_methods = {
+        ModbusDataType.INT16: 'decode_16bit_int',
+        ModbusDataType.UINT16: 'decode_16bit_uint',
+        ModbusDataType.INT32: 'decode_32bit_int',
+        ModbusDataType.UINT32: 'decode_32bit_uint',
+        ModbusDataType.FLOAT: 'decode_32bit_float',
+        ModbusDataType.DOUBLE: 'decode_64bit_float',
+    }
+
+    def test_register_decoder_matches_payload_decoder(self):
+        packed = PackedRegisters(self.registers)
+        for data_type, method in self.decode_methods.items():
+            for data_endian in ModbusDataEndian:
+                byteorder, word_order = _mod_point_data_endian(data_endian)
+                for offset in range(len(self.registers) - 3):
+                    expected = getattr(BinaryPayloadDecoder.fromRegisters(self.registers[offset:], byteorder=byteorder,
+                                                                          wordorder=word_order), method)()
+                    value = get_register_decoder(data_type, data_endian).decode(packed, offset)
+                    if isinstance(expected, float) and math.isnan(expected):
+                        self.assertTrue(math.isnan(value))
+                    else:
+                        self.assertEqual(expected, value, f'{data_type} {data_endian} offset {offset}')
+
+    def test_register_decoder_not_decoded_types(self):
+        self.assertIsNone(get_register_decoder(ModbusDataType.RAW, ModbusDataEndian.BEB_LEW))
+        self.assertIsNone(get_register_decoder(ModbusDataType.DIGITAL, ModbusDataEndian.BEB_LEW))
+
+    def test_double(self):
+        packed = PackedRegisters([0x4000, 0, 0, 0])
+        self.assertEqual(2.0, get_register_decoder(ModbusDataType.DOUBLE, ModbusDataEndian.BEB_BEW).decode(packed, 0))
+
+    def test_bit_field(self):
+        packed = PackedRegisters([0x0000, 0xa5f0])
+        self.assertEqual(0xf, get_bit_field_decoder(ModbusDataEndian.BEB_LEW, 4, 4).decode(packed, 1))
+        self.assertEqual(1, get_bit_field_decoder(ModbusDataEndian.BEB_LEW, 15, 1).decode(packed, 1))
+        self.assertEqual(0xa5f0, get_bit_field_decoder(ModbusDataEndian.BEB_LEW, 0, 16).decode(packed, 1))
+        self.assertEqual(0xa, get_bit_field_decoder(ModbusDataEndian.LEB_BEW, 4, 4).decode(packed, 1))
@@ -0,0 +1,72 @@
+import unittest
+from collections import namedtuple
+from types import SimpleNamespace
+
+from src.drivers.modbus.enums.network.network import ModbusType, ModbusRtuParity
+from src.drivers.modbus.enums.point.points import ModbusFunctionCode, ModbusDataType, ModbusDataEndian
+from src.drivers.modbus.services.polling.plan_report import ModbusPollPlanReport, get_pdu_sizes, get_gap_registers
+from src.drivers.modbus.services.polling.poll_plan import ModbusDevicePollPlan
+from src.drivers.modbus.services.polling.poll_stats import ModbusPollStats
+
+Point = namedtuple('Point', ['uuid', 'name', 'register', 'register_length', 'function_code', 'data_type',
+                             'data_endian', 'poll_interval_ms', 'bit_offset', 'bit_length'],
+                   defaults=[ModbusDataType.UINT16, ModbusDataEndian.BEB_LEW, None, 0, 1])
+Device = namedtuple('Device', ['uuid', 'supports_multiple_rw', 'max_gap', 'max_registers_per_request',
+                               'probed_max_coils', 'probed_max_discrete_inputs', 'probed_max_holding_registers',
+                               'probed_max_input_registers', 'probed_gap_reads'],
+                    defaults=[None, None, None, None, None])
+
+
+def _network(network_type: ModbusType = ModbusType.RTU) -> SimpleNamespace:
+    return SimpleNamespace(uuid='network', type=network_type, rtu_speed=9600, rtu_parity=ModbusRtuParity.N,
+                           rtu_byte_size=8, rtu_stop_bits=1, polling_interval_runtime=2,
+                           point_interval_ms_between_points=30, tcp_pipeline_depth=1)
+
+
+def _point(uuid: str, register: int, register_length: int, poll_interval_ms: int = None) -> Point:
+    return Point(uuid, uuid, register, register_length, ModbusFunctionCode.READ_HOLDING_REGISTERS,
+                 poll_interval_ms=poll_interval_ms)
+
+
+class TestPlanReport(unittest.TestCase):
+
+    def setUp(self):
+        ModbusPollStats().reset()
+
+    def test_pdu_sizes(self):
+        self.assertEqual((5, 22), get_pdu_sizes(ModbusFunctionCode.READ_HOLDING_REGISTERS, 10))
+        self.assertEqual((5, 4), get_pdu_sizes(ModbusFunctionCode.READ_COILS, 9))
+        self.assertEqual((26, 5), get_pdu_sizes(ModbusFunctionCode.WRITE_REGISTERS, 10))
+
+    def test_gap_registers(self):
+        self.assertEqual(0, get_gap_registers([_point('1', 1, 2), _point('2', 2, 2)]))
+        self.assertEqual(3, get_gap_registers([_point('1', 1, 2), _point('2', 6, 1)]))
+
+    def test_rtu_report(self):
+        device = Device('device', True, 5, None)
+        points = [_point('1', 1, 2), _point('2', 6, 1), _point('3', 40, 1, 1000)]
+        report = ModbusPollPlanReport(_network(), device, ModbusDevicePollPlan(device, points)).to_dict()
+        self.assertEqual(2, report['requests'])
+        self.assertEqual(3, report['gap_registers'])
+        self.assertEqual([['1', '2'], ['3']], [[p['uuid'] for p in group['points']] for group in report['groups']])
+        self.assertEqual('baud_rate', report['groups'][0]['rtt_source'])
+        # 5 + 14 bytes of PDUs and 6 of RTU framing, plus the inter-frame delay before the response
+        self.assertAlmostEqual((25 + 3.5) * 10 / 9.6, report['groups'][0]['rtt_ms'], 2)
+        self.assertEqual([None, 1000], [interval['poll_interval_ms'] for interval in report['intervals']])
+        self.assertEqual(1, report['intervals'][1]['requests'])
+
+    def test_tcp_report(self):
+        device = Device('device', True, 0, None)
+        points = [_point('1', 1, 1), _point('2', 10, 1)]
+        plan = ModbusDevicePollPlan(device, points)
+        self.assertIsNone(ModbusPollPlanReport(_network(ModbusType.TCP), device, plan).to_dict()['estimated_cycle_ms'])
+        ModbusPollStats().add_transaction('network', SimpleNamespace(
+            device=device, points=[points[0]], attempts=1, request_bytes=5, response_bytes=4, rtt=0.01,
+            no_response=False, exception_code=None, unchanged=False))
+        report = ModbusPollPlanReport(_network(ModbusType.TCP), device, plan).to_dict()
+        self.assertEqual(['group', 'device'], [group['rtt_source'] for group in report['groups']])
+        self.assertAlmostEqual(10 + 10 + 30, report['estimated_cycle_ms'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from collections import namedtuple
+from unittest.mock import patch
+
+from src.drivers.modbus.enums.point.points import ModbusFunctionCode, ModbusDataEndian, ModbusDataType
+from src.drivers.modbus.services.polling.poll_plan import coalesce_points, get_group_register_length, \
+    ModbusDevicePollPlan, get_read_limits
+
+Point = namedtuple('Point', ['register', 'register_length', 'function_code'])
+PlanPoint = namedtuple('PlanPoint', ['uuid', 'register', 'register_length', 'function_code', 'data_type',
+                                     'data_endian', 'poll_interval_ms', 'bit_offset', 'bit_length'],
+                       defaults=[ModbusDataType.UINT16, ModbusDataEndian.BEB_LEW, None, 0, 1])
+Device = namedtuple('Device', ['uuid', 'supports_multiple_rw', 'max_gap', 'max_registers_per_request',
+                               'probed_max_coils', 'probed_max_discrete_inputs', 'probed_max_holding_registers',
+                               'probed_max_input_registers', 'probed_gap_reads'],
+                    defaults=[None, None, None, None, None])
+
+
+def _point(register: int, register_length: int) -> Point:
+    return Point(register, register_length, ModbusFunctionCode.READ_HOLDING_REGISTERS)
+
+
+class TestPollPlan(unittest.TestCase):
+
+    def test_coalesce_continuous_points(self):
+        points = [_point(3, 2), _point(1, 2), _point(10, 1)]
+        groups = coalesce_points(points, 0, 125)
+        self.assertEqual([[_point(1, 2), _point(3, 2)], [_point(10, 1)]], groups)
+
+    def test_coalesce_points_across_gap(self):
+        points = [_point(1, 2), _point(5, 2), _point(20, 1)]
+        self.assertEqual([[_point(1, 2), _point(5, 2)], [_point(20, 1)]], coalesce_points(points, 2, 125))
+        self.assertEqual(3, len(coalesce_points(points, 1, 125)))
+
+    def test_coalesce_overlapping_points(self):
+        points = [_point(1, 2), _point(2, 1), _point(2, 2)]
+        self.assertEqual([[_point(1, 2), _point(2, 2), _point(2, 1)]], coalesce_points(points, 0, 125))
+        self.assertEqual(3, len(coalesce_points(points, 0, 125, overlapping=False)))
+
+    def test_coalesce_contained_points(self):
+        points = [_point(1, 1), _point(1, 2), _point(2, 1), _point(3, 1)]
+        self.assertEqual([[_point(1, 2), _point(1, 1), _point(2, 1)], [_point(3, 1)]], coalesce_points(points, 0, 0))
+
+    def test_coalesce_points_max_length(self):
+        points = [_point(i * 2, 2) for i in range(100)]
+        groups = coalesce_points(points, 0, 125)
+        self.assertEqual([62, 38], [len(group) for group in groups])
+        self.assertTrue(all(get_group_register_length(group) <= 125 for group in groups))
+
+    def test_group_register_length(self):
+        self.assertEqual(6, get_group_register_length([_point(1, 2), _point(5, 2), _point(6, 1)]))
+
+    def test_device_plan_interval_groups(self):
+        device = Device('device', True, 0, None)
+        points = [PlanPoint(str(register), register, 1, ModbusFunctionCode.READ_HOLDING_REGISTERS,
+                            poll_interval_ms=interval)
+                  for register, interval in [(1, 100), (2, None), (3, 100)]]
+        device_plan = ModbusDevicePollPlan(device, points)
+        self.assertEqual({100, None}, device_plan.intervals)
+        self.assertEqual([['1'], ['3']], [[p.uuid for p in group.points] for group in device_plan.get_groups([100])])
+        self.assertEqual([['1', '2', '3']], [[p.uuid for p in group.points] for group in device_plan.groups])
+        self.assertEqual([['2']], [[p.uuid for p in group.points] for group in device_plan.get_groups([None, 5])])
+
+    def test_device_plan_shared_registers(self):
+        device = Device('device', False, 0, None)
+        points = [PlanPoint('int16', 10, 1, ModbusFunctionCode.READ_HOLDING_REGISTERS, ModbusDataType.INT16),
+                  PlanPoint('bits', 10, 1, ModbusFunctionCode.READ_HOLDING_REGISTERS, ModbusDataType.BITS,
+                            bit_offset=4, bit_length=4),
+                  PlanPoint('uint32', 10, 2, ModbusFunctionCode.READ_HOLDING_REGISTERS, ModbusDataType.UINT32),
+                  PlanPoint('input', 20, 1, ModbusFunctionCode.READ_INPUT_REGISTERS)]
+        device_plan = ModbusDevicePollPlan(device, points)
+        self.assertEqual([['uint32', 'int16', 'bits'], ['input']],
+                         [[p.uuid for p in group.points] for group in device_plan.groups])
+        image = device_plan.images[ModbusFunctionCode.READ_HOLDING_REGISTERS]
+        self.assertIs(image, device_plan.groups[0].image)
+        self.assertEqual((10, 2), (image.register, len(image.registers)))
+
+    def test_probed_read_limits(self):
+        holding = ModbusFunctionCode.READ_HOLDING_REGISTERS
+        self.assertEqual((0, 0), get_read_limits(Device('device', False, 5, None), holding))
+        self.assertEqual((5, 125), get_read_limits(Device('device', True, 5, None), holding))
+        self.assertEqual((5, 32), get_read_limits(Device('device', False, 5, 64, probed_max_holding_registers=32),
+                                                  holding))
+        self.assertEqual((0, 64), get_read_limits(Device('device', True, 5, 64, probed_max_holding_registers=100,
+                                                         probed_gap_reads=False), holding))
+        self.assertEqual((0, 0), get_read_limits(Device('device', False, 5, None, probed_max_coils=100), holding))
+
+    def test_group_unchanged_response(self):
+        points = [PlanPoint('1', 1, 1, ModbusFunctionCode.READ_HOLDING_REGISTERS)]
+        group = ModbusDevicePollPlan(Device('device', True, 0, None), points).groups[0]
+        with patch('time.monotonic', return_value=100):
+            self.assertFalse(group.is_response_unchanged([1], 60))
+            self.assertTrue(group.is_response_unchanged([1], 60))
+            self.assertFalse(group.is_response_unchanged([2], 60))
+            self.assertFalse(group.is_response_unchanged([2], 0))
+            group.reset_response()
+            self.assertFalse(group.is_response_unchanged([2], 60))
+        with patch('time.monotonic', return_value=160):
+            self.assertFalse(group.is_response_unchanged([2], 60))
@@ -0,0 +1,63 @@
+import unittest
+from types import SimpleNamespace
+
+from src.drivers.modbus.enums.point.points import ModbusFunctionCode
+from src.drivers.modbus.services.polling.poll_stats import LatencyHistogram, ModbusPollStats
+
+
+def _transaction(rtt: float = 0.01, no_response: bool = False, exception_code: int = None,
+                 unchanged: bool = False) -> SimpleNamespace:
+    points = [SimpleNamespace(function_code=ModbusFunctionCode.READ_HOLDING_REGISTERS, register=1, register_length=2),
+              SimpleNamespace(function_code=ModbusFunctionCode.READ_HOLDING_REGISTERS, register=5, register_length=1)]
+    return SimpleNamespace(device=SimpleNamespace(uuid='device'), points=points, attempts=2 if no_response else 1,
+                           request_bytes=5, response_bytes=0 if no_response else 13,
+                           rtt=None if no_response else rtt, no_response=no_response, exception_code=exception_code,
+                           unchanged=unchanged)
+
+
+class TestPollStats(unittest.TestCase):
+
+    def setUp(self):
+        ModbusPollStats().reset()
+
+    def test_histogram(self):
+        histogram = LatencyHistogram()
+        for milliseconds in range(1, 101):
+            histogram.add(milliseconds / 1000)
+        stats = histogram.to_dict()
+        self.assertEqual(stats['count'], 100)
+        self.assertAlmostEqual(stats['p50_ms'], 51)
+        self.assertAlmostEqual(stats['p99_ms'], 100)
+        self.assertEqual(stats['buckets']['le_1'], 1)
+        self.assertEqual(sum(stats['buckets'].values()), 100)
+
+    def test_transactions(self):
+        ModbusPollStats().add_transaction('network', _transaction())
+        ModbusPollStats().add_transaction('network', _transaction(no_response=True))
+        ModbusPollStats().add_transaction('network', _transaction(exception_code=2))
+        ModbusPollStats().add_transaction('network', _transaction(unchanged=True))
+        ModbusPollStats().add_transaction(None, _transaction())
+        network_stats = ModbusPollStats().get_stats()['network']
+        self.assertEqual(network_stats['requests'], 4)
+        self.assertEqual(network_stats['timeouts'], 1)
+        self.assertEqual(network_stats['unchanged'], 1)
+        self.assertEqual(network_stats['points'], 4)
+        self.assertEqual(network_stats['retries'], 1)
+        self.assertEqual(network_stats['request_bytes'], 20)
+        self.assertEqual(network_stats['exception_codes'], {'2': 1})
+        self.assertEqual(network_stats['rtt']['count'], 3)
+        group_stats = network_stats['devices']['device']['groups']['READ_HOLDING_REGISTERS:1+5']
+        self.assertEqual(group_stats['requests'], 4)
+
+    def test_cycles(self):
+        ModbusPollStats().add_cycle('network', 1, 2)
+        ModbusPollStats().add_cycle('network', 3, 2)
+        network_stats = ModbusPollStats().get_stats('network')['network']
+        self.assertEqual(network_stats['cycles'], 2)
+        self.assertEqual(network_stats['overruns'], 1)
+        ModbusPollStats().reset('network')
+        self.assertEqual(ModbusPollStats().get_stats(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+
+from src.drivers.modbus.services.polling.register_image import ModbusRegisterImage
+
+
+class TestRegisterImage(unittest.TestCase):
+
+    def test_update(self):
+        image = ModbusRegisterImage(10, 4)
+        image.update(11, [1, 2])
+        self.assertEqual([0, 1, 2, 0], image.registers.tolist())
+        image.update(8, [7, 7, 3, 4, 5, 6, 7])
+        self.assertEqual([3, 4, 5, 6], image.registers.tolist())
+        self.assertEqual([4, 5], image.get(11, 2).tolist())
+
+    def test_pack(self):
+        image = ModbusRegisterImage(0, 2)
+        image.update(0, [0x1234, 0xabcd])
+        self.assertEqual(b'\xab\xcd', image.pack(1, 1).big)
+        self.assertEqual(b'\xcd\xab', image.pack(1, 1).little)
+
+
+if __name__ == '__main__':
+    unittest.main()
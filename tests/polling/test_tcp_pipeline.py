@@ -0,0 +1,48 @@
+import threading
+import time
+import unittest
+
+from pymodbus.client.sync import ModbusTcpClient
+from pymodbus.datastore import ModbusSequentialDataBlock, ModbusServerContext, ModbusSlaveContext
+from pymodbus.register_read_message import ReadHoldingRegistersRequest
+from pymodbus.server.sync import ModbusTcpServer
+
+from src.drivers.modbus.services.modbus_tcp_pipeline import ModbusTcpPipeline
+
+LATENCY = 0.05
+
+
+class SlowSlaveContext(ModbusSlaveContext):
+
+    def validate(self, fx, address, count=1):
+        time.sleep(LATENCY)
+        return super().validate(fx, address, count)
+
+
+class TestTcpPipeline(unittest.TestCase):
+
+    def setUp(self):
+        context = ModbusServerContext(slaves=SlowSlaveContext(hr=ModbusSequentialDataBlock(0, list(range(100))),
+                                                             zero_mode=True),
+                                      single=True)
+        self.server = ModbusTcpServer(context, address=('127.0.0.1', 0))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = ModbusTcpClient(*self.server.server_address, timeout=2)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_rtt_per_request(self):
+        pipeline = ModbusTcpPipeline(self.client, 3)
+        responses = pipeline.execute([ReadHoldingRegistersRequest(register, 1, unit=1) for register in range(3)])
+        self.assertEqual([[0], [1], [2]], [response.registers for response in responses])
+        # the server answers the requests one after the other, each one is timed up to its own response
+        self.assertLess(pipeline.rtts[0], pipeline.rtts[1])
+        self.assertLess(pipeline.rtts[1], pipeline.rtts[2])
+        self.assertGreaterEqual(pipeline.rtts[2], 3 * LATENCY)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import time
+import unittest
+from collections import namedtuple
+
+from pymodbus.constants import Endian
+from pymodbus.payload import BinaryPayloadBuilder
+
+from src.drivers.modbus.enums.point.points import ModbusFunctionCode, ModbusDataType, ModbusDataEndian
+from src.drivers.modbus.services.polling.write_cache import ModbusWriteCache, get_write_version
+from src.models.point.priority_array import PriorityArrayModel
+
+Point = namedtuple('Point', ['uuid', 'device_uuid', 'register', 'function_code', 'data_type', 'data_endian',
+                             'priority_array_write'])
+
+
+def _point(value: float, data_endian: ModbusDataEndian = ModbusDataEndian.BEB_LEW, uuid: str = 'uuid',
+           device_uuid: str = 'device') -> Point:
+    return Point(uuid, device_uuid, 1, ModbusFunctionCode.WRITE_REGISTERS, ModbusDataType.FLOAT, data_endian,
+                 PriorityArrayModel.create_priority_array_model(uuid, {'_16': value}))
+
+
+class TestWriteCache(unittest.TestCase):
+
+    def setUp(self):
+        ModbusWriteCache().invalidate()
+
+    def test_payload(self):
+        builder = BinaryPayloadBuilder(byteorder=Endian.Big, wordorder=Endian.Little)
+        builder.add_32bit_float(12.5)
+        self.assertEqual(ModbusWriteCache().get_payload(_point(12.5)), builder.to_registers())
+        builder = BinaryPayloadBuilder(byteorder=Endian.Big, wordorder=Endian.Big)
+        builder.add_32bit_float(12.5)
+        self.assertEqual(ModbusWriteCache().get_payload(_point(12.5, ModbusDataEndian.BEB_BEW)),
+                         builder.to_registers())
+
+    def test_unchanged_write_is_not_due(self):
+        point = _point(1)
+        self.assertTrue(ModbusWriteCache().is_due(point, 60))
+        ModbusWriteCache().set_written(point, get_write_version(point))
+        self.assertFalse(ModbusWriteCache().is_due(point, 60))
+        self.assertFalse(ModbusWriteCache().is_due(point, None))
+        self.assertTrue(ModbusWriteCache().is_due(point, 0))
+        self.assertTrue(ModbusWriteCache().is_due(_point(2), 60))
+
+    def test_refresh_period(self):
+        point = _point(1)
+        ModbusWriteCache().set_written(point, get_write_version(point))
+        time.sleep(0.01)
+        self.assertTrue(ModbusWriteCache().is_due(point, 0.001))
+
+    def test_invalidate_device(self):
+        points = [_point(1, uuid='1'), _point(1, uuid='2'), _point(1, uuid='3', device_uuid='other')]
+        for point in points:
+            ModbusWriteCache().set_written(point, get_write_version(point))
+        ModbusWriteCache().invalidate_device('device')
+        self.assertEqual([True, True, False], [ModbusWriteCache().is_due(point, 60) for point in points])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from flask_restful import marshal
+
+from src.drivers.generic.resources.rest_schema.schema_generic_point import generic_point_all_fields
+from src.drivers.modbus.resources.rest_schema.schema_modbus_point import modbus_point_all_fields
+from src.models.point.model_point_store import PointStoreModel
+from src.resources.rest_schema.schema_point import point_all_fields
+from src.services.point_value_store import PointValueStore
+
+
+class TestSchemaPoint(unittest.TestCase):
+
+    def test_live_point_store(self):
+        stored = PointStoreModel(point_uuid='point', value=1.0, fault=False)
+        point = SimpleNamespace(uuid='point', point_store=stored)
+        live = PointStoreModel(point_uuid='point', value=2.0, fault=False)
+        for fields in (point_all_fields, generic_point_all_fields, modbus_point_all_fields):
+            with patch.object(PointValueStore, 'get', return_value=live) as get:
+                output = marshal(point, {'point_store': fields['point_store']})
+            get.assert_called_once_with('point')
+            self.assertEqual(output['point_store']['value'], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from src.services.calculation_graph import CalculationGraph
+
+
+class TestCalculationGraph(unittest.TestCase):
+
+    def test_affected_in_topological_order(self):
+        graph = CalculationGraph({
+            'total': ['floor_1', 'floor_2'],
+            'floor_1': ['zone_1', 'zone_2'],
+            'floor_2': ['zone_3'],
+            'average': ['total', 'zone_3'],
+        })
+        self.assertEqual(graph.cyclic, set())
+        self.assertEqual(graph.get_affected(['zone_1']), ['floor_1', 'total', 'average'])
+        affected = graph.get_affected(['zone_3'])
+        self.assertEqual(set(affected), {'floor_2', 'total', 'average'})
+        self.assertLess(affected.index('floor_2'), affected.index('total'))
+        self.assertLess(affected.index('total'), affected.index('average'))
+        self.assertEqual(graph.get_affected(['average', 'unknown']), [])
+
+    def test_cycles(self):
+        graph = CalculationGraph({
+            'a': ['b', 'input'],
+            'b': ['a'],
+            'c': ['a'],
+            'd': ['d'],
+            'e': ['input'],
+        })
+        self.assertEqual(graph.cyclic, {'a', 'b', 'c', 'd'})
+        self.assertEqual(graph.get_affected(['input']), ['e'])
+
+
+if __name__ == '__main__':
+    unittest.main()
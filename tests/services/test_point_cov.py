@@ -0,0 +1,76 @@
+import unittest
+from types import SimpleNamespace
+
+from src.enums.point import CovDecision
+from src.services.point_cov import PointCovPolicy, PointCovState
+
+
+def _point_store(value: float = None, fault: bool = False, fault_message: str = None) -> SimpleNamespace:
+    return SimpleNamespace(value=value, fault=fault, fault_message=fault_message)
+
+
+class TestPointCov(unittest.TestCase):
+
+    def setUp(self):
+        self.live_value = _point_store(10.0)
+        self.state = PointCovState()
+        self.state.set_published(0)
+
+    def _sample(self, point_store: SimpleNamespace, now: float) -> CovDecision:
+        decision: CovDecision = self.state.on_sample(self.live_value, point_store, now)
+        if decision is CovDecision.PUBLISH:
+            self.live_value = point_store
+        return decision
+
+    def test_deadbands(self):
+        self.assertFalse(PointCovPolicy(threshold=1).is_change(10, 11))
+        self.assertTrue(PointCovPolicy(threshold=1).is_change(10, 11.5))
+        self.assertFalse(PointCovPolicy(threshold=1, percent_threshold=20).is_change(10, 11.5))
+        self.assertTrue(PointCovPolicy(threshold=1, percent_threshold=20).is_change(10, 7.9))
+        self.assertTrue(PointCovPolicy(percent_threshold=20).is_change(0, 0.1))
+        self.assertFalse(PointCovPolicy().is_change(10, None))
+
+    def test_first_value(self):
+        self.live_value = _point_store()
+        self.state = PointCovState()
+        self.state.policy = PointCovPolicy(threshold=100, min_interval=60)
+        self.assertIs(self._sample(_point_store(1.0), 0), CovDecision.PUBLISH)
+        self.assertIs(self._sample(_point_store(1.0), 1), CovDecision.SKIP)
+
+    def test_min_interval(self):
+        self.state.policy = PointCovPolicy(min_interval=5)
+        self.assertIs(self._sample(_point_store(11.0), 1), CovDecision.DEFER)
+        self.assertIs(self._sample(_point_store(12.0), 2), CovDecision.DEFER)
+        self.assertEqual(self.state.pending.value, 12.0)
+        self.assertFalse(self.state.is_due(4))
+        self.assertTrue(self.state.is_due(5))
+        self.assertIs(self._sample(_point_store(10.0), 3), CovDecision.SKIP)
+        self.assertIsNone(self.state.pending)
+        self.assertFalse(self.state.is_timed())
+        self.assertIs(self._sample(_point_store(13.0), 6), CovDecision.PUBLISH)
+        self.assertIs(self._sample(_point_store(14.0), 7), CovDecision.DEFER)
+
+    def test_max_interval(self):
+        self.state.policy = PointCovPolicy(threshold=1, max_interval=60)
+        self.assertIs(self._sample(_point_store(10.5), 30), CovDecision.SKIP)
+        self.assertTrue(self.state.is_timed())
+        self.assertFalse(self.state.is_due(59))
+        self.assertTrue(self.state.is_due(60))
+        self.state.set_published(60)
+        self.assertFalse(self.state.is_due(61))
+
+    def test_fault_debounce(self):
+        self.state.policy = PointCovPolicy(fault_debounce=2)
+        self.assertIs(self._sample(_point_store(fault=True, fault_message='timeout'), 1), CovDecision.SKIP)
+        self.assertIs(self._sample(_point_store(fault=True, fault_message='timeout'), 2), CovDecision.SKIP)
+        self.assertIs(self._sample(_point_store(10.0), 3), CovDecision.SKIP)
+        self.assertIs(self._sample(_point_store(fault=True, fault_message='timeout'), 4), CovDecision.SKIP)
+        self.assertIs(self._sample(_point_store(fault=True, fault_message='timeout'), 5), CovDecision.SKIP)
+        self.assertIs(self._sample(_point_store(fault=True, fault_message='timeout'), 6), CovDecision.PUBLISH)
+        self.assertIs(self._sample(_point_store(fault=True, fault_message='timeout'), 7), CovDecision.SKIP)
+        self.assertIs(self._sample(_point_store(fault=True, fault_message='exception'), 8), CovDecision.PUBLISH)
+        self.assertIs(self._sample(_point_store(10.0), 9), CovDecision.PUBLISH)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from src.utils.math_functions import ArithmeticExpression, CalculationExpression, compile_arithmetic_expression, \
+    compile_calculation_expression, eval_arithmetic_expression
+
+
+class TestMathFunctions(unittest.TestCase):
+
+    def test_compiled_expression(self):
+        for expression in ('x + 0', 'x * 0.1', '(x - 32) * 5 / 9', 'x // 3 % 2', '2 ** 3 * x', '+x - -1'):
+            for value in (0, 7, 12.5):
+                self.assertEqual(eval_arithmetic_expression(expression.replace('x', str(value))),
+                                 ArithmeticExpression(expression)(value))
+
+    def test_variable(self):
+        self.assertEqual(-4, ArithmeticExpression('X * 2')(-2))
+        self.assertEqual(4, ArithmeticExpression('x ** 2')(-2))
+        self.assertEqual([1, 2, 3], ArithmeticExpression('x + 1').apply([0, 1, 2]))
+
+    def test_invalid_expression(self):
+        for expression in ('y + 1', 'abs(x)', 'x if x else 1', '"a" * x', 'x +'):
+            with self.assertRaises((TypeError, SyntaxError)):
+                ArithmeticExpression(expression)
+
+    def test_compiled_expression_cache(self):
+        self.assertIs(compile_arithmetic_expression('x * 2'), compile_arithmetic_expression('x * 2'))
+
+    def test_calculation_expression(self):
+        calculation = CalculationExpression('(zone_1 + zone_2 + zone_3) / 3 - offset', ('zone_1', 'zone_2', 'zone_3',
+                                                                                     'offset', 'unused'))
+        self.assertEqual(calculation({'zone_1': 20, 'zone_2': 21, 'zone_3': 22, 'offset': 0.5}), 20.5)
+        self.assertEqual(calculation.names, {'zone_1', 'zone_2', 'zone_3', 'offset'})
+        for expression in ('a + b', 'abs(a)', 'a +'):
+            with self.assertRaises((TypeError, SyntaxError)):
+                CalculationExpression(expression, ('a',))
+        self.assertIs(compile_calculation_expression('a * 2', frozenset('a')),
+                      compile_calculation_expression('a * 2', frozenset('a')))
+
+
+if __name__ == '__main__':
+    unittest.main()